@@ -0,0 +1,186 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+# 파일 앞부분(매직 바이트)으로 허용하는 이미지 형식 확인
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+)
+
+
+def sniff_image(head):
+    """
+    파일 앞 16바이트로 이미지 형식 판별
+    :return: 형식 이름 또는 None
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, name in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return name
+    return None
+
+
+class Deadline:
+    def __init__(self, seconds):
+        """요청 처리 마감 시각 (지금부터 seconds초)"""
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self, stage=""):
+        """마감이 지났으면 504"""
+        if self.remaining() <= 0:
+            raise HTTPException(status_code=504, detail=f"처리 시간({self.seconds:.1f}s)을 초과했습니다. {stage}".strip())
+
+
+class RequestSlot:
+    def __init__(self, deadline):
+        """처리 슬롯 하나 - 무거운 작업은 run()으로 스레드 풀에서 마감 시간 안에 실행"""
+        self.deadline = deadline
+        self.pending = None
+
+    async def run(self, func, *args, stage=""):
+        """
+        func(*args)를 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+        마감이 지나면 504를 반환하고, 이미 시작된 작업은 끝날 때까지 슬롯을 잡고 있는다.
+        """
+        self.deadline.check(stage)
+        task = asyncio.ensure_future(run_in_threadpool(func, *args))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self.deadline.remaining())
+        except asyncio.TimeoutError:
+            self.pending = task
+            raise HTTPException(status_code=504, detail=f"처리 시간({self.deadline.seconds:.1f}s)을 초과했습니다. {stage}".strip())
+        except asyncio.CancelledError:
+            # 클라이언트 연결이 끊긴 경우에도 실행 중인 작업이 끝날 때까지 슬롯 유지
+            self.pending = task
+            raise
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight=4, max_waiting=16, wait_timeout=2.0, retry_after=1):
+        """
+        동시 처리 요청 수 제한 (초과분은 빠르게 거절)
+        - 처리 중 max_in_flight개, 대기 max_waiting개까지 받는다
+        - 대기열이 가득 차면 바로 429, wait_timeout초 안에 슬롯을 못 얻으면 503
+        :param retry_after: 거절 응답의 Retry-After 헤더 값 (초)
+        """
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {"admitted": 0, "rejected_429": 0, "rejected_503": 0, "deadline_504": 0}
+        self._semaphore = None
+
+    def overloaded(self):
+        """대기열이 가득 찼는지 (본문을 읽기 전에 미들웨어에서 확인)"""
+        return self.waiting >= self.max_waiting
+
+    def _reject(self, status_code, detail):
+        self.stats[f"rejected_{status_code}"] += 1
+        raise HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after)})
+
+    async def _acquire(self, deadline):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        if self.overloaded():
+            self._reject(429, "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), min(self.wait_timeout, deadline.remaining()))
+        except asyncio.TimeoutError:
+            self._reject(503, "서버가 바쁩니다. 잠시 후 다시 시도해 주세요.")
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+
+    def _release(self, task=None):
+        if task is not None and not task.cancelled():
+            # 마감 뒤에 끝난 작업의 결과/오류는 돌려줄 곳이 없으므로 꺼내서 버림 (미확인 예외 경고 방지)
+            task.exception()
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self, deadline):
+        """
+        처리 슬롯을 얻어 RequestSlot을 넘겨줌
+        사용 예) async with admission.slot(deadline) as slot: result = await slot.run(func, arg)
+        """
+        await self._acquire(deadline)
+        request_slot = RequestSlot(deadline)
+        try:
+            yield request_slot
+        except HTTPException as e:
+            if e.status_code == 504:
+                self.stats["deadline_504"] += 1
+            raise
+        finally:
+            if request_slot.pending is not None and not request_slot.pending.done():
+                request_slot.pending.add_done_callback(self._release)
+            else:
+                self._release()
+
+
+class UploadLimitMiddleware:
+    def __init__(self, app, limits, admission=None):
+        """
+        업로드 본문 크기 제한 ASGI 미들웨어
+        Content-Length가 크면 본문을 읽기 전에 413, 없거나 속인 경우에도 받은 바이트를 세다가 넘으면 413.
+        admission이 주어지면 대기열이 가득 찬 경우 본문을 읽지 않고 바로 429.
+        :param limits: {경로: 최대 바이트}
+        """
+        self.app = app
+        self.limits = limits
+        self.admission = admission
+
+    @staticmethod
+    async def _send_error(send, status_code, detail, headers=None):
+        body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), str(value).encode()))
+        await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        if self.admission is not None and self.admission.overloaded():
+            self.admission.stats["rejected_429"] += 1
+            return await self._send_error(send, 429, "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+                                          {"Retry-After": self.admission.retry_after})
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            return await self._send_error(send, 413, f"업로드 크기는 {limit // (1024 * 1024)}MB 이하여야 합니다.")
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI는 본문 파싱 중 발생한 HTTPException을 그대로 응답으로 바꾼다
+                    raise HTTPException(status_code=413, detail=f"업로드 크기는 {limit // (1024 * 1024)}MB 이하여야 합니다.")
+            return message
+
+        await self.app(scope, limited_receive, send)
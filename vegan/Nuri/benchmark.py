@@ -0,0 +1,435 @@
+from ultralytics import YOLO
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import argparse
+import json
+import time
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import cv2
+import yaml
+from cascade import CascadeDetector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def get_peak_rss_mb():
+    """
+    현재 프로세스의 최대 메모리 사용량(peak RSS)을 MB 단위로 반환하는 함수
+
+    Returns:
+        float: peak RSS (MB), 측정할 수 없으면 None
+    """
+    try:
+        import resource
+        # 리눅스는 KB, macOS는 byte 단위로 반환
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        # 윈도우는 peak_wset 제공
+        peak = getattr(info, "peak_wset", info.rss)
+        return peak / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def load_images(image_dir, max_images=32):
+    """
+    지연 시간 측정에 사용할 이미지를 미리 디코딩하는 함수 (디코딩 시간은 측정에서 제외)
+
+    Args:
+        image_dir (str): 이미지 디렉토리 경로
+        max_images (int): 사용할 최대 이미지 수
+
+    Returns:
+        list: RGB numpy 배열 목록
+    """
+    paths = sorted(p for p in Path(image_dir).rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+    images = []
+    for path in paths[:max_images]:
+        img = cv2.imread(str(path))
+        if img is None:
+            print(f"Warning: Could not read image {path}")
+            continue
+        images.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    return images
+
+
+def evaluate_accuracy(model, data_yaml, imgsz=640, batch=16, device="cpu"):
+    """
+    검증 데이터셋에서 전체 및 클래스별 Precision, Recall, mAP를 계산하는 함수
+
+    Args:
+        model (YOLO): 평가할 모델
+        data_yaml (str): 데이터셋 yaml 파일 경로
+        imgsz (int): 입력 이미지 크기
+        batch (int): 배치 크기
+        device (str): 평가 장치
+
+    Returns:
+        dict: {'overall': {...}, 'per_class': [{...}, ...]}
+    """
+    metrics = model.val(data=data_yaml, imgsz=imgsz, batch=batch, device=device,
+                        save=False, plots=False, verbose=False)
+
+    overall = {
+        'precision': float(metrics.box.mp),
+        'recall': float(metrics.box.mr),
+        'mAP@50': float(metrics.box.map50),
+        'mAP@50-95': float(metrics.box.map)
+    }
+
+    per_class = []
+    for i, class_idx in enumerate(metrics.box.ap_class_index):
+        p, r, ap50, ap = metrics.box.class_result(i)
+        per_class.append({
+            'class': int(class_idx),
+            'class_name': metrics.names[int(class_idx)],
+            'precision': float(p),
+            'recall': float(r),
+            'mAP@50': float(ap50),
+            'mAP@50-95': float(ap)
+        })
+
+    return {'overall': overall, 'per_class': per_class}
+
+
+def measure_latency(model, images, imgsz=640, warmup=3, runs=50, device="cpu"):
+    """
+    단일 이미지 추론 지연 시간 백분위수를 측정하는 함수
+
+    Returns:
+        dict: p50/p90/p99/mean (ms)
+    """
+    for img in images[:warmup]:
+        model.predict(img, imgsz=imgsz, device=device, verbose=False)
+
+    timings = []
+    for i in range(runs):
+        img = images[i % len(images)]
+        start = time.perf_counter()
+        model.predict(img, imgsz=imgsz, device=device, verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    return {
+        'latency_p50_ms': float(np.percentile(timings, 50)),
+        'latency_p90_ms': float(np.percentile(timings, 90)),
+        'latency_p99_ms': float(np.percentile(timings, 99)),
+        'latency_mean_ms': float(timings.mean())
+    }
+
+
+def measure_throughput(model, images, batch_sizes=(1, 4, 8, 16), imgsz=640, repeats=3, device="cpu"):
+    """
+    배치 크기별 처리량(images/sec)을 측정하는 함수
+
+    Returns:
+        dict: {'throughput_bs1': ..., 'throughput_bs4': ..., ...}
+    """
+    results = {}
+    for batch_size in batch_sizes:
+        batch = [images[i % len(images)] for i in range(batch_size)]
+        # 배치 크기별 첫 호출은 워밍업
+        model.predict(batch, imgsz=imgsz, device=device, verbose=False)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.predict(batch, imgsz=imgsz, device=device, verbose=False)
+        elapsed = time.perf_counter() - start
+        results[f'throughput_bs{batch_size}'] = batch_size * repeats / elapsed
+    return results
+
+
+def profile_checkpoint(model_path, data_yaml, test_images, imgsz=640, batch_sizes=(1, 4, 8, 16),
+                       runs=50, device="cpu"):
+    """
+    체크포인트 하나의 정확도, 지연 시간, 처리량, 메모리를 측정하는 함수
+    (.pt 뿐 아니라 .onnx, _openvino_model 등 export된 백엔드도 지원)
+
+    Returns:
+        dict: 측정 결과 (per_class 포함)
+    """
+    print(f"Profiling model: {model_path}")
+    model = YOLO(model_path, task="detect")
+
+    row = {'model': str(model_path), 'backend': Path(model_path).suffix or Path(model_path).name}
+
+    accuracy = evaluate_accuracy(model, data_yaml, imgsz=imgsz, device=device)
+    row.update(accuracy['overall'])
+
+    images = load_images(test_images)
+    if images:
+        row.update(measure_latency(model, images, imgsz=imgsz, runs=runs, device=device))
+        row.update(measure_throughput(model, images, batch_sizes=batch_sizes, imgsz=imgsz, device=device))
+    else:
+        print(f"Warning: No images found in {test_images}")
+
+    row['peak_rss_mb'] = get_peak_rss_mb()
+    row['per_class'] = accuracy['per_class']
+    return row
+
+
+def run_benchmark(checkpoints, data_yaml, test_images, **kwargs):
+    """
+    체크포인트별로 별도 프로세스에서 측정하여 peak RSS가 서로 섞이지 않도록 하는 함수
+
+    Returns:
+        list: 체크포인트별 측정 결과
+    """
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for model_path in checkpoints:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            future = executor.submit(profile_checkpoint, model_path, data_yaml, test_images, **kwargs)
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                print(f"Error profiling {model_path}: {e}")
+    return rows
+
+
+def write_report(rows, output_dir, prefix='benchmark'):
+    """
+    측정 결과를 JSON(전체)과 CSV(요약, 클래스별)로 저장하는 함수
+    prefix로 파일 이름을 나눠 다른 측정(예: cascade)이 체크포인트 비교 결과를 덮어쓰지 않게 한다.
+
+    Returns:
+        dict: 저장된 파일 경로
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_path = output_dir / f'{prefix}.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    summary = pd.DataFrame([{k: v for k, v in row.items() if k != 'per_class'} for row in rows])
+    summary_path = output_dir / f'{prefix}_summary.csv'
+    summary.to_csv(summary_path, index=False, encoding='utf-8-sig')
+
+    per_class = pd.DataFrame([
+        dict(model=row['model'], **cls) for row in rows for cls in row.get('per_class', [])
+    ])
+    per_class_path = output_dir / f'{prefix}_per_class.csv'
+    per_class.to_csv(per_class_path, index=False, encoding='utf-8-sig')
+
+    return {'json': str(json_path), 'summary': str(summary_path), 'per_class': str(per_class_path)}
+
+
+def select_fastest(rows, min_map50=0.0, metric='mAP@50', latency_key='latency_p50_ms'):
+    """
+    정확도 기준(min_map50)을 만족하는 모델 중 가장 빠른 모델을 선택하는 함수
+
+    Returns:
+        dict: 선택된 모델의 측정 결과, 조건을 만족하는 모델이 없으면 None
+    """
+    candidates = [row for row in rows if row.get(metric, 0) >= min_map50 and latency_key in row]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda row: row[latency_key])
+
+
+def load_labeled_images(data_yaml, max_images=200):
+    """
+    데이터셋 yaml의 검증 이미지와 YOLO 형식 라벨(class cx cy w h, 0~1)을 읽는 함수
+
+    Returns:
+        list: [(BGR 이미지 배열, 정답 클래스 (N,), 정답 박스 (N, 4) 픽셀 xyxy)]
+    """
+    with open(data_yaml, encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    val_dir = Path(config['val'])
+    if not val_dir.is_absolute():
+        val_dir = Path(config.get('path', Path(data_yaml).parent)) / val_dir
+
+    samples = []
+    paths = sorted(p for p in val_dir.rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+    for path in paths[:max_images]:
+        img = cv2.imread(str(path))
+        if img is None:
+            continue
+        label_path = Path(str(path.with_suffix('.txt')).replace(f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"))
+        labels = np.loadtxt(label_path, ndmin=2) if label_path.exists() and label_path.stat().st_size else np.zeros((0, 5))
+        height, width = img.shape[:2]
+        cx, cy, w, h = labels[:, 1] * width, labels[:, 2] * height, labels[:, 3] * width, labels[:, 4] * height
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        samples.append((img, labels[:, 0].astype(int), boxes))
+    return samples
+
+
+def box_iou_matrix(a, b):
+    """(N, 4) x (M, 4) 박스 IoU 행렬"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match_detections(result, gt_classes, gt_boxes, iou_threshold=0.5):
+    """
+    예측과 정답을 확률 높은 순서로 짝지어 (TP, FP, FN) 개수를 세는 함수 (같은 클래스, IoU >= iou_threshold)
+    """
+    data = result.boxes.data.cpu().numpy()
+    data = data[np.argsort(-data[:, 4])] if len(data) else data
+    if len(data) == 0 or len(gt_boxes) == 0:
+        return 0, len(data), len(gt_boxes)
+
+    iou = box_iou_matrix(data[:, :4], gt_boxes)
+    iou[data[:, 5].astype(int)[:, None] != gt_classes[None, :]] = 0
+    matched = np.zeros(len(gt_boxes), dtype=bool)
+    tp = 0
+    for row in iou:
+        row = np.where(matched, 0, row)
+        best = int(np.argmax(row))
+        if row[best] >= iou_threshold:
+            matched[best] = True
+            tp += 1
+    return tp, len(data) - tp, len(gt_boxes) - tp
+
+
+def detection_scores(counts):
+    tp, fp, fn = (sum(c[i] for c in counts) for i in range(3))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def profile_cascade(small_path, large_path, data_yaml, imgsz=640, escalate_conf=0.5, min_coverage=0.05,
+                    max_images=200, device="cpu"):
+    """
+    캐스케이드(작은 모델 -> 불확실할 때만 큰 모델)를 큰 모델 단독과 비교하는 함수
+    검증 이미지마다 작은 모델, 큰 모델, 캐스케이드를 실행하여 IoU 0.5 기준 Precision/Recall/F1을 계산한다.
+
+    Returns:
+        dict: 단계 전환 비율, 단계별 지연 시간, 모델별 정확도와 큰 모델 대비 차이
+    """
+    print(f"Profiling cascade: {small_path} -> {large_path}")
+    large = YOLO(large_path, task="detect")
+    cascade = CascadeDetector(YOLO(small_path, task="detect"), large, escalate_conf=escalate_conf,
+                              min_coverage=min_coverage)
+    samples = load_labeled_images(data_yaml, max_images)
+    if not samples:
+        print(f"Warning: No labeled images found for {data_yaml}")
+        return None
+
+    options = dict(imgsz=imgsz, device=device, verbose=False)
+    # 두 모델 모두 첫 호출(지연 초기화)은 측정에서 제외
+    cascade.small.predict(samples[0][0], **options)
+    large.predict(samples[0][0], **options)
+
+    counts = {'small': [], 'large': [], 'cascade': []}
+    small_ms, large_ms, cascade_ms = [], [], []
+    for img, gt_classes, gt_boxes in samples:
+        start = time.perf_counter()
+        small_result = cascade.small.predict(img, conf=cascade.conf, **options)[0]
+        small_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        large_result = large.predict(img, conf=cascade.conf, **options)[0]
+        large_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        cascade_result = cascade.predict(img, **options)[0]
+        cascade_ms.append((time.perf_counter() - start) * 1000)
+
+        counts['small'].append(match_detections(small_result, gt_classes, gt_boxes))
+        counts['large'].append(match_detections(large_result, gt_classes, gt_boxes))
+        counts['cascade'].append(match_detections(cascade_result, gt_classes, gt_boxes))
+
+    report = cascade.report()
+    row = {
+        'model': f"cascade:{Path(small_path).name}->{Path(large_path).name}",
+        'backend': 'cascade',
+        'images': len(samples),
+        'escalate_conf': escalate_conf,
+        'min_coverage': min_coverage,
+        'escalation_rate': report['escalation_rate'],
+        'escalation_reasons': json.dumps(report['reasons']),
+        'small_latency_mean_ms': float(np.mean(small_ms)),
+        'large_latency_mean_ms': float(np.mean(large_ms)),
+        'cascade_latency_mean_ms': float(np.mean(cascade_ms)),
+        'cascade_latency_p90_ms': float(np.percentile(cascade_ms, 90)),
+        'speedup_vs_large': float(np.mean(large_ms) / np.mean(cascade_ms))
+    }
+    scores = {tier: detection_scores(tier_counts) for tier, tier_counts in counts.items()}
+    for tier, tier_scores in scores.items():
+        for metric, value in tier_scores.items():
+            row[f'{tier}_{metric}@50'] = value
+    for metric in ('precision', 'recall', 'f1'):
+        row[f'delta_{metric}@50'] = scores['cascade'][metric] - scores['large'][metric]
+    return row
+
+
+# 학습 결과(runs/)와 데이터셋(yolo_dataset/)이 있는 폴더 - VGFD_ROOT 환경 변수가 없으면 이 스크립트가 있는 폴더
+VGFD_ROOT = Path(os.getenv("VGFD_ROOT", Path(__file__).resolve().parent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 체크포인트 정확도/속도 벤치마크")
+    parser.add_argument('checkpoints', nargs='*', help="평가할 모델 경로 (.pt, .onnx, ...)")
+    parser.add_argument('--weights-dir', default=str(VGFD_ROOT / "runs/detect/train/weights"))
+    parser.add_argument('--data', default=str(VGFD_ROOT / "yolo_dataset/dataset.yaml"))
+    parser.add_argument('--images', default=str(VGFD_ROOT / "yolo_dataset/val/images"))
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--output', default="benchmark_results")
+    parser.add_argument('--min-map50', type=float, default=0.5)
+    parser.add_argument('--cascade', nargs=2, metavar=('SMALL', 'LARGE'),
+                        help="작은 모델 -> 큰 모델 캐스케이드 평가 (같은 클래스로 학습된 두 모델)")
+    parser.add_argument('--escalate-conf', type=float, default=0.5)
+    parser.add_argument('--min-coverage', type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.cascade:
+        row = profile_cascade(args.cascade[0], args.cascade[1], args.data, imgsz=args.imgsz,
+                              escalate_conf=args.escalate_conf, min_coverage=args.min_coverage)
+        if row is None:
+            return
+        paths = write_report([row], args.output, prefix='cascade')
+        print("\n=== Cascade Evaluation ===")
+        for key, value in row.items():
+            print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+        print(f"\nSaved to {paths['summary']}")
+        return
+
+    # 경로를 지정하지 않으면 best.pt, last.pt 비교
+    checkpoints = args.checkpoints or [
+        os.path.join(args.weights_dir, "best.pt"),
+        os.path.join(args.weights_dir, "last.pt")
+    ]
+
+    rows = run_benchmark(checkpoints, args.data, args.images, imgsz=args.imgsz,
+                         batch_sizes=tuple(args.batch_sizes), runs=args.runs)
+    if not rows:
+        print("No results.")
+        return
+
+    paths = write_report(rows, args.output)
+
+    print("\n=== Model Performance Comparison ===")
+    print(pd.read_csv(paths['summary']).set_index('model'))
+
+    best = select_fastest(rows, args.min_map50)
+    if best:
+        print(f"\nFastest model with mAP@50 >= {args.min_map50}: {best['model']} "
+              f"({best['latency_p50_ms']:.1f} ms p50)")
+    else:
+        print(f"\nNo model meets mAP@50 >= {args.min_map50}")
+
+
+if __name__ == "__main__":
+    main()
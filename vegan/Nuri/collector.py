@@ -0,0 +1,134 @@
+import argparse
+import json
+import re
+import time
+import requests
+
+# name{labels} value
+METRIC_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """
+    Prometheus 텍스트 형식 파싱
+    :return: [(이름, {레이블}, 값)]
+    """
+    samples = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = METRIC_LINE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        labels = dict(LABEL_PAIR.findall(labels or ""))
+        samples.append((name, labels, float(value)))
+    return samples
+
+
+def histogram_quantile(quantile, buckets):
+    """
+    구간별 누적 개수로 분위수 추정 (구간 안에서는 선형 보간, Prometheus histogram_quantile과 같은 방식)
+    :param buckets: [(상한, 누적 개수)] - 상한 오름차순, 마지막은 +Inf
+    """
+    total = buckets[-1][1] if buckets else 0
+    if total == 0:
+        return None
+    rank = quantile * total
+    prev_bound, prev_count = 0.0, 0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def summarize_histograms(samples, name, label):
+    """히스토그램 하나를 레이블 값별 {count, mean_ms, p50_ms, p95_ms}로 요약"""
+    buckets, sums, counts = {}, {}, {}
+    for sample_name, labels, value in samples:
+        key = labels.get(label, "")
+        if sample_name == f"{name}_bucket":
+            buckets.setdefault(key, []).append((float(labels["le"]), value))
+        elif sample_name == f"{name}_sum":
+            sums[key] = value
+        elif sample_name == f"{name}_count":
+            counts[key] = value
+
+    summary = {}
+    for key, points in buckets.items():
+        points.sort()
+        count = counts.get(key, 0)
+        p50, p95 = histogram_quantile(0.5, points), histogram_quantile(0.95, points)
+        summary[key] = {
+            "count": int(count),
+            "mean_ms": sums.get(key, 0) / count * 1000 if count else None,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None
+        }
+    return summary
+
+
+def scrape(url, timeout=5):
+    response = requests.get(f"{url.rstrip('/')}/metrics", timeout=timeout)
+    response.raise_for_status()
+    return parse_metrics(response.text)
+
+
+def print_snapshot(samples):
+    gauges = {name: value for name, labels, value in samples if not labels}
+    print(f"\n=== {time.strftime('%H:%M:%S')} ===")
+    print(f"model loaded={int(gauges.get('detection_model_loaded', 0))} "
+          f"warmed_up={int(gauges.get('detection_model_warmed_up', 0))} "
+          f"in_flight={int(gauges.get('detection_in_flight_requests', 0))} "
+          f"queue={int(gauges.get('detection_queue_depth', 0))}")
+
+    for title, name, label in (("stage", "detection_stage_duration_seconds", "stage"),
+                               ("endpoint", "detection_request_duration_seconds", "endpoint")):
+        for key, stats in summarize_histograms(samples, name, label).items():
+            if not stats["count"]:
+                continue
+            print(f"  {title}={key:<16} n={stats['count']:<6} mean={stats['mean_ms']:7.1f}ms "
+                  f"p50={stats['p50_ms']:7.1f}ms p95={stats['p95_ms']:7.1f}ms")
+
+    statuses = {}
+    for name, labels, value in samples:
+        if name == "detection_requests_total":
+            statuses[labels.get("status")] = statuses.get(labels.get("status"), 0) + int(value)
+    if statuses:
+        print("  status " + ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="탐지 API /metrics 로컬 수집기 (Prometheus 대용)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--interval", type=float, default=5.0, help="수집 간격 (초)")
+    parser.add_argument("--count", type=int, default=0, help="수집 횟수 (0이면 계속)")
+    parser.add_argument("--output", help="수집한 값을 JSON Lines로 저장할 파일")
+    args = parser.parse_args()
+
+    scraped = 0
+    while True:
+        try:
+            samples = scrape(args.url)
+        except requests.RequestException as e:
+            print(f"수집 실패: {e}")
+        else:
+            print_snapshot(samples)
+            if args.output:
+                with open(args.output, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"time": time.time(), "samples": samples}, ensure_ascii=False) + "\n")
+
+        scraped += 1
+        if args.count and scraped >= args.count:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,28 @@
 import requests
-import json
-from pathlib import Path
+from client import FoodDetectionClient
 
-def test_food_detection(image_path):
-    # API 엔드포인트 URL
-    url = "http://127.0.0.1:8000/predict"
-    
-    # 이미지 파일 열기
-    with open(image_path, "rb") as image_file:
-        # 멀티파트 폼 데이터로 파일 전송
-        files = {"file": (Path(image_path).name, image_file, "image/jpeg")}
-        
-        # API 호출
-        response = requests.post(url, files=files)
+def test_food_detection(image_path, client):
+    # API 호출
+    try:
+        result = client.detect(image_path)
+    except requests.HTTPError as e:
+        print(f"Error: {e.response.status_code}")
+        print(e.response.text)
+        return
+    except requests.RequestException as e:
+        print(f"Error: {e}")
+        return
         
     # 응답 확인
-    if response.status_code == 200:
-        result = response.json()
-        print("\n=== 감지된 음식 ===")
-        for detection in result["detections"]:
-            print(f"음식명: {detection['class_name']}")
-            print(f"신뢰도: {detection['confidence']:.2f}")
-            print("-" * 20)
-    else:
-        print(f"Error: {response.status_code}")
-        print(response.text)
+    print("\n=== 감지된 음식 ===")
+    for detection in result["detections"]:
+        print(f"음식명: {detection['class_name']}")
+        print(f"신뢰도: {detection['confidence']:.2f}")
+        print("-" * 20)
 
 if __name__ == "__main__":
     # 테스트할 이미지 경로
     image_path = "testimage.jpg"  # 실제 이미지 경로로 수정하세요
-    test_food_detection(image_path)
\ No newline at end of file
+    # API 클라이언트 (연결 풀, 타임아웃, 재시도 포함) - with 블록이 끝나면 연결을 닫는다
+    with FoodDetectionClient("http://127.0.0.1:8000") as client:
+        test_food_detection(image_path, client)
\ No newline at end of file
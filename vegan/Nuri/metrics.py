@@ -0,0 +1,264 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 기본 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values)) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, label_names=(), callback=None):
+        """
+        누적 카운터
+        :param callback: 다른 곳에서 세고 있는 값을 읽을 때 - {레이블 값 튜플: 숫자}
+        """
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.callback = callback
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = self.callback() if self.callback is not None else self.values
+            for key, value in sorted(values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help, label_names=(), callback=None):
+        """
+        현재 값
+        :param callback: 값을 읽을 때 호출 - 레이블이 없으면 숫자, 있으면 {레이블 값 튜플: 숫자}
+        """
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.callback = callback
+        self.values = {}
+
+    def set(self, value, **labels):
+        self.values[tuple(labels.get(name, "") for name in self.label_names)] = value
+
+    def render(self):
+        values = self.values
+        if self.callback is not None:
+            result = self.callback()
+            values = result if isinstance(result, dict) else {(): result}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, label_names=(), buckets=DEFAULT_BUCKETS):
+        """구간별 누적 개수 + 합계 + 개수 (Prometheus histogram)"""
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    labels = _format_labels(self.label_names, key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {total!r}")
+                lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """메트릭 모음 - render()로 Prometheus 텍스트 형식 출력"""
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, label_names=(), callback=None):
+        return self._add(Counter(name, help, label_names, callback))
+
+    def gauge(self, name, help, label_names=(), callback=None):
+        return self._add(Gauge(name, help, label_names, callback))
+
+    def histogram(self, name, help, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, label_names, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class Trace:
+    def __init__(self, name, stage_histogram=None):
+        """
+        요청 하나의 추적 정보 (단계별 span)
+        :param stage_histogram: span이 끝날 때마다 stage 레이블로 시간을 기록할 히스토그램
+        """
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.stage_histogram = stage_histogram
+        self.spans = []
+        self.attributes = {}
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def add_span(self, name, duration_ms, start_ms=None, **attributes):
+        """직접 측정한 시간으로 span 추가 (예: 전처리기가 돌려준 단계별 시간, start_ms가 없으면 지금 끝난 것으로 봄)"""
+        if start_ms is None:
+            start_ms = self.elapsed_ms() - duration_ms
+        self.spans.append({"name": name, "start_ms": round(start_ms, 3), "duration_ms": round(duration_ms, 3),
+                           "attributes": attributes})
+        if self.stage_histogram is not None:
+            self.stage_histogram.observe(duration_ms / 1000, stage=name)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """with trace.span("inference"): ... - 블록 실행 시간을 span으로 기록"""
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            end = time.perf_counter()
+            self.add_span(name, (end - start) * 1000, (start - self._start) * 1000, **attributes)
+
+    def to_dict(self, status=None):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.elapsed_ms(), 3),
+            "status": status,
+            "attributes": self.attributes,
+            "spans": self.spans
+        }
+
+
+class NullTrace:
+    """추적하지 않을 때 사용하는 빈 Trace"""
+    spans = []
+    attributes = {}
+
+    def elapsed_ms(self):
+        return 0.0
+
+    def add_span(self, name, duration_ms, start_ms=None, **attributes):
+        pass
+
+    @contextmanager
+    def span(self, name, **attributes):
+        yield attributes
+
+
+NULL_TRACE = NullTrace()
+
+
+class Tracer:
+    def __init__(self, stage_histogram=None, keep=200, export_path=None):
+        """
+        요청 추적 관리
+        최근 keep개의 추적을 메모리에 두고, export_path가 있으면 끝난 추적을 한 줄씩 JSON으로 추가한다
+        (collector.py 같은 로컬 수집기가 읽어 갈 수 있음).
+        """
+        self.stage_histogram = stage_histogram
+        self.export_path = export_path
+        self.recent_traces = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def start(self, name):
+        return Trace(name, self.stage_histogram)
+
+    def finish(self, trace, status=None):
+        record = trace.to_dict(status)
+        with self._lock:
+            self.recent_traces.append(record)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    def recent(self, limit=20):
+        with self._lock:
+            return list(self.recent_traces)[-limit:]
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app, request_counter, latency_histogram, paths):
+        """
+        요청 수(엔드포인트, 상태 코드)와 전체 처리 시간을 기록하는 ASGI 미들웨어
+        다른 미들웨어가 본문을 읽기 전에 거절한 요청(413, 429)도 함께 센다.
+        :param paths: 기록할 경로 목록
+        """
+        self.app = app
+        self.request_counter = request_counter
+        self.latency_histogram = latency_histogram
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+        if scope["type"] != "http" or path not in self.paths:
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+        start = time.perf_counter()
+
+        async def tracked_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracked_send)
+        finally:
+            self.latency_histogram.observe(time.perf_counter() - start, endpoint=path)
+            self.request_counter.inc(endpoint=path, status=str(status["code"]))
@@ -1,21 +1,21 @@
 import requests
+from client import FoodDetectionClient
 
-def detect_food(image_path, api_url="http://localhost:8000/predict"):
-    # 이미지 파일 열기
-    with open(image_path, "rb") as f:
-        files = {"file": f}
-        # API 호출
-        response = requests.post(api_url, files=files)
-    
-    if response.status_code == 200:
-        results = response.json()
-        # 결과 출력
-        for detection in results["detections"]:
-            print(f"음식: {detection['class_name']}")
-            print(f"확률: {detection['confidence']:.2f}")
-            print("---")
-    else:
-        print("Error:", response.status_code)
+# 연결을 재사용하도록 클라이언트를 한 번만 생성
+client = FoodDetectionClient("http://localhost:8000")
+
+def detect_food(image_path):
+    try:
+        results = client.detect(image_path)
+    except requests.RequestException as e:
+        print("Error:", e)
+        return
+
+    # 결과 출력
+    for detection in results["detections"]:
+        print(f"음식: {detection['class_name']}")
+        print(f"확률: {detection['confidence']:.2f}")
+        print("---")
 
 # 사용 예시
-detect_food("test_meal.jpg")
\ No newline at end of file
+detect_food("test_meal.jpg")
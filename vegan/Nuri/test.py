@@ -27,10 +27,10 @@ def evaluate_model(model_path, data_yaml, test_images):
     
     # 주요 성능 지표 출력
     results = {
-        'Precision': metrics.box.map_precision,
-        'Recall': metrics.box.map_recall,
-        'mAP@50': metrics.map50,
-        'mAP@50-95': metrics.map
+        'Precision': metrics.box.mp,
+        'Recall': metrics.box.mr,
+        'mAP@50': metrics.box.map50,
+        'mAP@50-95': metrics.box.map
     }
     
     return results
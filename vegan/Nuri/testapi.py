@@ -1,15 +1,110 @@
-from fastapi import FastAPI, File, UploadFile
+from warmup import configure_threads, warmup_model, summarize_warmup
+# numpy/torch/cv2를 불러오기 전에 CPU 구성에 맞춰 추론 스레드 수 설정 (OMP/MKL 환경 변수가 적용되도록 가장 먼저)
+THREAD_CONFIG = configure_threads()
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Header
+from fastapi.responses import Response, JSONResponse, PlainTextResponse
+from typing import List
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from ultralytics import YOLO
 import cv2
 import numpy as np
-from PIL import Image
-import io
+from PIL import Image, UnidentifiedImageError
+import os
 import json
+import time
+import threading
+from contextlib import contextmanager
+from preprocess import ImagePreprocessor
+from detections import Detections, to_arrow_ipc, to_msgpack, ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+from admission import AdmissionController, Deadline, UploadLimitMiddleware, sniff_image
+from metrics import MetricsRegistry, Tracer, RequestMetricsMiddleware, NULL_TRACE
+
+# 응답 형식: json(기존 dict 목록), columns(열 단위 JSON), arrow(Arrow IPC), msgpack
+RESPONSE_FORMATS = ("json", "columns", "arrow", "msgpack")
+
+# 업로드/부하 제한 (환경 변수로 조정)
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "10"))           # 이미지 한 장 최대 크기
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "16"))       # 배치 요청 최대 이미지 수
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "4"))            # 동시에 처리하는 요청 수
+MAX_WAITING = int(os.getenv("MAX_WAITING", "16"))               # 슬롯을 기다릴 수 있는 요청 수
+REQUEST_TIMEOUT_S = float(os.getenv("REQUEST_TIMEOUT_S", "10"))  # 요청당 최대 처리 시간
+MAX_UPLOAD_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+MULTIPART_OVERHEAD = 64 * 1024
+
+# 압축 폭탄 방지: 디코딩할 최대 픽셀 수
+Image.MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "50000000"))
+
+admission = AdmissionController(max_in_flight=MAX_IN_FLIGHT, max_waiting=MAX_WAITING)
+
+MODEL_PATH = os.getenv("MODEL_PATH", "./best.pt")
+IMGSZ = int(os.getenv("IMGSZ", "640"))
+# 워밍업할 입력 크기/배치 크기 (쉼표로 구분)
+WARMUP_IMGSZ = [int(v) for v in os.getenv("WARMUP_IMGSZ", str(IMGSZ)).split(",") if v.strip()]
+WARMUP_BATCH = [int(v) for v in os.getenv("WARMUP_BATCH", "1,4").split(",") if v.strip()]
+
+# 모델 상태 (/ready, /metrics에서 사용)
+model = None
+model_state = {"loaded": False, "warmed_up": False, "load_seconds": None, "warmup_ms": None, "error": None,
+               "threads": THREAD_CONFIG, "warmup": {}}
+warmup_report = []
+
+# 메트릭 (/metrics, Prometheus 텍스트 형식)
+registry = MetricsRegistry()
+REQUEST_COUNT = registry.counter("detection_requests_total", "Requests by endpoint and status code",
+                                 ("endpoint", "status"))
+REQUEST_LATENCY = registry.histogram("detection_request_duration_seconds", "End-to-end request latency",
+                                     ("endpoint",))
+STAGE_LATENCY = registry.histogram("detection_stage_duration_seconds",
+                                   "Per-stage latency (decode, preprocess, inference, postprocess, serialize)",
+                                   ("stage",))
+IMAGES_PROCESSED = registry.counter("detection_images_total", "Images run through the model")
+OBJECTS_DETECTED = registry.counter("detection_objects_total", "Objects detected")
+registry.gauge("detection_model_loaded", "1 if the model is loaded", callback=lambda: int(model_state["loaded"]))
+registry.gauge("detection_model_warmed_up", "1 if the model finished warm-up",
+               callback=lambda: int(model_state["warmed_up"]))
+registry.gauge("detection_model_load_seconds", "Model load time",
+               callback=lambda: model_state["load_seconds"] or 0.0)
+registry.gauge("detection_warmup_latency_ms", "Warm-up latency per input shape (first run = cold, median of later runs = warm)",
+               ("imgsz", "batch", "shape", "phase"),
+               callback=lambda: {
+                   key: value
+                   for row in warmup_report
+                   for key, value in (((str(row["imgsz"]), str(row["batch"]), row["shape"], "cold"), row["cold_ms"]),
+                                      ((str(row["imgsz"]), str(row["batch"]), row["shape"], "warm"), row["warm_ms"]))
+               })
+registry.gauge("detection_inference_threads", "CPU threads used for inference",
+               callback=lambda: THREAD_CONFIG["intra"])
+registry.gauge("detection_in_flight_requests", "Requests holding a processing slot",
+               callback=lambda: admission.in_flight)
+registry.gauge("detection_queue_depth", "Requests waiting for a processing slot",
+               callback=lambda: admission.waiting)
+registry.counter("detection_admission_events_total", "Admission decisions (admitted, rejected_429, rejected_503, deadline_504)",
+                 ("event",), callback=lambda: {(event,): count for event, count in admission.stats.items()})
+
+# 요청 추적 - TRACE_EXPORT_PATH를 지정하면 끝난 추적을 JSON Lines로 내보냄 (collector.py로 확인)
+tracer = Tracer(STAGE_LATENCY, export_path=os.getenv("TRACE_EXPORT_PATH"))
 
 app = FastAPI()
 
+# 본문을 끝까지 읽기 전에 크기 제한과 과부하를 확인 (업로드 파트는 Starlette가 1MB 이상이면 디스크로 스풀)
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/predict": MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD,
+        "/predict/batch": (MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD) * MAX_BATCH_FILES
+    },
+    admission=admission
+)
+
+# 요청 수/전체 처리 시간 (크기 제한, 과부하로 거절된 요청 포함)
+app.add_middleware(
+    RequestMetricsMiddleware,
+    request_counter=REQUEST_COUNT,
+    latency_histogram=REQUEST_LATENCY,
+    paths=("/predict", "/predict/batch")
+)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -21,50 +116,225 @@ app.add_middleware(
 
 # 모델 로드
 class FoodDetectionModel:
-    def __init__(self, model_path="best.pt"):
+    def __init__(self, model_path="best.pt", imgsz=640):
         self.model = YOLO(model_path)
         self.class_names = self.model.names  # 클래스 이름 로드
+        self.imgsz = imgsz
         
-    def predict(self, image):
-        results = self.model.predict(image, conf=0.25)
-        
-        detections = []
-        for r in results:
-            boxes = r.boxes
-            for box in boxes:
-                b = box.xyxy[0].cpu().numpy()
-                c = box.cls.cpu().numpy()
-                conf = box.conf.cpu().numpy()
-                
-                detections.append({
-                    "bbox": b.tolist(),
-                    "class": int(c.item()),
-                    "class_name": self.class_names[int(c.item())],
-                    "confidence": float(conf.item())
-                })
-                
-        return detections
-
-# 모델 인스턴스 생성
-model = FoodDetectionModel("./best.pt")
+    def predict(self, image, scale=1.0, trace=NULL_TRACE):
+        # image: 전처리된 BGR 배열, scale: 원본 좌표로 되돌리기 위한 배율
+        return self.predict_batch([image], [scale], trace)[0]
+
+    def predict_batch(self, images, scales, trace=NULL_TRACE):
+        # 여러 이미지를 한 번의 추론으로 처리, 이미지별 Detections(열 단위 결과) 반환
+        with trace.span("inference", images=len(images)):
+            results = self.model.predict(images, conf=0.25, imgsz=self.imgsz, verbose=False)
+        with trace.span("postprocess"):
+            return Detections.from_results(results, scales, self.class_names)
+
+    def warmup(self, imgsz_list, batch_sizes):
+        # 첫 추론은 커널 선택, 메모리 할당 때문에 느리므로 사용하는 입력 크기/배치 크기별로 미리 실행
+        return warmup_model(
+            lambda images, imgsz: self.model.predict(images, conf=0.25, imgsz=imgsz, verbose=False),
+            imgsz_list, batch_sizes
+        )
+
+def load_model():
+    """모델을 불러오고 워밍업 (서버 시작 시 백그라운드 스레드에서 실행)"""
+    global model
+    try:
+        start = time.perf_counter()
+        loaded = FoodDetectionModel(MODEL_PATH, imgsz=IMGSZ)
+        model_state["load_seconds"] = time.perf_counter() - start
+        model = loaded
+        model_state["loaded"] = True
+
+        start = time.perf_counter()
+        warmup_report.extend(loaded.warmup(WARMUP_IMGSZ, WARMUP_BATCH))
+        model_state["warmup_ms"] = (time.perf_counter() - start) * 1000
+        model_state["warmup"] = summarize_warmup(warmup_report)
+        model_state["warmed_up"] = True
+    except Exception as e:
+        model_state["error"] = str(e)
+        print(f"모델 로드 실패: {e}")
+
+def require_model():
+    # 워밍업이 끝나기 전에는 503 (로드밸런서는 /ready로 확인)
+    if not model_state["warmed_up"]:
+        raise HTTPException(status_code=503, detail="모델을 준비하는 중입니다.", headers={"Retry-After": "5"})
+
+@contextmanager
+def traced(name):
+    """요청 하나를 추적 (끝나면 상태 코드와 함께 기록)"""
+    trace = tracer.start(name)
+    status = 500
+    try:
+        yield trace
+        status = 200
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    finally:
+        tracer.finish(trace, status)
+
+def build_response(batch_detections, infos, format, batch=False):
+    """
+    요청한 형식으로 응답 생성
+    arrow/msgpack은 선택 의존성(pyarrow, msgpack)이 설치되어 있어야 한다.
+    """
+    try:
+        if format == "arrow":
+            content = to_arrow_ipc(batch_detections, {"status": ["success"] * len(infos),
+                                                      "preprocess_ms": [info["timings"] for info in infos]})
+            return Response(content=content, media_type=ARROW_MEDIA_TYPE)
+
+        if format == "msgpack":
+            results = [
+                {"status": "success", "detections": d.to_msgpack_dict(), "preprocess_ms": info["timings"]}
+                for d, info in zip(batch_detections, infos)
+            ]
+            payload = {"status": "success", "results": results} if batch else results[0]
+            return Response(content=to_msgpack(payload), media_type=MSGPACK_MEDIA_TYPE)
+    except ImportError as e:
+        raise HTTPException(status_code=406, detail=f"{format} 형식을 사용할 수 없습니다: {e}")
+
+    serialize = Detections.to_columns if format == "columns" else Detections.to_dicts
+    results = [
+        {"status": "success", "detections": serialize(d), "preprocess_ms": info["timings"]}
+        for d, info in zip(batch_detections, infos)
+    ]
+    # JSON 인코딩까지 여기서 끝내야 serialize 구간에 포함된다
+    return JSONResponse(content={"status": "success", "results": results} if batch else results[0])
+
+def check_format(format):
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format은 {', '.join(RESPONSE_FORMATS)} 중 하나여야 합니다.")
+
+def request_deadline(timeout_ms=None):
+    """요청 마감 시간 (클라이언트가 X-Timeout-Ms로 더 짧게 지정할 수 있음)"""
+    seconds = REQUEST_TIMEOUT_S
+    if timeout_ms:
+        seconds = min(seconds, max(timeout_ms, 1) / 1000)
+    return Deadline(seconds)
+
+async def open_upload(file):
+    """
+    업로드 파일 검사 (Content-Type, 매직 바이트, 크기) 후 스풀 파일 객체를 반환
+    내용 전체를 bytes로 읽지 않고 PIL이 파일 객체에서 직접 디코딩한다.
+    """
+    if file.content_type and not file.content_type.startswith(("image/", "application/octet-stream")):
+        raise HTTPException(status_code=415, detail=f"이미지 파일만 업로드할 수 있습니다: {file.content_type}")
+
+    head = await file.read(16)
+    if sniff_image(head) is None:
+        raise HTTPException(status_code=415, detail=f"지원하지 않는 이미지 형식입니다: {file.filename}")
+
+    size = getattr(file, "size", None)
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+    if size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"이미지 크기는 {MAX_UPLOAD_MB}MB 이하여야 합니다: {file.filename}")
+
+    await file.seek(0)
+    return file.file
+
+def decode_image(stream, trace=NULL_TRACE):
+    # 손상되었거나 너무 큰 이미지는 4xx로 응답
+    try:
+        image, info = preprocessor(stream)
+    except Image.DecompressionBombError:
+        raise HTTPException(status_code=413, detail="이미지 해상도가 너무 큽니다.")
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise HTTPException(status_code=415, detail=f"이미지를 읽을 수 없습니다: {e}")
+    except ValueError:
+        # 마감(504)으로 응답이 먼저 나가면 FastAPI가 업로드 파일을 닫는다 - 남아 있던 디코딩 작업은 여기서 끝냄
+        if getattr(stream, "closed", False):
+            raise HTTPException(status_code=504, detail="요청이 끝나 업로드 파일이 닫혔습니다.")
+        raise
+
+    # 전처리기가 잰 단계별 시간을 span으로 기록 (decode -> normalize/resize/convert)
+    timings = info["timings"]
+    preprocess_ms = timings["normalize"] + timings["resize"] + timings["convert"]
+    trace.add_span("decode", timings["decode"], trace.elapsed_ms() - preprocess_ms - timings["decode"])
+    trace.add_span("preprocess", preprocess_ms)
+    return image, info
+
+# 모델은 서버가 뜬 뒤 백그라운드에서 로드 (그동안 /health는 응답하고 /ready는 503)
+preprocessor = ImagePreprocessor(imgsz=IMGSZ)
+
+@app.on_event("startup")
+async def start_model_loading():
+    threading.Thread(target=load_model, daemon=True).start()
 
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)):
-    # 이미지 읽기
-    contents = await file.read()
-    image = Image.open(io.BytesIO(contents))
-    
-    # 예측 수행
-    detections = model.predict(image)
-    
-    return {
-        "status": "success",
-        "detections": detections
-    }
+async def predict(file: UploadFile = File(...), format: str = Query("json"),
+                  x_timeout_ms: int = Header(None)):
+    check_format(format)
+    require_model()
+    deadline = request_deadline(x_timeout_ms)
+    stream = await open_upload(file)
+
+    with traced("/predict") as trace:
+        async with admission.slot(deadline) as slot:
+            # 이미지 읽기 (스레드 풀에서 실행하여 이벤트 루프를 막지 않음)
+            image, info = await slot.run(decode_image, stream, trace, stage="decode")
+
+            # 예측 수행
+            detections = await slot.run(model.predict, image, info["scale"], trace, stage="inference")
+
+        IMAGES_PROCESSED.inc()
+        OBJECTS_DETECTED.inc(len(detections))
+        with trace.span("serialize", format=format):
+            return build_response([detections], [info], format)
+
+@app.post("/predict/batch")
+async def predict_batch(files: List[UploadFile] = File(...), format: str = Query("json"),
+                        x_timeout_ms: int = Header(None)):
+    check_format(format)
+    require_model()
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {MAX_BATCH_FILES}장까지 보낼 수 있습니다.")
+    deadline = request_deadline(x_timeout_ms)
+    streams = [await open_upload(file) for file in files]
+
+    # 여러 이미지를 받아 한 번에 추론
+    with traced("/predict/batch") as trace:
+        trace.attributes["images"] = len(streams)
+        async with admission.slot(deadline) as slot:
+            images, infos = [], []
+            for stream in streams:
+                image, info = await slot.run(decode_image, stream, trace, stage="decode")
+                images.append(image)
+                infos.append(info)
+
+            batch_detections = await slot.run(model.predict_batch, images, [info["scale"] for info in infos],
+                                              trace, stage="inference")
+
+        IMAGES_PROCESSED.inc(len(images))
+        OBJECTS_DETECTED.inc(sum(len(d) for d in batch_detections))
+        with trace.span("serialize", format=format):
+            return build_response(batch_detections, infos, format, batch=True)
 
 @app.get("/health")
 async def health_check():
+    # 프로세스가 살아 있는지만 확인 (liveness)
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    # 모델 로드와 워밍업이 끝났는지 확인 (readiness)
+    body = {"status": "ready" if model_state["warmed_up"] else "not_ready", **model_state,
+            "in_flight": admission.in_flight, "queue_depth": admission.waiting}
+    return JSONResponse(content=body, status_code=200 if model_state["warmed_up"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/traces")
+async def recent_traces(limit: int = Query(20, ge=1, le=200)):
+    # 최근 요청의 단계별 span
+    return {"traces": tracer.recent(limit)}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+
+
+def documents_fingerprint(documents):
+    """검색된 문서 목록의 지문 (출처, 페이지, 내용이 같으면 같은 값)"""
+    digest = hashlib.sha1()
+    for doc in documents:
+        metadata = getattr(doc, "metadata", None) or {}
+        digest.update(str(metadata.get("source", "")).encode("utf-8"))
+        digest.update(str(metadata.get("page", "")).encode("utf-8"))
+        digest.update(getattr(doc, "page_content", str(doc)).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def index_version(faiss_file_path):
+    """저장된 FAISS 인덱스 파일의 크기와 수정 시각으로 만든 버전 (파일이 없으면 None)"""
+    parts = []
+    for name in ("index.faiss", "index.pkl"):
+        path = os.path.join(faiss_file_path, name)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold=0.95, ttl_seconds=24 * 60 * 60, max_entries=500):
+        """
+        질문 임베딩 기반 답변 캐시
+        이전에 답한 질문과 코사인 유사도가 threshold 이상이고, 검색된 문서 지문이 같으면 저장된 답변을 돌려준다.
+        :param threshold: 같은 질문으로 볼 최소 코사인 유사도
+        :param ttl_seconds: 답변 보관 시간 (초)
+        :param max_entries: 최대 보관 개수 (넘으면 오래된 답변부터 삭제)
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.index_version = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._entries = []
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "expired": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _drop(self, keep):
+        """keep(불리언 배열)가 True인 답변만 남김 (잠금 안에서 호출)"""
+        self._entries = [entry for entry, kept in zip(self._entries, keep) if kept]
+        self._vectors = self._vectors[np.asarray(keep, dtype=bool)]
+
+    def set_index_version(self, version):
+        """인덱스가 바뀌면 (다시 만들거나 문서가 바뀐 경우) 저장된 답변을 모두 버림"""
+        with self._lock:
+            if version == self.index_version:
+                return
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self.index_version = version
+            self._entries = []
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+
+    def lookup(self, question_vector, fingerprint):
+        """
+        비슷한 질문의 답변 찾기
+        :return: (답변, 유사도) 또는 (None, 최고 유사도)
+        """
+        query = self._normalize(question_vector)
+        now = time.time()
+        with self._lock:
+            self.stats["lookups"] += 1
+            if self._entries:
+                alive = np.array([now - entry["created"] < self.ttl_seconds for entry in self._entries])
+                if not alive.all():
+                    self.stats["expired"] += int((~alive).sum())
+                    self._drop(alive)
+
+            if not self._entries:
+                self.stats["misses"] += 1
+                return None, 0.0
+
+            scores = self._vectors @ query
+            same_docs = np.array([entry["fingerprint"] == fingerprint for entry in self._entries])
+            candidates = np.where(same_docs, scores, -1.0)
+            best = int(np.argmax(candidates))
+            score = float(candidates[best])
+            if score >= self.threshold:
+                self.stats["hits"] += 1
+                self._entries[best]["hits"] += 1
+                return self._entries[best]["answer"], score
+
+            self.stats["misses"] += 1
+            return None, float(scores.max())
+
+    def store(self, question, question_vector, fingerprint, answer):
+        """새 답변 저장"""
+        vector = self._normalize(question_vector)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                keep = np.ones(len(self._entries), dtype=bool)
+                keep[:len(self._entries) - self.max_entries + 1] = False
+                self._drop(keep)
+
+            self._entries.append({
+                "question": question,
+                "fingerprint": fingerprint,
+                "answer": answer,
+                "created": time.time(),
+                "hits": 0
+            })
+            if self._vectors.size == 0:
+                self._vectors = vector[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+
+    def clear(self):
+        """저장된 답변 모두 삭제 (통계는 유지)"""
+        with self._lock:
+            self._entries = []
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+
+    @property
+    def size(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["lookups"]
+        return self.stats["hits"] / lookups if lookups else 0.0
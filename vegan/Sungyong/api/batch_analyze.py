@@ -0,0 +1,302 @@
+import os
+import csv
+import json
+import argparse
+import time
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import pandas as pd
+from ultralytics import YOLO
+from preprocess import ImagePreprocessor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+# FDDB 컬럼 -> 결과 컬럼
+NUTRIENT_COLUMNS = {
+    '에너지(kcal)': 'Calories',
+    '단백질(g)': 'Protein',
+    '탄수화물(g)': 'Carbs',
+    '지방(g)': 'Fat',
+    '철(mg)': 'Iron',
+    '칼슘(mg)': 'Calc'
+}
+
+RESULT_COLUMNS = ['path', 'date', 'meal', 'status', 'num_items', 'foods'] + list(NUTRIENT_COLUMNS.values())
+
+
+def iter_inputs(source):
+    """
+    디렉토리 또는 매니페스트(CSV/JSONL)에서 분석할 이미지 목록을 만드는 함수
+    매니페스트에는 path 컬럼이 필수이고 date, meal 컬럼은 선택이다.
+    :return: [{"path": ..., "date": ..., "meal": ...}, ...]
+    """
+    source = Path(source)
+    if source.is_dir():
+        for path in sorted(source.rglob('*')):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield {"path": str(path), "date": None, "meal": None}
+        return
+
+    if source.suffix.lower() == '.jsonl':
+        with open(source, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        records = pd.read_csv(source).to_dict('records')
+
+    base_dir = source.parent
+    for record in records:
+        path = Path(record['path'])
+        if not path.is_absolute():
+            path = base_dir / path
+        # CSV의 빈 칸(NaN)은 None으로
+        date, meal = record.get('date'), record.get('meal')
+        yield {"path": str(path), "date": None if pd.isna(date) else date, "meal": None if pd.isna(meal) else meal}
+
+
+class ResultWriter:
+    def __init__(self, output_path):
+        """
+        분석 결과를 CSV, JSONL, Parquet 중 하나로 스트리밍 저장하는 클래스
+        처리한 경로는 <output>.done 파일에 기록하여 중단된 작업을 이어서 실행할 수 있다.
+        :param output_path: 출력 파일 경로 (확장자로 형식 결정)
+        """
+        self.output_path = Path(output_path)
+        self.format = self.output_path.suffix.lower().lstrip('.')
+        if self.format not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"지원하지 않는 출력 형식입니다: {self.output_path.suffix}")
+        self.done_path = self.output_path.with_name(self.output_path.name + '.done')
+        self._file = None
+        self._writer = None
+        self._done = None
+
+    def output_files(self):
+        """기존 출력 파일 목록 (Parquet는 재실행 때 만든 part 파일 포함)"""
+        files = [self.output_path] if self.output_path.exists() else []
+        if self.format == 'parquet':
+            files += sorted(self.output_path.parent.glob(f"{self.output_path.stem}-part*.parquet"))
+        return files
+
+    def processed_paths(self):
+        """이전 실행에서 처리가 끝난 이미지 경로 집합"""
+        if not self.done_path.exists():
+            return set()
+        with open(self.done_path, encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def open(self):
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._done = open(self.done_path, 'a', encoding='utf-8')
+
+        if self.format == 'csv':
+            exists = self.output_path.exists() and self.output_path.stat().st_size > 0
+            self._file = open(self.output_path, 'a', newline='', encoding='utf-8-sig' if not exists else 'utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS)
+            if not exists:
+                self._writer.writeheader()
+        elif self.format == 'jsonl':
+            self._file = open(self.output_path, 'a', encoding='utf-8')
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # Parquet 파일은 이어쓰기가 안 되므로 재실행 시 part 파일을 추가로 만든다
+            path = self.output_path
+            part = 1
+            while path.exists():
+                path = self.output_path.with_name(f"{self.output_path.stem}-part{part}.parquet")
+                part += 1
+            self._schema = pa.schema(
+                [(name, pa.string()) for name in RESULT_COLUMNS[:4]]
+                + [('num_items', pa.int32()), ('foods', pa.string())]
+                + [(name, pa.float64()) for name in NUTRIENT_COLUMNS.values()]
+            )
+            self._writer = pq.ParquetWriter(str(path), self._schema)
+        return self
+
+    def write(self, rows):
+        """한 배치의 결과를 저장하고 처리 완료 목록을 갱신"""
+        if not rows:
+            return
+        if self.format == 'csv':
+            self._writer.writerows(rows)
+            self._file.flush()
+        elif self.format == 'jsonl':
+            for row in rows:
+                self._file.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+        else:
+            import pyarrow as pa
+            columns = {name: [row.get(name) for row in rows] for name in self._schema.names}
+            for name in ('date', 'meal'):
+                columns[name] = [None if v is None else str(v) for v in columns[name]]
+            self._writer.write_table(pa.table(columns, schema=self._schema))
+
+        # 결과가 기록된 뒤에 완료 표시
+        self._done.write(''.join(row['path'] + '\n' for row in rows))
+        self._done.flush()
+
+    def close(self):
+        if self.format == 'parquet':
+            if self._writer is not None:
+                self._writer.close()
+        elif self._file is not None:
+            self._file.close()
+        if self._done is not None:
+            self._done.close()
+
+
+class BatchMealAnalyzer:
+    def __init__(self, model_path="best.pt", nutrition_data_path="FDDB.xlsx", imgsz=640, conf=0.25,
+                 batch_size=8, workers=4, prefetch=4):
+        """
+        대량의 식사 사진을 오프라인으로 분석하는 클래스
+        :param batch_size: 한 번에 추론할 이미지 수
+        :param workers: 디코딩 스레드 수
+        :param prefetch: 미리 디코딩해 둘 배치 수
+        """
+        self.model = YOLO(model_path)
+        self.preprocessor = ImagePreprocessor(imgsz=imgsz)
+        self.conf = conf
+        self.batch_size = batch_size
+        self.workers = workers
+        self.prefetch = prefetch
+
+        # 식품명별 100g 기준 영양소를 딕셔너리로 한 번만 만들어 둔다
+        nutrition_df = pd.read_excel(nutrition_data_path)
+        nutrition_df = nutrition_df.groupby('식품명').first()
+        self.nutrition = (
+            nutrition_df[list(NUTRIENT_COLUMNS)].rename(columns=NUTRIENT_COLUMNS)
+            .apply(pd.to_numeric, errors='coerce').fillna(0).to_dict('index')
+        )
+
+    def _decode(self, item):
+        try:
+            array, _ = self.preprocessor(item["path"])
+            return item, array, None
+        except Exception as e:
+            return item, None, str(e)
+
+    def _summarize(self, item, result):
+        """탐지 결과 하나를 출력 행으로 변환"""
+        boxes = result.boxes
+        classes = boxes.cls.cpu().numpy().astype(int)
+        confidences = boxes.conf.cpu().numpy()
+
+        foods = [(self.model.names[c], float(conf)) for c, conf in zip(classes, confidences)]
+        totals = dict.fromkeys(NUTRIENT_COLUMNS.values(), 0.0)
+        for name, _ in foods:
+            values = self.nutrition.get(name)
+            if values:
+                for key, value in values.items():
+                    totals[key] += value
+
+        row = {
+            "path": item["path"],
+            "date": item["date"],
+            "meal": item["meal"],
+            "status": "ok",
+            "num_items": len(foods),
+            "foods": json.dumps(foods, ensure_ascii=False)
+        }
+        row.update(totals)
+        return row
+
+    def _error_row(self, item, error):
+        row = {"path": item["path"], "date": item["date"], "meal": item["meal"],
+               "status": f"error: {error}", "num_items": 0, "foods": "[]"}
+        row.update(dict.fromkeys(NUTRIENT_COLUMNS.values(), None))
+        return row
+
+    def run(self, items, writer):
+        """
+        디코딩 스레드 풀이 다음 배치를 미리 준비하는 동안 현재 배치를 추론한다
+        :return: 처리 통계
+        """
+        stats = {"images": 0, "errors": 0, "batches": 0}
+        started = time.perf_counter()
+        items = iter(items)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+
+            def submit_batch():
+                batch = [pool.submit(self._decode, item) for _, item in zip(range(self.batch_size), items)]
+                if batch:
+                    pending.append(batch)
+                return bool(batch)
+
+            for _ in range(self.prefetch):
+                if not submit_batch():
+                    break
+
+            while pending:
+                decoded = [future.result() for future in pending.popleft()]
+                submit_batch()
+
+                rows = [self._error_row(item, error) for item, _, error in decoded if error]
+                valid = [(item, array) for item, array, error in decoded if not error]
+                if valid:
+                    try:
+                        results = self.model.predict([array for _, array in valid], conf=self.conf,
+                                                     imgsz=self.preprocessor.imgsz, verbose=False)
+                    except Exception as e:
+                        rows.extend(self._error_row(item, e) for item, _ in valid)
+                    else:
+                        # 결과 변환 오류는 해당 이미지만 오류로 기록 (같은 경로가 두 번 기록되지 않도록)
+                        for (item, _), result in zip(valid, results):
+                            try:
+                                rows.append(self._summarize(item, result))
+                            except Exception as e:
+                                rows.append(self._error_row(item, e))
+
+                writer.write(rows)
+                stats["images"] += len(rows)
+                stats["errors"] += sum(1 for row in rows if row["status"] != "ok")
+                stats["batches"] += 1
+                print(f"\r{stats['images']} images processed", end="", flush=True)
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = elapsed
+        stats["images_per_sec"] = stats["images"] / elapsed if elapsed else 0
+        print()
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="식사 사진 일괄 분석 (식단 기록 백필용)")
+    parser.add_argument('source', help="이미지 디렉토리 또는 매니페스트(.csv/.jsonl, path/date/meal 컬럼)")
+    parser.add_argument('--output', default="meal_analysis.jsonl", help="결과 파일 (.csv/.jsonl/.parquet)")
+    parser.add_argument('--model', default="best.pt")
+    parser.add_argument('--nutrition', default="FDDB.xlsx")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--conf', type=float, default=0.25)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1))
+    parser.add_argument('--no-resume', action='store_true', help="이전 진행 상황을 무시하고 처음부터 실행")
+    args = parser.parse_args()
+
+    writer = ResultWriter(args.output)
+    if args.no_resume:
+        for path in writer.output_files() + [writer.done_path]:
+            if path.exists():
+                path.unlink()
+
+    done = writer.processed_paths()
+    items = (item for item in iter_inputs(args.source) if item["path"] not in done)
+    if done:
+        print(f"Resuming: {len(done)} images already processed")
+
+    analyzer = BatchMealAnalyzer(args.model, args.nutrition, imgsz=args.imgsz, conf=args.conf,
+                                 batch_size=args.batch_size, workers=args.workers)
+    writer.open()
+    try:
+        stats = analyzer.run(items, writer)
+    finally:
+        writer.close()
+
+    print(f"Done: {stats['images']} images, {stats['errors']} errors, "
+          f"{stats['images_per_sec']:.1f} images/sec -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
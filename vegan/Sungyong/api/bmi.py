@@ -1,31 +1,13 @@
 import streamlit as st
-import os
-import pandas as pd
-
-# --- CSV 함수 임포트/정의 (위에서 소개한 함수들) ---
-def load_user_data(name, file_path="user_data.csv"):
-    if not os.path.exists(file_path):
-        return None
-    df = pd.read_csv(file_path, encoding="cp949")
-    row = df[df["name"] == name]
-    if row.empty:
-        return None
-    return row.iloc[0].to_dict()
-
-def save_user_data(user_info, file_path="user_data.csv"):
-    if not os.path.exists(file_path):
-        df = pd.DataFrame(columns=["name", "gender", "age", "height_cm", "weight_kg", "is_pregnant"])
-        df.to_csv(file_path, index=False, encoding="cp949")
-
-    df = pd.read_csv(file_path, encoding="cp949")
-    existing = df[df["name"] == user_info["name"]]
-    if not existing.empty:
-        idx = existing.index[0]
-        df.loc[idx] = user_info  # 기존 데이터 업데이트
-    else:
-        df = pd.concat([df, pd.DataFrame([user_info])], ignore_index=True)
-
-    df.to_csv(file_path, index=False, encoding="cp949")
+from profile_store import get_profile_store
+from rda_rules import RULES
+
+# --- 사용자 프로필 불러오기/저장 (user_data.db, 기존 user_data.csv는 최초 실행 시 가져옴) ---
+def load_user_data(name):
+    return get_profile_store().get(name)
+
+def save_user_data(user_info):
+    get_profile_store().upsert(user_info)
     st.success(f"✅ {user_info['name']}님의 정보가 저장되었습니다!")
 
 
@@ -37,78 +19,33 @@ class BmiRdaCalculator:
         self.weight_kg = weight_kg
         self.is_pregnant = is_pregnant
         self.height_m = height_cm / 100
+        # 나이/성별/임신 여부 구간 규칙은 rda_rules에서 한 번에 조회
+        self.targets = RULES.targets(gender, age, weight_kg, is_pregnant)
 
     def calculate_bmi(self):
-        return self.weight_kg / (self.height_m ** 2)
+        return float(RULES.bmi(self.weight_kg, self.height_cm))
 
-    def calculate_ideal_weight(self):
+    def interpret_bmi(self):
+        return RULES.bmi_status(self.calculate_bmi())
 
-        lower_weight = 18.5 * (self.height_m ** 2)
-        upper_weight = 24.9 * (self.height_m ** 2)
-        return lower_weight, upper_weight
+    def calculate_ideal_weight(self):
+        lower_weight, upper_weight = RULES.ideal_weight(self.height_cm)
+        return float(lower_weight), float(upper_weight)
     
     def calculate_calcium_rda(self):
-        if self.age <= 18:
-            base = 1300
-            factor = 5
-        elif self.gender == "여성" and self.age > 50:
-            base = 1200
-            factor = 2
-        else:
-            base = 1000
-            factor = 3 if self.age < 65 else 2
-        return base + (self.weight_kg * factor)
+        return self.targets["calcium_rda"]
     
     def calculate_calories_rda(self):
         """
         나이, 성별, 체중을 기반으로 하루 권장 열량(RDA) 계산
         """
-        if self.age <= 18:
-            base = 2200  # 성장기 연령대의 기본 열량
-            factor = 20  # 체중 당 추가 열량
-        elif self.gender == "여성":
-            if self.age > 50:
-                base = 1800  # 폐경 이후 연령대
-                factor = 15
-            else:
-                base = 2000
-                factor = 18
-        else:  # 남성의 경우
-            if self.age < 30:
-                base = 2500  # 활동량이 많은 연령대
-                factor = 22
-            elif self.age < 50:
-                base = 2400
-                factor = 20
-            else:
-                base = 2200
-                factor = 18
-    
-        return base + (self.weight_kg * factor)
+        return self.targets["calories_rda"]
 
     def calculate_iron_rda(self):
-        if self.is_pregnant:
-            base = 27
-            factor = 0.3
-        elif self.gender == "여성" and 19 <= self.age <= 50:
-            base = 18
-            factor = 0.1
-        elif self.age <= 18:
-            base = 11 if self.gender == "남성" else 15
-            factor = 0.2
-        else:
-            base = 8
-            factor = 0.1
-        return base + (self.weight_kg * factor)
+        return self.targets["iron_rda"]
 
     def calculate_protein_rda(self):
-        if self.age <= 18:
-            factor = 1.0
-        elif self.age > 65:
-            factor = 1.2
-        else:
-            factor = 0.8
-        return self.weight_kg * factor
+        return self.targets["protein_rda"]
 
     def show(self):
         st.title("🧮 BMI 및 RDA 자동 계산기 ")
@@ -122,6 +59,9 @@ class BmiRdaCalculator:
          
          # [추가] 이름 입력
         name = st.text_input("이름을 입력하세요", key="user_name")
+        if name:
+            # 다른 페이지(영양소 분석, 대시보드)에서 사용자별 식단 일지를 찾을 때 사용
+            st.session_state["current_user"] = name
 
         # [추가] "불러오기" 버튼
         if st.button("불러오기"):
@@ -204,7 +144,7 @@ class BmiRdaCalculator:
         st.markdown(f"""
         <div class='result-card'>
             <div class='result-title'>📘 BMI 결과</div>
-            <div class='result-value'>당신의 BMI는 <strong>{bmi:.2f}</strong>입니다.</div>
+            <div class='result-value'>당신의 BMI는 <strong>{bmi:.2f}</strong>입니다. {calculator.interpret_bmi()}</div>
         </div>
         <div class='result-card'>
             <div class='result-title'>📘 적정 체중 범위</div>
@@ -1,15 +1,33 @@
 import streamlit as st
-st.set_page_config(page_title="비건 영양소 대시보드", layout="wide")  # 최상단으로 이동
-import cv2
-import numpy as np
 import pandas as pd
-from ultralytics import YOLO
-from PIL import Image
-import warnings
 import datetime
-import google.generativeai as genai  # Gemini API
-
-
+import time
+import threading
+from lazy_import import lazy_import
+
+# 모델/LLM 라이브러리는 처음 사용할 때 불러와 첫 화면이 빨리 뜨게 함
+YOLO = lazy_import("ultralytics", "YOLO")
+genai = lazy_import("google.generativeai")  # Gemini API
+from preprocess import ImagePreprocessor
+from detections import Detections
+from meal_store import get_diary_store, current_user
+from meal_query import MEAL_TYPES
+from warmup import configure_threads, warmup_model, summarize_warmup
+
+
+@st.cache_resource(show_spinner="음식 인식 모델을 준비하는 중...")
+def get_detection_model(model_path="best.pt", imgsz=640):
+    """
+    모델을 프로세스당 한 번만 불러오고 워밍업하여 모든 세션이 공유
+    세션의 첫 분석이 모델 로드와 지연 초기화 시간을 떠안지 않는다.
+    :return: (YOLO 모델, 추론 잠금, 준비 정보 - threads, warmup 요약)
+    """
+    # streamlit이 이미 numpy를 불러왔으므로 OMP/MKL 환경 변수는 적용되지 않고 torch/cv2 스레드 수만 맞춘다
+    threads = configure_threads()
+    model = YOLO(model_path)
+    report = warmup_model(lambda images, size: model.predict(images, imgsz=size, verbose=False), [imgsz], runs=2)
+    # 같은 모델 객체를 여러 세션 스레드가 동시에 쓰지 않도록 잠금
+    return model, threading.Lock(), {"threads": threads, "warmup": summarize_warmup(report)}
 
 
 class Nutrient:
@@ -18,7 +36,7 @@ class Nutrient:
         Nutrient 클래스 생성자
         """
         try:
-            self.model = YOLO(model_path)
+            self.model, self.model_lock, self.model_info = get_detection_model(model_path)
             st.info("커스텀 학습 모델 로드 완료")
         except Exception as e:
             st.error(f"초기화 오류: {e}")
@@ -35,6 +53,10 @@ class Nutrient:
         except Exception as e:
             st.error(f"Excel 파일 로드 중 오류 발생: {e}")
             raise
+
+        # 추론용 전처리기 (축소 디코딩 + 모드/회전 정규화)
+        self.preprocessor = ImagePreprocessor(imgsz=640)
+        self.preprocess_info = None
     
     def check_vegetarian(self, food_name):
         """
@@ -54,28 +76,33 @@ class Nutrient:
             return None
 
 
-    def analyze_food(self, image):
+    @staticmethod
+    def default_meal_type():
+        """현재 시각으로 식사 종류 기본값 선택 (MEAL_TYPES 인덱스)"""
+        hour = datetime.datetime.now().hour
+        if 5 <= hour < 11:
+            return 0  # 아침
+        if 11 <= hour < 16:
+            return 1  # 점심
+        if 16 <= hour < 21:
+            return 2  # 저녁
+        return 3  # 간식
+
+    def analyze_food(self, img_array):
         """
         업로드된 음식 이미지를 분석하여 탐지된 음식 항목 및 확률 반환
-        :param image: PIL 이미지 객체
+        :param img_array: 전처리기로 준비한 BGR 배열 (ImagePreprocessor.to_array)
         :return: 탐지된 음식 목록 [(음식명, 확률)]
         """
-        img_array = np.array(image)
         try:
-            results = self.model.predict(img_array)
+            with self.model_lock:
+                results = self.model.predict(img_array, imgsz=self.preprocessor.imgsz)
 
             detected_foods = st.session_state.get("detected_foods", [])
                 
+            # 이미지마다 박스 정보를 한 번에 배열로 옮겨 (음식명, 확률) 목록 생성
             for r in results:
-                for box in r.boxes:
-                    class_id = int(box.cls)
-                    class_name = self.model.names[class_id]
-                    confidence = box.conf.item()
-                    detected_foods.append((class_name, confidence))
-                    
-                    # 중복 데이터 방지
-                    if (class_name, confidence) not in detected_foods:
-                        detected_foods.append((class_name, confidence))
+                detected_foods.extend(Detections.from_result(r, names=self.model.names).items())
 
             # 세션 상태에 중복 없이 저장
             st.session_state["detected_foods"] = list(set(detected_foods))
@@ -154,17 +181,31 @@ class Nutrient:
         if input_method == "파일 업로드":
             uploaded_file = st.file_uploader("음식 사진을 업로드하세요", type=["jpg", "png", "jpeg"])
             if uploaded_file is not None:
-                image = Image.open(uploaded_file)
+                image, self.preprocess_info = self.preprocessor.prepare(uploaded_file)
         elif input_method == "카메라 촬영":
             image = st.camera_input("카메라로 사진을 찍어 업로드하세요")
             if image:
-                image = Image.open(image)
+                image, self.preprocess_info = self.preprocessor.prepare(image)
 
             
         if image is not None:
             st.image(image, caption="입력된 이미지", use_container_width=True)
             
-            detected_foods = self.analyze_food(image)
+            # 화면에 표시한 축소 이미지를 그대로 배열로 변환하여 추론 (전처리 반복 없음)
+            start = time.perf_counter()
+            img_array = self.preprocessor.to_array(image)
+            self.preprocess_info["timings"]["convert"] = (time.perf_counter() - start) * 1000
+            detected_foods = self.analyze_food(img_array)
+
+            if self.preprocess_info:
+                timings = self.preprocess_info["timings"]
+                st.caption("전처리 시간: " + ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in timings.items()))
+            warmup = self.model_info["warmup"]
+            if warmup:
+                st.caption(
+                    f"모델 워밍업: 첫 추론 {warmup['first_cold_ms']:.0f}ms → 이후 평균 {warmup['mean_warm_ms']:.0f}ms "
+                    f"(추론 스레드 {self.model_info['threads']['intra']}개)"
+                )
 
             if detected_foods:
                 st.write("**📋 탐지된 음식:**")
@@ -233,39 +274,31 @@ class Nutrient:
                         col6.metric("칼슘", f"{adjusted['Calc']:.1f} mg")
 
                         # 식단 저장 기능 추가
+                        meal_type = st.selectbox("식사 종류", MEAL_TYPES, index=self.default_meal_type())
                         if st.button("식단 저장"):
                             try:
                                 date_today = datetime.date.today()
-                                saved_meals = {
-                                    "Date": [date_today],
-                                    "Meal": ["분석된 식단"],
-                                    "Food": [food_name],
-                                    "Quantity": [quantity],
-                                    "Unit": ["g"],
-                                    "Calories": [adjusted['Calories']],
-                                    "Protein": [adjusted['Protein']],
-                                    "Carbs": [adjusted['Carbs']],
-                                    "Fat": [adjusted['Fat']],
-                                    "Iron": [adjusted['Iron']],
-                                    "Calc": [adjusted['Calc']]
+                                saved_meal = {
+                                    "Date": date_today,
+                                    "Meal": meal_type,
+                                    "Food": food_name,
+                                    "Quantity": quantity,
+                                    "Unit": "g",
+                                    "Calories": adjusted['Calories'],
+                                    "Protein": adjusted['Protein'],
+                                    "Carbs": adjusted['Carbs'],
+                                    "Fat": adjusted['Fat'],
+                                    "Iron": adjusted['Iron'],
+                                    "Calc": adjusted['Calc']
                                 }
 
-                                df_new = pd.DataFrame(saved_meals, columns=['Date', 'Meal', 'Food', 'Quantity', 'Unit', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc'])
-
-                                # 세션 상태 초기화 및 리스트 처리
-                                if "saved_meals" not in st.session_state:
-                                    st.session_state["saved_meals"] = df_new
-                                else:
-                                    if not isinstance(st.session_state["saved_meals"], pd.DataFrame):
-                                        st.session_state["saved_meals"] = pd.DataFrame(columns=['Date', 'Meal', 'Food', 'Quantity', 'Unit', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc'])
-
-                                
-                                    # DataFrame 병합
-                                    st.session_state["saved_meals"] = pd.concat(
-                                        [st.session_state["saved_meals"], df_new], ignore_index=True
-                                    )
-                                
+                                # 사용자별 식단 일지에 저장 (대시보드와 같은 저장소)
+                                # 기록이 끝난 뒤에 저장 완료를 표시 (실패하면 아래에서 오류 표시)
+                                save_errors = get_diary_store().save(current_user(), saved_meal)
+
                                 st.success("식단이 저장되었습니다!")
+                                for save_error in save_errors:
+                                    st.warning(f"{save_error} (영양소 알림이 갱신되지 않았을 수 있습니다)")
                             except Exception as e:
                                 st.error(f"식단 저장 중 오류가 발생했습니다: {str(e)}")
                     else:
@@ -307,5 +340,7 @@ class Nutrient:
 
  # Streamlit 앱 실행
 if __name__ == "__main__":
+    # 페이지 설정은 첫 번째 Streamlit 명령이어야 하므로 단독 실행할 때만 여기서 호출 (앱에서는 vegan_st.py가 호출)
+    st.set_page_config(page_title="비건 영양소 대시보드", layout="wide")
     nutrient_app = Nutrient()
     nutrient_app.show()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import io
+import time
+import streamlit as st
+from lazy_import import lazy_import
+
+# 이미지 차트를 고를 때만 matplotlib을 불러온다 (기본 SVG 차트는 사용하지 않음)
+mpl_figure = lazy_import("matplotlib.figure")
+mpl_patches = lazy_import("matplotlib.patches")
+
+DONUT_COLORS = ("#4CAF50", "#BDBDBD")  # 초록색(섭취량), 회색(남은량)
+
+
+def set_korean_font():
+    """matplotlib 한글 폰트 설정"""
+    import matplotlib
+    matplotlib.rcParams['font.family'] = 'Malgun Gothic'  # Windows 환경
+    matplotlib.rcParams['axes.unicode_minus'] = False
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def render_donut_png(label, pct_value, size=4, dpi=100):
+    """
+    도넛 차트를 PNG로 렌더링 (라벨과 비율이 같으면 캐시된 이미지를 재사용)
+    pyplot을 거치지 않고 Figure를 직접 만들어 전역 figure 목록에 남지 않는다.
+    :param pct_value: 0~100 비율 (호출 측에서 소수 첫째 자리로 반올림하면 캐시 적중률이 높아진다)
+    :return: PNG 바이트
+    """
+    set_korean_font()
+    fig = mpl_figure.Figure(figsize=(size, size), dpi=dpi)
+    try:
+        ax = fig.subplots()
+        ax.pie(
+            [pct_value, 100 - pct_value],
+            labels=[label, "남은량"],
+            autopct='%1.1f%%',
+            startangle=90,
+            colors=DONUT_COLORS,
+            wedgeprops={'edgecolor': 'white'}
+        )
+        ax.add_artist(mpl_patches.Circle((0, 0), 0.70, fc='white'))
+        ax.axis('equal')
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def donut_svg(label, pct_value, size=160, stroke=22):
+    """
+    도넛 차트를 SVG 문자열로 생성 (matplotlib 없이 브라우저에서 그림)
+    :return: st.markdown(unsafe_allow_html=True)로 출력할 HTML
+    """
+    radius = (size - stroke) / 2
+    circumference = 2 * 3.141592653589793 * radius
+    filled = circumference * max(0.0, min(100.0, pct_value)) / 100
+    center = size / 2
+    return f"""
+    <div style="text-align: center;">
+      <svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" role="img" aria-label="{label} {pct_value:.1f}%">
+        <circle cx="{center}" cy="{center}" r="{radius}" fill="none" stroke="{DONUT_COLORS[1]}" stroke-width="{stroke}"/>
+        <circle cx="{center}" cy="{center}" r="{radius}" fill="none" stroke="{DONUT_COLORS[0]}" stroke-width="{stroke}"
+                stroke-dasharray="{filled:.2f} {circumference:.2f}" transform="rotate(-90 {center} {center})"/>
+        <text x="50%" y="50%" text-anchor="middle" dominant-baseline="central" font-size="18">{pct_value:.1f}%</text>
+      </svg>
+    </div>
+    """
+
+
+class RenderBudget:
+    def __init__(self, budget_ms=200):
+        """
+        차트 렌더링 시간 측정 (페이지에 표시하고 예산 초과 시 경고)
+        :param budget_ms: 한 번 렌더링에 허용하는 총 시간 (밀리초)
+        """
+        self.budget_ms = budget_ms
+        self.timings = {}
+
+    def measure(self, name, render, *args, **kwargs):
+        """render(*args, **kwargs)를 실행하고 걸린 시간을 기록"""
+        start = time.perf_counter()
+        result = render(*args, **kwargs)
+        self.timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    @property
+    def total_ms(self):
+        return sum(self.timings.values())
+
+    def show(self):
+        """측정 결과를 페이지에 표시"""
+        detail = ", ".join(f"{name} {ms:.1f}ms" for name, ms in self.timings.items())
+        st.caption(f"차트 렌더링: 총 {self.total_ms:.1f}ms / 예산 {self.budget_ms}ms ({detail})")
+        if self.total_ms > self.budget_ms:
+            st.warning(f"차트 렌더링 시간이 예산({self.budget_ms}ms)을 초과했습니다. 간단한 차트(SVG) 모드를 사용해 보세요.")
@@ -1,38 +1,25 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import calendar
 import datetime
+from meal_store import get_diary_store, current_user
+from meal_query import MealHistoryQuery
+from charts import render_donut_png, donut_svg, RenderBudget
+from gap_analysis import get_gap_analyzer
+from profile_store import get_profile_store
 
 class Dashboard: 
-    def __init__(self, nutrition_df=None):
-        if nutrition_df is None:
-            # 내부에서 FDDB.xlsx 로드
-            try:
-                df = pd.read_excel("FDDB.xlsx")
-                df = df.set_index("식품명")
-                self.nutrition_df = df
-            except Exception as e:
-                st.error(f"FDDB.xlsx 로드 오류: {e}")
-                self.nutrition_df = pd.DataFrame()
-        else:
-            self.nutrition_df = nutrition_df
-        
+    def __init__(self):
         self.set_font()
 
-        # 식단/섭취 기록을 저장할 DataFrame을 초기화 (혹은 st.session_state 등에서 가져오기)
-        if "saved_meals" not in st.session_state or not isinstance(st.session_state["saved_meals"], pd.DataFrame):
-            # 세션에 값이 없거나, 리스트인 경우 초기화
-            st.session_state["saved_meals"] = pd.DataFrame(columns=['Date', 'Meal', 'Food', 'Quantity', 'Unit', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc'])
-    
-        if not st.session_state["saved_meals"].empty:
-            self.data = st.session_state["saved_meals"].copy()
-        else:
-            self.data = pd.DataFrame(columns=['Date', 'Meal', 'Food', 'Quantity', 'Unit', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc'])
+        # 사용자별 식단 일지 저장소 (영양소 분석 페이지와 공유)
+        self.store = get_diary_store()
+        self.user = current_user()
+        # 식단 기록 전체 대신 일별 합계 한 행으로 저장된 식단이 있는지만 확인
+        self.has_meals = self.store.has_meals(self.user)
+        self.query = MealHistoryQuery(self.store, self.user)
+        self.gap_analyzer = get_gap_analyzer()
 
     def set_font(self):
-        plt.rcParams['font.family'] = 'Malgun Gothic'  # Windows 환경
-        plt.rcParams['axes.unicode_minus'] = False
+        # matplotlib 한글 폰트는 이미지 차트를 그릴 때 charts.set_korean_font()에서 설정
         st.markdown("""
     <style>
         .reportview-container {
@@ -53,89 +40,49 @@ class Dashboard:
         </style>
         """, unsafe_allow_html=True)
 
-    def get_nutritional_info(self, saved_meals):
-        """
-        대시보드에서도 영양소 계산 가능하도록 동일 로직.
-        """
-        nutrient_summary = {
-            "영양성분함량기준량": {"value": "", "unit": ""},
-            "열량": {"value": 0, "unit": "kcal"},
-            "단백질": {"value": 0, "unit": "g"},
-            "지방": {"value": 0, "unit": "g"},
-            "탄수화물": {"value": 0, "unit": "g"},
-            "칼슘": {"value": 0, "unit": "mg"},
-            "철": {"value": 0, "unit": "mg"}
-        }
-
-        # DataFrame의 각 행을 반복
-        for _, row in saved_meals.iterrows():
-            food = row["Food"]
-            if food in self.nutrition_df.index:
-                row_data = self.nutrition_df.loc[food]
-                nutrient_summary["영양성분함량기준량"]["value"] = str(row_data['영양성분함량기준량'])
-                nutrient_summary["열량"]["value"] += float(row_data['에너지(kcal)']) if pd.notnull(row_data['에너지(kcal)']) else 0
-                nutrient_summary["단백질"]["value"] += float(row_data['단백질(g)']) if pd.notnull(row_data['단백질(g)']) else 0
-                nutrient_summary["지방"]["value"] += float(row_data['지방(g)']) if pd.notnull(row_data['지방(g)']) else 0
-                nutrient_summary["탄수화물"]["value"] += float(row_data['탄수화물(g)']) if pd.notnull(row_data['탄수화물(g)']) else 0
-                nutrient_summary["칼슘"]["value"] += float(row_data['칼슘(mg)']) if pd.notnull(row_data['칼슘(mg)']) else 0
-                nutrient_summary["철"]["value"] += float(row_data['철(mg)']) if pd.notnull(row_data['철(mg)']) else 0
-
-        return nutrient_summary
-
     def nutrient_analysis(self):
-        st.subheader("📊 주간 영양소 분석")
-        st.write("영양소 목표 달성률 및 섭취량 시각화")
+        st.subheader("📊 오늘의 영양소 분석")
+        st.write("하루 권장 섭취량 대비 목표 달성률 및 섭취량 시각화")
 
-        # 1) BMI 기반 데이터 로드
-        bmi_data = st.session_state.get("bmi_data", {})
-        saved_meals = st.session_state.get("saved_meals", [])
-
-        if saved_meals.empty:
+        # 1) 저장된 식단 확인
+        if not self.has_meals:
             st.warning("아직 음식 분석 결과가 없습니다. 먼저 음식 이미지를 업로드하세요.")
             return
 
 
-        # 2) 대시보드 측에서 영양소 재계산
-        nutrient_info = self.get_nutritional_info(saved_meals)
-
-        if not nutrient_info:
-            st.warning("아직 세션에 영양소 정보가 저장되지 않았습니다.")
-            return  # 바로 함수 종료
+        # 2) 오늘 섭취량과 권장량 비교 (저장 시 갱신되는 일별 합계 한 행만 읽음)
+        # 권장량은 알림과 같은 기준(저장된 프로필)을 사용
+        targets = self.gap_analyzer.targets(self.user)
+        if st.session_state.get("bmi_data") and get_profile_store().get(self.user) is None:
+            st.caption("BMI 페이지에서 정보를 저장하면 내 권장 섭취량이 적용됩니다. (지금은 기본 권장량)")
+        gaps = self.gap_analyzer.today(self.user, self.store, targets)
 
-        # 2) 실제 분석 결과: 사용자가 섭취한 영양소 양
-        actual_calories = nutrient_info.get("열량", {"value": 0})["value"]
-        actual_protein  = nutrient_info.get("단백질", {"value": 0})["value"]
-        actual_calcium  = nutrient_info.get("칼슘", {"value": 0})["value"]
-        actual_iron     = nutrient_info.get("철", {"value": 0})["value"]
-
-        
-        # 3) 일일권장섭취량(RDA) 또는 목표치(예시 값)
-        rda_calories = bmi_data.get("calories_rda", 2000)
-        rda_protein  = bmi_data.get("protein_rda", 60)     # g
-        rda_calcium  = bmi_data.get("calcium_rda", 1000)   # mg
-        rda_iron     = bmi_data.get("iron_rda", 15)        # mg
-
-        # 4) 시각화에 필요한 % 계산 (예: 실제 섭취량 / RDA * 100)
-        pct_calories = (actual_calories / rda_calories * 100) if rda_calories else 0
-        pct_protein  = (actual_protein / rda_protein * 100)  if rda_protein else 0
-        pct_calcium  = (actual_calcium / rda_calcium * 100) if rda_calcium else 0
-        pct_iron     = (actual_iron / rda_iron * 100)       if rda_iron else 0
-        
-        # 5. UI용 딕셔너리 구성
-        #    - "칼로리"는 그대로 kcal 출력
-        #    - 나머지 3개는 %로 표시
+        # 3) UI용 딕셔너리 구성: 이름 -> (권장량 대비 %, 섭취량 표시)
         nutrient_data = {
-            "칼로리": actual_calories,  # 정수 or 소수 표시
-            "단백질": pct_protein,
-            "칼슘": pct_calcium,
-            "철분": pct_iron
+            gap["name"]: (gap["pct"], f"{gap['total']:.0f} {gap['unit']}")
+            for _, gap in gaps.iterrows()
         }
 
-        # 6. 4개의 열을 생성하여 각각 시각화
+        # 4) 지난 날짜 부족 알림 갱신 후 표시
+        self.gap_analyzer.check_past_days(self.user, self.store, targets)
+        self.show_alerts()
+
+        # 5) 오늘 부족한 양
+        remaining = gaps[gaps["gap"] > 0]
+        if not remaining.empty:
+            st.caption("오늘 남은 권장량: " + ", ".join(
+                f"{gap['name']} {gap['gap']:.1f}{gap['unit']}" for _, gap in remaining.iterrows()
+            ))
+
+        # 6. 차트 방식 선택 (SVG: 브라우저에서 그림, 이미지: matplotlib PNG 캐시)
+        chart_mode = st.radio("차트 방식", ["간단한 차트(SVG)", "이미지 차트"], horizontal=True)
+        budget = RenderBudget(budget_ms=200)
+
+        # 7. 4개의 열을 생성하여 각각 시각화
         cols = st.columns(4)
-        for i, (nutrient, value) in enumerate(nutrient_data.items()):
+        for i, (nutrient, (value, amount)) in enumerate(nutrient_data.items()):
             with cols[i]:
-                pct_value = min(100, value)  # 100% 초과 방지
+                pct_value = round(min(100, value), 1)  # 100% 초과 방지, 캐시 키 안정화
                 st.markdown(
                     f"<div style='text-align: center; font-size: 20px; font-weight: bold;'>{nutrient}</div>",
                     unsafe_allow_html=True
@@ -149,54 +96,57 @@ class Dashboard:
                 # 칼로리 또는 기타 정보 추가
                 if nutrient == "칼로리":
                     st.markdown(
-                        f"<div style='text-align: center; font-size: 26px; font-weight: bold;'>{value:.0f} kcal</div>",
+                        f"<div style='text-align: center; font-size: 26px; font-weight: bold;'>{amount}</div>",
                         unsafe_allow_html=True
                     )    
                     
                 # 도넛 차트
-                fig, ax = plt.subplots(figsize=(4, 4))
-                ax.pie(
-                    [pct_value, 100 - pct_value],
-                    labels=[nutrient, "남은량"],
-                    autopct='%1.1f%%',
-                    startangle=90,
-                    colors=["#4CAF50", "#BDBDBD"],  # 초록색(섭취량), 회색(남은량)
-                    wedgeprops={'edgecolor': 'white'}
-                )
-                centre_circle = plt.Circle((0,0), 0.70, fc='white')
-                fig.gca().add_artist(centre_circle)
-                plt.axis('equal')
-                st.pyplot(fig)
-                
-    
-    
+                if chart_mode == "이미지 차트":
+                    png = budget.measure(nutrient, render_donut_png, nutrient, pct_value)
+                    st.image(png, use_container_width=True)
+                else:
+                    html = budget.measure(nutrient, donut_svg, nutrient, pct_value)
+                    st.markdown(html, unsafe_allow_html=True)
+
+        budget.show()
+
+    def show_alerts(self):
+        """새 영양소 알림 표시 (확인 버튼을 누르면 숨김)"""
+        alerts = self.gap_analyzer.alerts(self.user)
+        if not alerts:
+            return
+        for alert in alerts:
+            if alert["kind"] == "deficient":
+                st.warning(alert["message"])
+            else:
+                st.success(alert["message"])
+        if st.button("알림 확인"):
+            self.gap_analyzer.mark_seen(self.user, [alert["id"] for alert in alerts])
+            st.rerun()
+
     def show_weekly_analysis(self):
         st.subheader("📊 주간 영양소 분석")
         
-        df = st.session_state['saved_meals']
-
-        # 초기 세션 상태 설정
-        if 'saved_meals' not in st.session_state:
-            st.session_state['saved_meals'] = pd.DataFrame(columns=[
-            "Date", "Meal", "Food", "Quantity", "Unit", "Calories", "Protein", "Carbs", "Fat", "Iron", "Calc"
-            ])
-
-        if df.empty:
+        if not self.has_meals:
             st.warning("저장된 식단 데이터가 없습니다. 먼저 데이터를 저장하세요.")
         else:
-            # 최근 7일 데이터 필터링
-            start_date = datetime.datetime.now() - datetime.timedelta(days=7)
-            df['Date'] = pd.to_datetime(df['Date'])  # Ensure the 'Date' column is in datetime format
-            filtered_df = df[df['Date'] >= start_date]
+            # 조회 기간 선택 (기본: 최근 7일)
+            today = datetime.date.today()
+            selected = st.date_input("조회 기간", value=(today - datetime.timedelta(days=7), today))
+            if not isinstance(selected, (tuple, list)) or len(selected) != 2:
+                st.info("조회 기간의 시작일과 종료일을 선택하세요.")
+                return
+            start_date, end_date = selected
+            filtered_df = self.store.read(self.user, start=start_date, end=end_date)
 
             if filtered_df.empty:
-                st.warning("최근 7일간 저장된 데이터가 없습니다.")
+                st.warning("선택한 기간에 저장된 데이터가 없습니다.")
             else:
-                # 날짜별 영양소 합계 계산
-                daily_summary = filtered_df.groupby(filtered_df['Date'].dt.date).sum(numeric_only=True)
+                # 날짜별 영양소 합계 (기록이 없는 날은 0, 기록 버전이 같으면 캐시 사용)
+                daily_summary = self.query.daily(start_date, end_date)
 
                 # 테이블 표시
-                st.write("### 최근 7일간 식단 요약")
+                st.write(f"### {start_date} ~ {end_date} 식단 요약")
                 st.dataframe(filtered_df)
 
                 # 날짜별 요약 표시
@@ -207,21 +157,38 @@ class Dashboard:
                 st.write("### 영양소 섭취 추세")
                 st.line_chart(daily_summary[['Calories', 'Protein', 'Carbs', 'Fat', 'Iron']])
 
+                # 주별/월별 합계
+                st.write("### 주별 / 월별 영양소 합계")
+                period = st.radio("집계 단위", ["주별", "월별"], horizontal=True)
+                st.dataframe(self.store.daily(self.user, period="week" if period == "주별" else "month"))
+
+                self.show_history_stats(start_date, end_date)
+
+    def show_history_stats(self, start_date, end_date):
+        """선택한 기간의 식사 종류별 합계, 이동 평균, 권장량 연속 달성 일수"""
+        st.write("### 식사 종류별 섭취량")
+        by_meal = self.query.by_meal(start_date, end_date)
+        st.dataframe(by_meal)
+        st.bar_chart(by_meal[['Calories', 'Protein', 'Carbs', 'Fat']])
+
+        st.write("### 7일 이동 평균")
+        st.line_chart(self.query.rolling_average(start_date, end_date, window=7)[['Calories', 'Protein', 'Carbs', 'Fat']])
+
+        st.write("### 권장 섭취량 연속 달성")
+        targets = self.gap_analyzer.targets(self.user)
+        streaks = self.query.rda_streaks(start_date, end_date, targets)
+        labels = {"Calories": "칼로리", "Protein": "단백질", "Calc": "칼슘", "Iron": "철분"}
+        cols = st.columns(len(streaks))
+        for col, (nutrient, row) in zip(cols, streaks.iterrows()):
+            col.metric(labels.get(nutrient, nutrient), f"{row['current']}일 연속", f"최장 {row['longest']}일",
+                       delta_color="off")
+
 
     def show_dashboard(self):
         st.title("📊 대시보드")
         self.nutrient_analysis()  # 추가하여 상단에 출력되도록 조정
+        # 식단 목록은 주간 분석에서 선택한 기간만 표시
         self.show_weekly_analysis()
-        ## 세션 상태에서 저장된 식단 데이터를 가져오기
-        if "saved_meals" in st.session_state and isinstance(st.session_state["saved_meals"], pd.DataFrame):
-            if not st.session_state["saved_meals"].empty:
-                meal_data = st.session_state["saved_meals"]
-                st.write("📸 저장된 식단 목록:")
-                st.dataframe(meal_data)
-            else:
-                st.warning("저장된 식단 데이터가 없습니다.")
-        else:
-            st.warning("저장된 식단 데이터가 없습니다.")
 
 # Streamlit 인터페이스
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+import sqlite3
+import datetime
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+from meal_store import to_date_text
+from profile_store import get_profile_store
+from rda_rules import RULES, DEFAULT_TARGETS
+
+# 일별 합계 컬럼 -> (권장량 키, 표시 이름, 단위)
+GAP_NUTRIENTS = {
+    "Calories": ("calories_rda", "칼로리", "kcal"),
+    "Protein": ("protein_rda", "단백질", "g"),
+    "Calc": ("calcium_rda", "칼슘", "mg"),
+    "Iron": ("iron_rda", "철분", "mg")
+}
+
+
+class GapAnalyzer:
+    def __init__(self, db_path="meal_diary.db", profile_store=None, deficiency_ratio=0.7, lookback_days=7):
+        """
+        권장 섭취량 대비 부족분 분석 및 알림
+        - 식단이 저장될 때 저장소가 넘겨주는 일별 합계 행만 보고 목표 달성 알림을 만든다
+        - 지난 날짜는 마지막으로 확인한 날짜 이후만 읽어서 부족 알림을 만든다 (전체 기록을 다시 읽지 않음)
+        :param deficiency_ratio: 하루 섭취량이 권장량의 이 비율 미만이면 부족
+        :param lookback_days: 처음 확인하는 사용자는 최근 며칠까지만 부족 여부를 확인
+        """
+        self.db_path = db_path
+        self.profile_store = profile_store
+        self.deficiency_ratio = deficiency_ratio
+        self.lookback_days = lookback_days
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS nutrient_alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user TEXT NOT NULL,
+                    Date TEXT NOT NULL,
+                    nutrient TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    seen INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user, Date, nutrient, kind)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_user_seen ON nutrient_alerts (user, seen)")
+            # 사용자별로 부족 여부를 확인한 마지막 날짜
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS gap_checkpoints (
+                    user TEXT PRIMARY KEY,
+                    checked_until TEXT NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def targets(self, user):
+        """
+        사용자의 하루 권장량 (컬럼 -> 값)
+        저장된 프로필로 계산하고, 프로필이 없으면 기본값을 사용한다.
+        백그라운드 알림과 대시보드가 모두 이 값을 쓰므로 세션에만 있는 BMI 페이지 계산값은 쓰지 않는다.
+        """
+        source = dict(DEFAULT_TARGETS)
+        if self.profile_store is not None:
+            profile = self.profile_store.get(user)
+            if profile and None not in (profile["gender"], profile["age"], profile["weight_kg"]):
+                source = RULES.targets(profile["gender"], profile["age"], profile["weight_kg"], profile["is_pregnant"])
+        return {col: float(source[key]) for col, (key, _, _) in GAP_NUTRIENTS.items()}
+
+    def gaps(self, totals, targets):
+        """
+        섭취량과 권장량 비교
+        :param totals: {컬럼: 섭취량}
+        :return: 컬럼을 인덱스로 하는 DataFrame (name, unit, total, target, gap, pct)
+        """
+        rows = []
+        for col, (_, name, unit) in GAP_NUTRIENTS.items():
+            total = float(totals.get(col) or 0)
+            target = targets[col]
+            rows.append({
+                "nutrient": col,
+                "name": name,
+                "unit": unit,
+                "total": total,
+                "target": target,
+                "gap": max(target - total, 0.0),
+                "pct": total / target * 100 if target else 0.0
+            })
+        return pd.DataFrame(rows).set_index("nutrient")
+
+    def _add_alerts(self, conn, alerts):
+        conn.executemany(
+            "INSERT OR IGNORE INTO nutrient_alerts (user, Date, nutrient, kind, message) VALUES (?, ?, ?, ?, ?)",
+            alerts
+        )
+
+    def on_daily_totals(self, rows):
+        """
+        식단 저장 직후 호출 (MealDiaryStore.add_listener로 등록)
+        바뀐 날짜의 합계가 권장량을 처음 넘으면 달성 알림을 남긴다
+        """
+        alerts = []
+        for row in rows:
+            gaps = self.gaps(row, self.targets(row["user"]))
+            for col, gap in gaps.iterrows():
+                if gap["pct"] >= 100:
+                    alerts.append((row["user"], row["Date"], col, "met",
+                                   f"{row['Date']} {gap['name']} 권장량을 채웠습니다 ({gap['total']:.1f}/{gap['target']:.0f} {gap['unit']})"))
+        if alerts:
+            with self._connect() as conn:
+                self._add_alerts(conn, alerts)
+                conn.commit()
+
+    def check_past_days(self, user, store, targets=None):
+        """
+        마지막 확인 이후 ~ 어제까지의 일별 합계로 부족 알림을 만든다
+        기록이 없는 날은 판단하지 않는다
+        """
+        today = datetime.date.today()
+        yesterday = today - datetime.timedelta(days=1)
+        with self._connect() as conn:
+            row = conn.execute("SELECT checked_until FROM gap_checkpoints WHERE user = ?", (user,)).fetchone()
+        if row:
+            start = datetime.date.fromisoformat(row["checked_until"]) + datetime.timedelta(days=1)
+        else:
+            start = today - datetime.timedelta(days=self.lookback_days)
+        if start > yesterday:
+            return
+
+        targets = targets or self.targets(user)
+        daily = store.daily(user, start=start, end=yesterday)
+        alerts = []
+        for date, totals in daily.iterrows():
+            gaps = self.gaps(totals, targets)
+            for col, gap in gaps[gaps["pct"] < self.deficiency_ratio * 100].iterrows():
+                alerts.append((user, to_date_text(date), col, "deficient",
+                               f"{date} {gap['name']} 섭취가 권장량의 {gap['pct']:.0f}%로 부족했습니다 "
+                               f"({gap['gap']:.1f} {gap['unit']} 부족)"))
+
+        with self._connect() as conn:
+            self._add_alerts(conn, alerts)
+            conn.execute(
+                "INSERT INTO gap_checkpoints (user, checked_until) VALUES (?, ?) "
+                "ON CONFLICT(user) DO UPDATE SET checked_until = excluded.checked_until",
+                (user, to_date_text(yesterday))
+            )
+            conn.commit()
+
+    def today(self, user, store, targets=None):
+        """오늘의 섭취량/권장량/부족분 (일별 합계 한 행만 읽음)"""
+        today = datetime.date.today()
+        daily = store.daily(user, start=today, end=today)
+        totals = daily.iloc[0].to_dict() if not daily.empty else {}
+        return self.gaps(totals, targets or self.targets(user))
+
+    def alerts(self, user, unseen_only=True, limit=20):
+        """최근 알림 목록 (새 알림 먼저)"""
+        condition = "AND seen = 0" if unseen_only else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, Date, nutrient, kind, message FROM nutrient_alerts WHERE user = ? {condition} "
+                f"ORDER BY Date DESC, id DESC LIMIT ?",
+                (user, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_seen(self, user, alert_ids=None):
+        """알림 확인 처리 (alert_ids가 없으면 전체)"""
+        with self._connect() as conn:
+            if alert_ids is None:
+                conn.execute("UPDATE nutrient_alerts SET seen = 1 WHERE user = ? AND seen = 0", (user,))
+            else:
+                conn.executemany("UPDATE nutrient_alerts SET seen = 1 WHERE user = ? AND id = ?",
+                                 [(user, alert_id) for alert_id in alert_ids])
+            conn.commit()
+
+
+@st.cache_resource
+def get_gap_analyzer(db_path="meal_diary.db"):
+    """
+    프로세스 전체에서 하나의 분석기를 공유
+    식단 저장소에 연결(on_daily_totals 등록)은 meal_store.get_diary_store()에서 저장소를 만들 때 한다
+    """
+    return GapAnalyzer(db_path, get_profile_store())
@@ -0,0 +1,102 @@
+import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+from meal_store import NUMERIC_COLUMNS
+
+MEAL_TYPES = ["아침", "점심", "저녁", "간식"]
+
+
+# 아래 조회 함수들은 (user, 기간, 기록 버전)이 같으면 캐시된 결과를 돌려준다.
+# _store 인자는 밑줄로 시작하므로 캐시 키에서 제외된다.
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _daily_range(_store, user, start, end, version):
+    # 기록이 없는 날도 0으로 채워서 연속된 날짜로 만든다
+    daily = _store.daily(user, start=start, end=end)
+    dates = pd.date_range(start, end, freq="D").date
+    return daily.reindex(dates, fill_value=0).rename_axis("Date")
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _meal_breakdown(_store, user, start, end, version):
+    df = _store.by_meal(user, start=start, end=end)
+    # 정해진 식사 종류를 앞에, 나머지는 뒤에
+    order = [meal for meal in MEAL_TYPES if meal in df.index] + [meal for meal in df.index if meal not in MEAL_TYPES]
+    return df.reindex(order)
+
+
+class MealHistoryQuery:
+    def __init__(self, store, user):
+        """
+        식단 기록 기간 조회 (임의 기간, 식사 종류별, 이동 평균, 권장량 달성 연속 일수)
+        :param store: MealDiaryStore
+        :param user: 사용자 이름
+        """
+        self.store = store
+        self.user = user
+
+    @staticmethod
+    def _range(start, end):
+        end = end or datetime.date.today()
+        start = start or end - datetime.timedelta(days=6)
+        if start > end:
+            start, end = end, start
+        return start, end
+
+    def daily(self, start=None, end=None):
+        """
+        기간 내 일별 합계 (기록이 없는 날은 0)
+        :return: Date를 인덱스로 하는 DataFrame
+        """
+        start, end = self._range(start, end)
+        return _daily_range(self.store, self.user, start, end, self.store.version(self.user))
+
+    def by_meal(self, start=None, end=None):
+        """
+        기간 내 식사 종류별 합계와 비율
+        :return: Meal을 인덱스로 하는 DataFrame (Calories_pct: 칼로리 비율 %)
+        """
+        start, end = self._range(start, end)
+        df = _meal_breakdown(self.store, self.user, start, end, self.store.version(self.user)).copy()
+        total = df["Calories"].sum()
+        df["Calories_pct"] = df["Calories"] / total * 100 if total else 0.0
+        return df
+
+    def rolling_average(self, start=None, end=None, window=7, columns=None):
+        """
+        일별 섭취량의 이동 평균 (window일)
+        기간 시작 전 window-1일도 함께 읽어서 첫날부터 온전한 평균을 계산한다
+        """
+        start, end = self._range(start, end)
+        columns = columns or NUMERIC_COLUMNS[1:]
+        history_start = start - datetime.timedelta(days=window - 1)
+        daily = self.daily(history_start, end)[columns]
+        return daily.rolling(window, min_periods=1).mean().loc[start:]
+
+    def rda_attainment(self, start, end, targets, ratio=1.0):
+        """
+        일별 권장 섭취량 달성 여부
+        :param targets: {컬럼: 권장량} (GapAnalyzer.targets - 알림과 같은 기준)
+        :param ratio: 권장량 대비 이 비율 이상이면 달성
+        :return: Date를 인덱스로 하는 bool DataFrame
+        """
+        daily = self.daily(start, end)[list(targets)]
+        return daily >= np.array(list(targets.values())) * ratio
+
+    def rda_streaks(self, start, end, targets, ratio=1.0):
+        """
+        항목별 권장 섭취량 연속 달성 일수
+        :return: 항목을 인덱스로 하는 DataFrame (current: 마지막 날 기준 연속 일수, longest: 최장 연속 일수, days: 달성 일수)
+        """
+        hit = self.rda_attainment(start, end, targets, ratio)
+        # 누적 달성 일수에서 마지막 미달성일 시점의 누적값을 빼면 연속 일수
+        achieved = hit.astype(int).cumsum()
+        streak = achieved - achieved.where(~hit).ffill().fillna(0).astype(int)
+        if streak.empty:
+            return pd.DataFrame(0, index=hit.columns, columns=["current", "longest", "days"])
+        return pd.DataFrame({
+            "current": streak.iloc[-1],
+            "longest": streak.max(),
+            "days": hit.sum()
+        })
@@ -0,0 +1,348 @@
+import threading
+import queue
+import time
+import atexit
+import logging
+from concurrent.futures import Future
+import pandas as pd
+import streamlit as st
+from daily_totals import DailyTotals, connect, to_date_text
+
+logger = logging.getLogger(__name__)
+
+MEAL_COLUMNS = ['Date', 'Meal', 'Food', 'Quantity', 'Unit', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc']
+NUMERIC_COLUMNS = ['Quantity', 'Calories', 'Protein', 'Carbs', 'Fat', 'Iron', 'Calc']
+
+# 사용자별 일별 합계 ((user, Date) 기본키)
+DAILY_TOTALS = DailyTotals(NUMERIC_COLUMNS)
+
+
+class MealDiaryStore:
+    """
+    사용자별 식단 일지 저장소 (SQLite WAL 모드)
+    - 저장 요청은 큐에 쌓였다가 백그라운드 스레드가 묶어서 한 트랜잭션으로 기록한다
+      (add()가 돌려준 Future로 기록 완료/실패를 확인, 프로그램 종료 시 남은 저장을 모두 기록)
+    - (user, Date) 인덱스로 사용자/기간 조회 시 필요한 행만 읽는다
+    - 조회 전에는 대기 중인 저장을 먼저 반영하여 방금 저장한 식단이 바로 보인다
+    - 저장과 같은 트랜잭션에서 일별 합계(daily_totals)를 갱신하므로 대시보드는 합계 행만 읽는다
+    """
+
+    def __init__(self, db_path="meal_diary.db", batch_size=50, flush_interval=0.5):
+        """
+        :param db_path: SQLite 파일 경로
+        :param batch_size: 한 트랜잭션에 기록할 최대 건수
+        :param flush_interval: 대기 중인 저장을 기록하는 주기 (초)
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._listeners = []
+        self._closed = threading.Event()
+        self._init_db()
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        # 기록 스레드는 daemon이므로 종료 직전에 큐에 남은 저장을 직접 기록
+        atexit.register(self.close)
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user TEXT NOT NULL,
+                    Date TEXT NOT NULL,
+                    Meal TEXT,
+                    Food TEXT,
+                    Quantity REAL,
+                    Unit TEXT,
+                    Calories REAL,
+                    Protein REAL,
+                    Carbs REAL,
+                    Fat REAL,
+                    Iron REAL,
+                    Calc REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_user_date ON meals (user, Date)")
+            DAILY_TOTALS.create(conn)
+            # 사용자별 기록 버전 (저장할 때마다 증가, 조회 결과 캐시 키로 사용)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS write_versions (
+                    user TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.commit()
+
+    def add(self, user, row):
+        """
+        식단 한 건 저장 요청 (즉시 반환, 백그라운드에서 기록)
+        :param user: 사용자 이름
+        :param row: MEAL_COLUMNS 키를 가진 딕셔너리
+        :return: Future - 기록되면 완료(결과는 저장 후 처리 오류 메시지 목록), 실패하면 예외를 담음
+        """
+        future = Future()
+        self._pending.put((user, row, future))
+        self._wakeup.set()
+        if self._closed.is_set():
+            # 종료 처리 뒤에 들어온 저장은 기록 스레드가 없으므로 바로 기록
+            try:
+                self.flush()
+            except Exception:
+                pass  # 오류는 future에 담겨 있음
+        return future
+
+    def save(self, user, row, timeout=10):
+        """
+        식단 한 건을 저장하고 기록될 때까지 기다림 (화면에 저장 완료를 표시하기 전에 사용)
+        기록에 실패하면 예외 발생
+        :return: 저장 후 처리(알림 등) 오류 메시지 목록 - 식단은 저장되었지만 화면에 경고로 알릴 내용
+        """
+        return self.add(user, row).result(timeout=timeout)
+
+    def add_listener(self, callback):
+        """
+        저장이 반영될 때마다 호출할 함수 등록
+        callback(rows): rows는 이번 저장으로 바뀐 일별 합계 행 목록 [{'user', 'Date', 'Meals', 'Calories', ...}]
+        (백그라운드 기록 스레드에서 호출되므로 저장소의 read/daily를 다시 호출하면 안 된다)
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _drain(self, limit=None):
+        items = []
+        while limit is None or len(items) < limit:
+            try:
+                items.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _write(self, items):
+        """
+        한 트랜잭션으로 기록하고 등록된 함수들을 호출
+        :return: 등록된 함수에서 발생한 오류 메시지 목록 (식단 기록은 이미 끝났으므로 저장 실패로 보지 않음)
+        """
+        if not items:
+            return []
+        values = [
+            [user, to_date_text(row['Date'])] + [row.get(col) for col in MEAL_COLUMNS[1:]]
+            for user, row in items
+        ]
+        columns = ['user'] + MEAL_COLUMNS
+
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO meals ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                values
+            )
+            # 배치 안에서 (user, Date)별로 먼저 합산하여 일별 합계에 더함
+            keys = DAILY_TOTALS.add(conn, [((user, to_date_text(row['Date'])), row) for user, row in items])
+            conn.executemany(
+                "INSERT INTO write_versions (user, version) VALUES (?, 1) "
+                "ON CONFLICT(user) DO UPDATE SET version = version + 1",
+                [(user,) for user in {user for user, _ in keys}]
+            )
+            changed = DAILY_TOTALS.rows(conn, keys) if self._listeners else []
+            conn.commit()
+        return self._notify(changed)
+
+    def _notify(self, changed):
+        """
+        바뀐 일별 합계 행을 등록된 함수들에 넘김 (기록을 commit한 뒤에 호출)
+        :return: 등록된 함수에서 발생한 오류 메시지 목록
+        """
+        errors = []
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception as e:
+                logger.exception("식단 저장 후 처리 오류 (%s)", getattr(callback, "__qualname__", callback))
+                errors.append(f"식단 저장 후 처리 오류: {e}")
+        return errors
+
+    def flush(self):
+        """
+        대기 중인 저장을 모두 기록
+        기록에 실패한 배치는 해당 저장 요청의 Future에 예외를 넘기고 (다시 시도하지 않음) 예외를 발생시킨다
+        """
+        with self._write_lock:
+            error = None
+            while True:
+                items = self._drain(self.batch_size)
+                if not items:
+                    break
+                try:
+                    listener_errors = self._write([(user, row) for user, row, _ in items])
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    error = error or e
+                else:
+                    for _, _, future in items:
+                        future.set_result(listener_errors)
+            if error is not None:
+                raise error
+
+    def close(self):
+        """기록 스레드를 멈추고 남은 저장을 모두 기록 (프로그램 종료 시 자동 호출)"""
+        self._closed.set()
+        self._wakeup.set()
+        self.flush()
+
+    def _write_loop(self):
+        while not self._closed.is_set():
+            # 저장 요청이 들어오면 flush_interval 동안 더 모아서 한 번에 기록
+            self._wakeup.wait()
+            if not self._closed.is_set():
+                time.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # 저장을 요청한 쪽은 Future로 오류를 받는다
+                logger.exception("식단 저장 오류")
+
+    def read(self, user, start=None, end=None):
+        """
+        사용자의 기간별 식단 조회 ((user, Date) 인덱스 사용)
+        :param start: 시작 날짜 (포함), None이면 처음부터
+        :param end: 종료 날짜 (포함), None이면 끝까지
+        :return: MEAL_COLUMNS 컬럼의 DataFrame (Date는 datetime)
+        """
+        self.flush()
+
+        conditions, params = ["user = ?"], [user]
+        if start is not None:
+            conditions.append("Date >= ?")
+            params.append(to_date_text(start))
+        if end is not None:
+            conditions.append("Date <= ?")
+            params.append(to_date_text(end))
+
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(MEAL_COLUMNS)} FROM meals WHERE {' AND '.join(conditions)} ORDER BY Date, id",
+                conn, params=params
+            )
+        df['Date'] = pd.to_datetime(df['Date'], format="%Y-%m-%d", errors="coerce")
+        return df
+
+    def recompute_nutrition(self, nutrition, user=None):
+        """
+        영양 정보(FDDB)가 갱신되었을 때 저장된 식단의 영양소 값을 다시 계산하는 일괄 작업
+        각 식단의 Quantity(g)에 100g 기준 값을 곱해 덮어쓰고, 일별 합계와 기록 버전도 함께 갱신한다.
+        다시 계산된 날짜의 일별 합계는 저장할 때와 같이 등록된 함수들에 넘긴다 (오류는 로그만 남김).
+        FDDB에 없는 음식은 저장된 값을 그대로 둔다.
+        :param nutrition: 식품명을 인덱스로 하고 Calories, Protein, Carbs, Fat, Iron, Calc 컬럼을 가진 DataFrame (100g 기준)
+        :param user: 특정 사용자만 다시 계산 (None이면 전체)
+        :return: 갱신된 식단 수
+        """
+        self.flush()
+        nutrient_columns = NUMERIC_COLUMNS[1:]
+        where, params = ("WHERE user = ?", [user]) if user is not None else ("", [])
+
+        with self._write_lock, self._connect() as conn:
+            meals = pd.read_sql_query(f"SELECT id, user, Date, Food, Quantity FROM meals {where}", conn, params=params)
+            matched = meals.join(nutrition[nutrient_columns], on='Food', how='inner')
+            if matched.empty:
+                return 0
+
+            # 100g 기준 값 * 섭취량 / 100 (열 단위로 한 번에 계산)
+            adjusted = matched[nutrient_columns].fillna(0).mul(matched['Quantity'].fillna(0) / 100, axis=0)
+            conn.executemany(
+                f"UPDATE meals SET {', '.join(f'{col} = ?' for col in nutrient_columns)} WHERE id = ?",
+                zip(*(adjusted[col].tolist() for col in nutrient_columns), matched['id'].tolist())
+            )
+
+            # 바뀐 사용자의 일별 합계를 다시 만들고 버전을 올린다
+            users = [(name,) for name in matched['user'].unique()]
+            for name, in users:
+                DAILY_TOTALS.rebuild(conn, name)
+            conn.executemany(
+                "INSERT INTO write_versions (user, version) VALUES (?, 1) "
+                "ON CONFLICT(user) DO UPDATE SET version = version + 1",
+                users
+            )
+            keys = list(matched[['user', 'Date']].drop_duplicates().itertuples(index=False, name=None))
+            changed = DAILY_TOTALS.rows(conn, keys) if self._listeners else []
+            conn.commit()
+        self._notify(changed)
+        return len(matched)
+
+    def has_meals(self, user):
+        """저장된 식단이 있는지 확인 (일별 합계 기본키로 한 행만 조회)"""
+        self.flush()
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM daily_totals WHERE user = ? LIMIT 1", (user,)).fetchone() is not None
+
+    def version(self, user):
+        """
+        사용자의 기록 버전 (저장이 반영될 때마다 증가)
+        같은 버전이면 조회 결과도 같으므로 캐시 키로 쓸 수 있다
+        """
+        self.flush()
+        with self._connect() as conn:
+            row = conn.execute("SELECT version FROM write_versions WHERE user = ?", (user,)).fetchone()
+        return row[0] if row else 0
+
+    def by_meal(self, user, start=None, end=None):
+        """
+        식사 종류(아침/점심/저녁/간식 등)별 영양소 합계 ((user, Date) 인덱스 범위만 집계)
+        :return: Meal을 인덱스로 하는 DataFrame (Meals, Quantity, Calories, ...)
+        """
+        self.flush()
+
+        conditions, params = ["user = ?"], [user]
+        if start is not None:
+            conditions.append("Date >= ?")
+            params.append(to_date_text(start))
+        if end is not None:
+            conditions.append("Date <= ?")
+            params.append(to_date_text(end))
+
+        sums = ", ".join(f"COALESCE(SUM({col}), 0) AS {col}" for col in NUMERIC_COLUMNS)
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT COALESCE(Meal, '기타') AS Meal, COUNT(*) AS Meals, {sums} FROM meals "
+                f"WHERE {' AND '.join(conditions)} GROUP BY 1 ORDER BY 1",
+                conn, params=params
+            )
+        return df.set_index('Meal')
+
+    def daily(self, user, start=None, end=None, period="day"):
+        """
+        일별 합계 테이블에서 기간 합계 조회 (식단 기록 전체를 다시 집계하지 않음)
+        :param period: "day", "week"(월요일 시작), "month"
+        :return: Date를 인덱스로 하는 DataFrame (Meals, Quantity, Calories, ...)
+        """
+        self.flush()
+        with self._connect() as conn:
+            return DAILY_TOTALS.read(conn, user, start, end, period)
+
+
+@st.cache_resource
+def get_diary_store(db_path="meal_diary.db"):
+    """
+    프로세스 전체에서 하나의 저장소를 공유 (모든 세션, 카메라/대시보드 페이지 공통)
+    저장소를 만들 때 부족분 분석기를 연결하여, 어느 페이지에서 저장하든 목표 달성 알림이 갱신된다
+    """
+    # gap_analysis가 이 모듈을 불러오므로 순환 import를 피하려고 여기서 불러온다
+    from gap_analysis import get_gap_analyzer
+    store = MealDiaryStore(db_path)
+    store.add_listener(get_gap_analyzer(db_path).on_daily_totals)
+    return store
+
+
+def current_user():
+    """현재 세션의 사용자 이름 (BMI 페이지에서 입력한 이름, 없으면 guest)"""
+    return st.session_state.get("current_user") or "guest"
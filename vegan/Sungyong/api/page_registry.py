@@ -0,0 +1,107 @@
+import importlib
+import importlib.util
+import threading
+import time
+import streamlit as st
+
+
+class PageRegistry:
+    def __init__(self, recheck_seconds=5.0):
+        """
+        사이드바 섹션 -> 페이지 모듈 등록부 (프로세스 전체에서 공유)
+        페이지 모듈은 처음 열 때 import 되고 이후에는 불러온 모듈을 그대로 사용한다.
+        페이지별 로딩 시간은 세션마다 session_state에 따로 기록한다.
+        :param recheck_seconds: 모듈 파일이 없던 페이지를 다시 확인하는 간격 (실행 중에 추가된 페이지도 보이도록)
+        """
+        self.pages = {}
+        self.recheck_seconds = recheck_seconds
+        self._modules = {}
+        self._lock = threading.Lock()
+
+    def register(self, section, label, module_name, render):
+        """
+        :param section: 섹션 이름 (session_state["section"] 값)
+        :param label: 사이드바 버튼 문구
+        :param module_name: 페이지 모듈 이름
+        :param render: render(module) - 불러온 모듈로 페이지를 그리는 함수
+        """
+        self.pages[section] = {"label": label, "module": module_name, "render": render}
+
+    def available(self, section):
+        """
+        모듈 파일이 있는지만 확인 (import 하지 않음)
+        있는 페이지는 결과를 기억하고, 없던 페이지는 recheck_seconds마다 다시 확인한다
+        """
+        page = self.pages.get(section)
+        if page is None:
+            return False
+        if page.get("available"):
+            return True
+        now = time.monotonic()
+        if now - page.get("checked_at", float("-inf")) >= self.recheck_seconds:
+            if "checked_at" in page:
+                importlib.invalidate_caches()  # 새로 생긴 파일도 찾도록 디렉터리 목록 캐시를 비움
+            page["available"] = importlib.util.find_spec(page["module"]) is not None
+            page["checked_at"] = now
+        return page["available"]
+
+    def sections(self):
+        """사용 가능한 섹션 목록 (등록 순서)"""
+        return [section for section in self.pages if self.available(section)]
+
+    def _load(self, section):
+        """
+        :return: (모듈, 이번 호출에서 import 했는지, import 시간 ms)
+        이미 불러온 모듈은 잠금 없이 바로 반환하고, 처음 import 할 때만 잠그고 시간을 잰다
+        """
+        module_name = self.pages[section]["module"]
+        module = self._modules.get(module_name)
+        if module is not None:
+            return module, False, 0.0
+        with self._lock:
+            # 잠금을 기다리는 동안 다른 세션이 먼저 불러왔을 수 있음
+            module = self._modules.get(module_name)
+            if module is not None:
+                return module, False, 0.0
+            start = time.perf_counter()
+            module = importlib.import_module(module_name)
+            import_ms = (time.perf_counter() - start) * 1000
+            self._modules[module_name] = module
+            return module, True, import_ms
+
+    @staticmethod
+    def timings():
+        """현재 세션의 페이지별 로딩 시간 {섹션: {...}}"""
+        return st.session_state.setdefault("page_timings", {})
+
+    def show(self, section):
+        """섹션 페이지를 불러와 그리고 현재 세션의 로딩 시간을 기록"""
+        module, imported, import_ms = self._load(section)
+        start = time.perf_counter()
+        try:
+            self.pages[section]["render"](module)
+        finally:
+            render_ms = (time.perf_counter() - start) * 1000
+            timing = self.timings().setdefault(section, {"loads": 0})
+            timing["loads"] += 1
+            if imported:
+                # 모듈 import는 프로세스에서 한 번뿐이므로, 이 세션이 import 한 경우에만 기록
+                timing["import_ms"] = import_ms
+            if timing["loads"] == 1:
+                timing["first_render_ms"] = render_ms
+            else:
+                timing["warm_render_ms"] = render_ms
+
+    def show_timings(self):
+        """사이드바에 현재 세션의 페이지별 로딩 시간 표시"""
+        timings = self.timings()
+        if not timings:
+            return
+        with st.sidebar.expander("⏱️ 페이지 로딩 시간 (이 세션)"):
+            for section, timing in timings.items():
+                text = f"**{section}** · 첫 화면 {timing['first_render_ms']:.0f}ms"
+                if "import_ms" in timing:
+                    text += f" (+ 모듈 import {timing['import_ms']:.0f}ms)"
+                if "warm_render_ms" in timing:
+                    text += f" · 이후 {timing['warm_render_ms']:.0f}ms"
+                st.markdown(text + f" · {timing['loads']}회")
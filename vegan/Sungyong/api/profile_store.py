@@ -0,0 +1,119 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+import streamlit as st
+
+PROFILE_COLUMNS = ["name", "gender", "age", "height_cm", "weight_kg", "is_pregnant"]
+
+
+class ProfileStore:
+    """
+    사용자 프로필 저장소 (SQLite, name 기본키)
+    - 불러오기/저장은 기본키 인덱스로 한 행만 읽고 쓰므로 사용자 수와 무관하게 일정한 시간이 걸린다
+    - 저장은 INSERT ... ON CONFLICT DO UPDATE 한 문장으로 원자적으로 수행된다
+    """
+
+    def __init__(self, db_path="user_data.db"):
+        self.db_path = db_path
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    name TEXT PRIMARY KEY,
+                    gender TEXT,
+                    age INTEGER,
+                    height_cm REAL,
+                    weight_kg REAL,
+                    is_pregnant INTEGER,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+
+    def get(self, name):
+        """
+        이름으로 프로필 한 건 조회
+        :return: 프로필 딕셔너리 또는 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        profile = dict(row)
+        profile["is_pregnant"] = bool(profile["is_pregnant"])
+        return profile
+
+    def read_all(self):
+        """
+        전체 프로필 조회 (일괄 계산용)
+        :return: PROFILE_COLUMNS 컬럼의 DataFrame (is_pregnant는 bool)
+        """
+        with self._connect() as conn:
+            df = pd.read_sql_query(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles ORDER BY name", conn)
+        df["is_pregnant"] = df["is_pregnant"].fillna(0).astype(bool)
+        return df
+
+    def upsert(self, user_info):
+        """
+        프로필 저장 (없으면 추가, 있으면 갱신)
+        :param user_info: PROFILE_COLUMNS 키를 가진 딕셔너리
+        """
+        values = [user_info.get(col) for col in PROFILE_COLUMNS]
+        values[PROFILE_COLUMNS.index("is_pregnant")] = int(bool(user_info.get("is_pregnant")))
+        updates = ", ".join(f"{col} = excluded.{col}" for col in PROFILE_COLUMNS[1:])
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO profiles ({', '.join(PROFILE_COLUMNS)}) VALUES ({', '.join('?' * len(PROFILE_COLUMNS))}) "
+                f"ON CONFLICT(name) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP",
+                values
+            )
+            conn.commit()
+
+    def import_csv(self, csv_path, encoding="cp949"):
+        """
+        기존 user_data.csv를 가져온다. 이미 있는 이름은 CSV 값으로 덮어쓰지 않는다.
+        :return: 새로 가져온 행 수
+        """
+        if not os.path.exists(csv_path):
+            return 0
+        df = pd.read_csv(csv_path, encoding=encoding)
+        df = df.dropna(subset=["name"]).drop_duplicates(subset=["name"], keep="last")
+        rows = [
+            [
+                str(row["name"]), row.get("gender"), row.get("age"), row.get("height_cm"), row.get("weight_kg"),
+                int(str(row.get("is_pregnant")).strip().lower() in ("true", "1", "1.0"))
+            ]
+            for row in df.to_dict("records")
+        ]
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                f"INSERT OR IGNORE INTO profiles ({', '.join(PROFILE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(PROFILE_COLUMNS))})",
+                rows
+            )
+            conn.commit()
+            return cursor.rowcount
+
+
+@st.cache_resource
+def get_profile_store(db_path="user_data.db", legacy_csv_path="user_data.csv"):
+    """프로필 저장소 생성, 기존 CSV가 있으면 가져오기 (이미 있는 이름은 건너뜀)"""
+    store = ProfileStore(db_path)
+    store.import_csv(legacy_csv_path)
+    return store
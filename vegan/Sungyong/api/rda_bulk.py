@@ -0,0 +1,109 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from rda_rules import RULES, ACTIVITY_MULTIPLIER
+
+
+def compute_rda_bulk(df):
+    """
+    여러 사람의 BMI, 적정 체중, 권장 섭취량을 한 번에 계산 (rda_rules의 규칙 표를 배열 인덱싱)
+    :param df: gender, age, height_cm, weight_kg 컬럼 필수, is_pregnant, activity_level 컬럼 선택
+    :return: 입력과 같은 인덱스의 DataFrame
+             (bmi, bmi_status, ideal_weight_lower, ideal_weight_upper,
+              calories_rda, calcium_rda, iron_rda, protein_rda,
+              activity_level이 있으면 activity_calories, activity_protein, carbs_needs, fat_needs 추가)
+    """
+    return RULES.evaluate(df)
+
+
+def compute_rda_scalar(df):
+    """비교용: BmiRdaCalculator로 한 명씩 계산"""
+    from bmi import BmiRdaCalculator
+
+    rows = []
+    for gender, age, height_cm, weight_kg, is_pregnant in zip(
+            df["gender"], df["age"], df["height_cm"], df["weight_kg"], df["is_pregnant"]):
+        calculator = BmiRdaCalculator(gender, age, height_cm, weight_kg, is_pregnant)
+        lower, upper = calculator.calculate_ideal_weight()
+        rows.append({
+            "bmi": calculator.calculate_bmi(),
+            "ideal_weight_lower": lower,
+            "ideal_weight_upper": upper,
+            "calories_rda": calculator.calculate_calories_rda(),
+            "calcium_rda": calculator.calculate_calcium_rda(),
+            "iron_rda": calculator.calculate_iron_rda(),
+            "protein_rda": calculator.calculate_protein_rda()
+        })
+    return pd.DataFrame(rows, index=df.index)
+
+
+def make_cohort(n, seed=0):
+    """벤치마크용 임의 회원 데이터"""
+    rng = np.random.default_rng(seed)
+    gender = rng.choice(["남성", "여성"], n)
+    return pd.DataFrame({
+        "gender": gender,
+        "age": rng.integers(10, 90, n),
+        "height_cm": rng.uniform(140, 200, n).round(1),
+        "weight_kg": rng.uniform(35, 130, n).round(1),
+        "is_pregnant": (gender == "여성") & (rng.random(n) < 0.05),
+        "activity_level": rng.choice(list(ACTIVITY_MULTIPLIER), n)
+    })
+
+
+def benchmark(rows=1_000_000, scalar_rows=None):
+    """
+    벡터화 계산과 BmiRdaCalculator 반복 계산의 속도 비교 및 결과 일치 확인
+    :param scalar_rows: 반복 계산에 사용할 행 수 (None이면 전체)
+    """
+    cohort = make_cohort(rows)
+
+    start = time.perf_counter()
+    bulk = compute_rda_bulk(cohort)
+    bulk_seconds = time.perf_counter() - start
+
+    sample = cohort if scalar_rows is None else cohort.iloc[:scalar_rows]
+    start = time.perf_counter()
+    scalar = compute_rda_scalar(sample)
+    scalar_seconds = time.perf_counter() - start
+
+    columns = list(scalar.columns)
+    matches = np.allclose(bulk.loc[sample.index, columns].to_numpy(), scalar.to_numpy())
+    scalar_per_row = scalar_seconds / len(sample)
+    return {
+        "rows": rows,
+        "bulk_seconds": bulk_seconds,
+        "bulk_rows_per_sec": rows / bulk_seconds if bulk_seconds else 0,
+        "scalar_rows": len(sample),
+        "scalar_seconds": scalar_seconds,
+        "scalar_rows_per_sec": 1 / scalar_per_row if scalar_per_row else 0,
+        "speedup": scalar_per_row * rows / bulk_seconds if bulk_seconds else 0,
+        "results_match": bool(matches)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="회원 전체의 BMI/권장 섭취량 일괄 계산")
+    parser.add_argument('--db', default="user_data.db", help="프로필 저장소 (profile_store)")
+    parser.add_argument('--output', default="rda_targets.csv")
+    parser.add_argument('--benchmark', type=int, metavar="ROWS", help="임의 데이터 ROWS건으로 벡터화/반복 계산 비교")
+    parser.add_argument('--scalar-rows', type=int, default=None, help="벤치마크에서 반복 계산할 행 수 (기본: 전체)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        report = benchmark(args.benchmark, args.scalar_rows)
+        print("\n=== RDA Benchmark ===")
+        for key, value in report.items():
+            print(f"{key}: {value:,.3f}" if isinstance(value, float) else f"{key}: {value}")
+        return
+
+    from profile_store import ProfileStore
+    profiles = ProfileStore(args.db).read_all()
+    targets = compute_rda_bulk(profiles.dropna(subset=["gender", "age", "height_cm", "weight_kg"]))
+    profiles[["name"]].join(targets, how="inner").to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"Done: {len(targets)} profiles -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
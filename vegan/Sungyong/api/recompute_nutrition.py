@@ -0,0 +1,49 @@
+import argparse
+import time
+import pandas as pd
+from meal_store import MealDiaryStore
+from gap_analysis import get_gap_analyzer
+
+# FDDB 컬럼 -> 식단 기록 컬럼
+NUTRIENT_COLUMNS = {
+    '에너지(kcal)': 'Calories',
+    '단백질(g)': 'Protein',
+    '탄수화물(g)': 'Carbs',
+    '지방(g)': 'Fat',
+    '철(mg)': 'Iron',
+    '칼슘(mg)': 'Calc'
+}
+
+
+def load_nutrition_table(nutrition_data_path="FDDB.xlsx"):
+    """
+    FDDB 엑셀을 식품명 인덱스, 100g 기준 영양소 컬럼의 DataFrame으로 변환
+    같은 식품명이 여러 번 있으면 첫 번째 행을 사용한다 (영양소 분석 페이지와 동일)
+    """
+    nutrition_df = pd.read_excel(nutrition_data_path)
+    nutrition_df = nutrition_df.groupby('식품명').first()
+    return (
+        nutrition_df[list(NUTRIENT_COLUMNS)].rename(columns=NUTRIENT_COLUMNS)
+        .apply(pd.to_numeric, errors='coerce')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FDDB 갱신 후 저장된 식단의 영양소 값을 다시 계산")
+    parser.add_argument('--db', default="meal_diary.db")
+    parser.add_argument('--nutrition', default="FDDB.xlsx")
+    parser.add_argument('--user', default=None, help="특정 사용자만 다시 계산 (기본: 전체)")
+    args = parser.parse_args()
+
+    nutrition = load_nutrition_table(args.nutrition)
+    store = MealDiaryStore(args.db)
+    # 다시 계산된 날짜의 목표 달성 알림도 앱에서 저장할 때와 같이 갱신
+    store.add_listener(get_gap_analyzer(args.db).on_daily_totals)
+
+    started = time.perf_counter()
+    updated = store.recompute_nutrition(nutrition, user=args.user)
+    print(f"Done: {updated} meals recomputed in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
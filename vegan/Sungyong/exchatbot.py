@@ -1,4 +1,7 @@
 import os
+import pickle
+import threading
+from pathlib import Path
 from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -7,29 +10,130 @@ from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.prompts import PromptTemplate
 from langchain.docstore.document import Document
 import streamlit as st
+from pdf_text_cache import PdfTextCache
+from answer_cache import SemanticAnswerCache, documents_fingerprint, index_version
 
 # FAISS 인덱스 생성 및 로드 함수
-def create_or_load_faiss_index(folder_path, faiss_file_path, chunk_size=1000, chunk_overlap=100):
+def create_or_load_faiss_index(folder_path, faiss_file_path, chunk_size=1000, chunk_overlap=100, text_cache=None):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     embeddings = OpenAIEmbeddings()
 
     if os.path.exists(faiss_file_path):
-        vector_store = FAISS.load_local(faiss_file_path, embeddings, allow_dangerous_deserialization=True)
+        vector_store = load_faiss_index(faiss_file_path, embeddings)
     else:
+        # 페이지별 추출 텍스트는 캐시에서 읽고, 처음 보는 PDF만 파싱
+        text_cache = text_cache or PdfTextCache()
         all_docs = []
         for root, _, files in os.walk(folder_path):
             for file_name in files:
                 if file_name.endswith(".pdf"):
                     file_path = os.path.join(root, file_name)
-                    loader = PyPDFLoader(file_path)
-                    documents = loader.load()
+                    documents = text_cache.load(file_path, lambda path: PyPDFLoader(path).load())
                     docs = text_splitter.split_documents(documents)
                     all_docs.extend(docs)
 
         vector_store = FAISS.from_documents(all_docs, embeddings)
         vector_store.save_local(faiss_file_path)
+        # 인덱스를 새로 만든 뒤 바뀌거나 지워진 PDF의 페이지 텍스트 정리
+        text_cache.prune()
     return vector_store
 
+# 저장된 FAISS 인덱스 읽기 (지원되면 메모리 매핑, 읽기 전용)
+def load_faiss_index(faiss_file_path, embeddings):
+    """
+    FAISS.from_documents가 만드는 IndexFlat은 역색인 목록만 매핑하는 IO_FLAG_MMAP의 대상이 아니다.
+    flat 코드까지 매핑하는 IO_FLAG_MMAP_IFC가 있는 faiss 버전에서만 index.faiss를 매핑하고,
+    없거나 실패하면 FAISS.load_local로 일반적으로 읽는다.
+    메모리 절약의 대부분은 매핑이 아니라 get_vector_store(st.cache_resource)로 프로세스당 인덱스를 한 벌만 두는 데서 나온다.
+    """
+    import faiss
+
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    if mmap_flag is not None:
+        try:
+            index = faiss.read_index(str(Path(faiss_file_path) / "index.faiss"), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            index = None
+        if index is not None:
+            # FAISS.load_local과 같은 형식 (직접 만든 인덱스 파일만 읽음)
+            with open(Path(faiss_file_path) / "index.pkl", "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+    return FAISS.load_local(faiss_file_path, embeddings, allow_dangerous_deserialization=True)
+
+class SharedVectorStore:
+    def __init__(self, folder_path, faiss_file_path):
+        """
+        프로세스 전체에서 하나의 인덱스를 읽기 전용으로 공유 (모든 세션 공통, 세션마다 인덱스를 복사하지 않음)
+        버전은 인덱스를 만들거나 불러온 뒤의 파일 기준이므로, 처음 만든 인덱스도 다음 실행에서 다시 불러오지 않는다.
+        """
+        self.folder_path = folder_path
+        self.faiss_file_path = faiss_file_path
+        self._current = (None, None)  # (인덱스, 버전)
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        인덱스 파일이 새로 저장되었으면 (버전이 바뀌면) 다시 불러온다
+        :return: (vector_store, 인덱스 버전)
+        """
+        vector_store, version = self._current
+        if vector_store is not None and index_version(self.faiss_file_path) == version:
+            return self._current
+        with self._lock:
+            vector_store, version = self._current
+            if vector_store is None or index_version(self.faiss_file_path) != version:
+                # 이전 인덱스를 먼저 놓아 두 벌이 함께 메모리에 있지 않도록 함
+                self._current = (None, None)
+                with st.spinner("문서 인덱스를 불러오는 중..."):
+                    vector_store = create_or_load_faiss_index(
+                        self.folder_path, self.faiss_file_path, text_cache=get_text_cache()
+                    )
+                self._current = (vector_store, index_version(self.faiss_file_path))
+            return self._current
+
+@st.cache_resource
+def get_vector_store(folder_path, faiss_file_path):
+    return SharedVectorStore(folder_path, faiss_file_path)
+
+# PDF 페이지 텍스트 캐시 (적중/추출 횟수를 사이드바에 표시하도록 프로세스에서 공유)
+@st.cache_resource
+def get_text_cache():
+    return PdfTextCache()
+
+# 모든 세션이 공유하는 답변 캐시
+@st.cache_resource
+def get_answer_cache():
+    return SemanticAnswerCache()
+
+# 질문 임베딩 (답변 캐시 조회와 문서 검색에 같은 벡터를 사용)
+def embed_question(vector_store, question):
+    embedding = vector_store.embedding_function
+    if hasattr(embedding, "embed_query"):
+        return embedding.embed_query(question)
+    return embedding(question)
+
+# 사이드바에 답변 캐시 적중률 표시
+def show_cache_stats(cache):
+    with st.sidebar.expander("💾 답변 캐시"):
+        stats = cache.stats
+        st.metric("적중률", f"{cache.hit_rate * 100:.1f}%")
+        st.caption(
+            f"조회 {stats['lookups']}회 · 적중 {stats['hits']}회 · 저장된 답변 {cache.size}개 · "
+            f"만료 {stats['expired']}개 · 인덱스 변경으로 초기화 {stats['invalidations']}회"
+        )
+        if st.button("캐시 비우기"):
+            cache.clear()
+
+        # 이 프로세스에서 인덱스를 새로 만든 경우에만 표시
+        text_stats = get_text_cache().stats
+        if text_stats["hits"] or text_stats["misses"]:
+            st.caption(
+                f"PDF 텍스트 캐시: 재사용 {text_stats['hits']}개 · 새로 추출 {text_stats['misses']}개 · "
+                f"정리한 페이지 {text_stats['pruned_pages']}개"
+            )
+
 # QA 체인 및 프롬프트 설정 함수
 def create_qa_chain():
     # OpenAI API 키 확인
@@ -62,6 +166,11 @@ def create_qa_chain():
     )
     return create_stuff_documents_chain(llm, custom_prompt)
 
+# QA 체인은 상태가 없으므로 모든 세션이 공유
+@st.cache_resource
+def get_qa_chain():
+    return create_qa_chain()
+
 # 대화 기록 관리 클래스
 class ConversationHistory:
     def __init__(self):
@@ -94,18 +203,17 @@ def show():
     if "history_manager" not in st.session_state:
         st.session_state.history_manager = ConversationHistory()
 
-    if "qa_chain" not in st.session_state:
-        st.session_state.qa_chain = create_qa_chain()
-
-    if "vector_store" not in st.session_state:
-        st.session_state.vector_store = create_or_load_faiss_index(folder_path, faiss_file_path)
+    # 인덱스와 QA 체인은 프로세스에서 공유하고, 세션에는 대화 기록만 저장
+    vector_store, version = get_vector_store(folder_path, faiss_file_path).get()
+    qa_chain = get_qa_chain()
+    answer_cache = get_answer_cache()
+    answer_cache.set_index_version(version)
+    show_cache_stats(answer_cache)
 
     user_query = st.chat_input("질문을 입력하세요:")
 
     # 사용자 질문에 대한 챗봇 응답을 스트리밍으로 출력
     if user_query:
-        vector_store = st.session_state.vector_store
-        qa_chain = st.session_state.qa_chain
         history_manager = st.session_state.history_manager
 
         st.session_state.messages.append({"role": "user", "content": user_query})
@@ -113,7 +221,8 @@ def show():
             st.markdown(user_query)
 
         try:
-            retrieved_docs = vector_store.similarity_search(user_query, k=5)
+            question_vector = embed_question(vector_store, user_query)
+            retrieved_docs = vector_store.similarity_search_by_vector(question_vector, k=5)
             documents = [
                 Document(
                     page_content=doc.page_content if hasattr(doc, 'page_content') else str(doc),
@@ -123,12 +232,24 @@ def show():
             ]
             history_text = history_manager.to_text()
 
-            # 스트리밍된 메시지 처리
-            response = qa_chain.invoke({
-                "context": documents,
-                "question": user_query,
-                "history": history_text
-            })
+            # 이전 대화에 기대는 후속 질문은 답이 달라지므로 대화의 첫 질문만 캐시 사용
+            cacheable = not history_manager.history
+            fingerprint = documents_fingerprint(documents)
+            cached_answer = None
+            if cacheable:
+                cached_answer, _ = answer_cache.lookup(question_vector, fingerprint)
+
+            if cached_answer is not None:
+                response = cached_answer
+            else:
+                # 스트리밍된 메시지 처리
+                response = qa_chain.invoke({
+                    "context": documents,
+                    "question": user_query,
+                    "history": history_text
+                })
+                if cacheable and isinstance(response, str):
+                    answer_cache.store(user_query, question_vector, fingerprint, response)
 
             # 스트리밍된 응답 처리
             if isinstance(response, list):
@@ -142,6 +263,8 @@ def show():
                 st.session_state.messages.append({"role": "assistant", "content": response})
                 with st.chat_message("assistant"):
                     st.markdown(response)
+                    if cached_answer is not None:
+                        st.caption("💾 이전에 답변한 비슷한 질문의 답변입니다.")
 
             history_manager.add_entry(user_query, response[-1]['text'] if isinstance(response, list) else response)
             st.session_state.history_manager = history_manager
@@ -152,4 +275,4 @@ def show():
                 st.markdown(response)
 
 if __name__ == "__main__":
-    show_chatbot()
\ No newline at end of file
+    show()
\ No newline at end of file
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 from ultralytics import YOLO
 from PIL import Image
+from rda_rules import RULES
 
 
 class InBody:
@@ -21,49 +22,18 @@ class InBody:
         return round(bmi, 2)
 
     def interpret_bmi(self):
-        """BMI 해석"""
-        bmi = self.calculate_bmi()
-        if self.gender == "여성":
-            if bmi < 18.5:
-                return "저체중입니다."
-            elif 18.5 <= bmi < 24.9:
-                return "정상 체중입니다."
-            elif 25 <= bmi < 29.9:
-                return "과체중입니다."
-            else:
-                return "비만입니다."
-        else:
-            if bmi < 18.5:
-                return "저체중입니다."
-            elif 18.5 <= bmi < 24.9:
-                return "정상 체중입니다."
-            elif 25 <= bmi < 29.9:
-                return "과체중입니다."
-            else:
-                return "비만입니다."
+        """BMI 해석 (남녀 같은 구간, rda_rules의 BMI 구간 표 사용)"""
+        return RULES.bmi_status(self.calculate_bmi())
 
     def get_nutrient_recommendations(self):
-        """하루 권장 영양소 섭취량 계산"""
-        base_calories = 2000 if self.gender == "남성" else 1800
-        protein_ratio = 1.0 if self.gender == "남성" else 0.8
-
-        # 활동 수준에 따른 보정
-        activity_multiplier = {
-            "low": 1.2,
-            "moderate": 1.5,
-            "high": 1.8
-        }
-
-        calorie_needs = base_calories * activity_multiplier[self.activity_level]
-        protein_needs = self.weight * protein_ratio
-        carbs_needs = calorie_needs * 0.5 / 4  # 50% 탄수화물, 4kcal/g
-        fat_needs = calorie_needs * 0.3 / 9  # 30% 지방, 9kcal/g
+        """하루 권장 영양소 섭취량 계산 (활동 수준 규칙은 rda_rules에서 조회)"""
+        needs = RULES.activity_targets(self.gender, self.weight, self.activity_level)
 
         return {
-            "칼로리": f"{calorie_needs:.0f} kcal",
-            "단백질": f"{protein_needs:.1f} g",
-            "탄수화물": f"{carbs_needs:.1f} g",
-            "지방": f"{fat_needs:.1f} g"
+            "칼로리": f"{needs['calories']:.0f} kcal",
+            "단백질": f"{needs['protein']:.1f} g",
+            "탄수화물": f"{needs['carbs']:.1f} g",
+            "지방": f"{needs['fat']:.1f} g"
         }
 
     @staticmethod
@@ -93,5 +63,8 @@ class InBody:
             for nutrient, value in recommendations.items():
                 st.write(f"- {nutrient}: {value}")
 
+            # 음식 영양소 분석 페이지에서 한 끼 권장량 비교에 사용
+            st.session_state["rda_targets"] = RULES.targets(gender, age, weight)
+
 if __name__ == "__main__":
     InBody.show()
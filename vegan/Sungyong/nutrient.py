@@ -4,17 +4,37 @@ import numpy as np
 import pandas as pd
 from ultralytics import YOLO
 from PIL import Image
+import time
+from video import FrameGrabber, VideoFoodDetector
+from rda_rules import DEFAULT_TARGETS
+from cascade import CascadeDetector
+from detections import Detections
+
+# 영양소 이름 -> 하루 권장량 키 (rda_rules)
+MEAL_GAP_NUTRIENTS = {
+    "단백질": "protein_rda",
+    "칼슘": "calcium_rda",
+    "철분": "iron_rda"
+}
+MEALS_PER_DAY = 3
+
 
 class Nutrient:
     def __init__(self, model_path="C:/Users/Admin/Documents/GitHub/vegan_diet/vegan/Sungyong/api/best.pt",
-                nutrition_data_path="C:/Users/Admin/Documents/GitHub/vegan_diet/vegan/Sungyong/api/FDDB.xlsx"):
+                nutrition_data_path="C:/Users/Admin/Documents/GitHub/vegan_diet/vegan/Sungyong/api/FDDB.xlsx",
+                small_model_path=None):
         """
         Nutrient 클래스 생성자
         :param model_path: YOLO 모델 경로
         :param nutrition_data_path: 영양소 데이터 Excel 파일 경로
+        :param small_model_path: 같은 클래스로 학습한 작은 모델 경로 (주면 작은 모델로 먼저 탐지하고
+                                 불확실한 이미지만 model_path 모델로 다시 탐지)
         """
         try:
-            self.model = YOLO(model_path)
+            if small_model_path:
+                self.model = CascadeDetector(small_model_path, model_path)
+            else:
+                self.model = YOLO(model_path)
         except Exception as e:
             st.error(f"YOLO 모델 로드 실패: {e}")
             raise e
@@ -50,13 +70,10 @@ class Nutrient:
         try:
             results = self.model.predict(img_array)
 
+            # 이미지마다 박스 정보를 한 번에 배열로 옮겨 (음식명, 확률) 목록 생성
             detected_items = []
             for r in results:
-                for box in r.boxes:
-                    class_id = int(box.cls)
-                    class_name = self.model.names[class_id]
-                    confidence = box.conf.item()
-                    detected_items.append((class_name, confidence))
+                detected_items.extend(Detections.from_result(r, names=self.model.names).items())
 
             return detected_items
         except Exception as e:
@@ -91,65 +108,154 @@ class Nutrient:
         return nutrient_summary
     # [수정된 부분 끝]
 
-    def capture_from_camera(self):
+    def capture_from_camera(self, preview_fps=10):
         """
         카메라로부터 이미지를 캡처하는 함수
+        :param preview_fps: 미리보기 갱신 횟수 (초당)
         :return: 캡처된 이미지 (PIL Image 객체) 또는 None
         """
+        grabber = None
         try:
-            # 카메라 초기화
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
+            # 카메라 디코딩은 백그라운드 스레드에서 수행하고 최신 프레임만 유지
+            try:
+                grabber = FrameGrabber(0, target_fps=preview_fps).start()
+            except IOError:
                 st.error("카메라를 열 수 없습니다.")
                 return None
 
             # Streamlit에 카메라 미리보기 표시
             camera_placeholder = st.empty()
             capture_button = st.button("사진 촬영")
+            interval = 1.0 / preview_fps
 
             while not capture_button:
-                ret, frame = cap.read()
-                if ret:
-                    # BGR을 RGB로 변환
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    camera_placeholder.image(frame_rgb, channels="RGB", caption="카메라 미리보기")
-                else:
+                item = grabber.read()
+                if item is None:
+                    # 카메라 스트림 종료
                     st.error("프레임을 읽을 수 없습니다.")
                     break
+                _, frame = item
+                if frame is not None:  # None이면 아직 새 프레임 없음 (시간 초과)
+                    camera_placeholder.image(frame, channels="BGR", caption="카메라 미리보기")
+                # 모든 프레임을 보내지 않고 미리보기 속도를 제한
+                time.sleep(interval)
 
             if capture_button:
-                ret, frame = cap.read()
-                if ret:
+                item = grabber.read()
+                if item is not None and item[1] is not None:
                     # BGR을 RGB로 변환하고 PIL Image로 변환
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    image = Image.fromarray(frame_rgb)
-                    cap.release()
-                    return image
+                    frame_rgb = cv2.cvtColor(item[1], cv2.COLOR_BGR2RGB)
+                    return Image.fromarray(frame_rgb)
                 else:
                     st.error("이미지 캡처에 실패했습니다.")
-
-            cap.release()
         except Exception as e:
             st.error(f"카메라 캡처 중 오류 발생: {e}")
             return None
+        finally:
+            if grabber is not None:
+                grabber.stop()
         
         return None
 
+    def analyze_video(self, source, target_fps=5, max_seconds=30):
+        """
+        동영상 또는 실시간 카메라에서 음식을 탐지하고 프레임 간 중복을 제거하여 집계
+        :param source: 카메라 번호, 동영상 파일 경로 또는 스트림 URL
+        :param target_fps: 초당 탐지 횟수
+        :param max_seconds: 최대 분석 시간 (초)
+        :return: 집계 결과 {"foods": [(음식명, 확률)], "counts": {...}, "stats": {...}}
+        """
+        detector = VideoFoodDetector(self.model, target_fps=target_fps)
+        frame_placeholder = st.empty()
+        status_placeholder = st.empty()
+
+        try:
+            for frame, (boxes, classes, confidences) in detector.run(source, max_seconds=max_seconds):
+                # 탐지된 프레임만 화면에 표시
+                for box, class_id, conf in zip(boxes.astype(int), classes, confidences):
+                    cv2.rectangle(frame, tuple(box[:2]), tuple(box[2:]), (0, 0, 255), 2)
+                frame_placeholder.image(frame, channels="BGR", caption="실시간 탐지")
+                status_placeholder.write(
+                    f"처리 {detector.stats['processed']} 프레임 / 확정된 음식 {len(detector.tracker.confirmed())}개"
+                )
+        except IOError as e:
+            st.error(str(e))
+            return None
+        except Exception as e:
+            st.error(f"동영상 분석 중 오류 발생: {e}")
+            return None
+
+        return detector.summary()
+
+    def show_meal_summary(self, detected_items):
+        """
+        탐지된 음식 목록과 합산 영양소 정보를 표시
+        :param detected_items: 탐지된 음식 목록 [(음식명, 확률)]
+        """
+        if not detected_items:
+            st.error("❌ 음식이 감지되지 않았습니다. 다시 시도해 주세요.")
+            return
+
+        st.write("**📋 탐지된 음식:**")
+        for food, confidence in detected_items:
+            st.write(f"- {food}: {confidence:.2f} 확률")
+
+        # [수정된 부분 시작] - 영양소 정보 출력 방식 변경
+        st.write("📊 **영양 성분 정보**")
+        st.write("기준량: 100ml/100g")
+
+        nutrient_info = self.get_nutritional_info(detected_items)
+
+        # 데이터프레임으로 변환하여 테이블 형식으로 표시
+        nutrient_df = pd.DataFrame([
+            {"영양성분": name, "함량": f"{info['value']:.1f} {info['unit']}"} 
+            for name, info in nutrient_info.items()
+        ])
+
+        st.table(nutrient_df)
+
+        # 영양소 분석 코멘트 추가
+        st.write("💡 **영양소 분석**")
+        # 한 끼 기준량(하루 권장량 / 끼니 수)과 비교 (신체 분석을 했으면 그 권장량 사용)
+        targets = st.session_state.get("rda_targets", DEFAULT_TARGETS)
+        for name, key in MEAL_GAP_NUTRIENTS.items():
+            per_meal = targets[key] / MEALS_PER_DAY
+            pct = nutrient_info[name]["value"] / per_meal * 100 if per_meal else 0
+            unit = nutrient_info[name]["unit"]
+            if pct >= 100:
+                st.info(f"{name}이(가) 풍부한 식사입니다. (한 끼 권장량의 {pct:.0f}%)")
+            elif pct < 50:
+                st.warning(f"{name}이(가) 부족합니다. 한 끼 권장량까지 "
+                           f"{per_meal - nutrient_info[name]['value']:.1f}{unit} 더 필요합니다. ({pct:.0f}%)")
+        # [수정된 부분 끝]
+
     def show(self):
         """스트림릿 페이지 UI 구성 및 음식 분석"""
         st.title("🍗 음식 영양소 분석기")
         st.subheader("사진을 업로드하면 음식의 영양소 정보를 분석합니다.")
 
-        input_method = st.radio("이미지 입력 방식 선택", ["파일 업로드", "카메라 촬영"])
+        input_method = st.radio("이미지 입력 방식 선택", ["파일 업로드", "카메라 촬영", "동영상/실시간 탐지"])
         
         image = None
         if input_method == "파일 업로드":
             uploaded_file = st.file_uploader("음식 사진을 업로드하세요", type=["jpg", "png", "jpeg"])
             if uploaded_file is not None:
                 image = Image.open(uploaded_file)
-        else:
+        elif input_method == "카메라 촬영":
             if st.button("카메라 켜기"):
                 image = self.capture_from_camera()
+        else:
+            source = st.text_input("영상 소스 (카메라 번호, 동영상 파일 경로 또는 rtsp:// 주소)", "0")
+            target_fps = st.slider("초당 탐지 횟수", min_value=1, max_value=15, value=5)
+            max_seconds = st.number_input("최대 분석 시간 (초)", min_value=5, max_value=600, value=30)
+            if st.button("탐지 시작"):
+                summary = self.analyze_video(source, target_fps=target_fps, max_seconds=max_seconds)
+                if summary:
+                    self.show_meal_summary(summary["foods"])
+                    stats = summary["stats"]
+                    st.caption(
+                        f"디코딩 {stats['decoded']} / 탐지 {stats['processed']} / 버린 프레임 {stats['dropped']}"
+                    )
 
         if image is not None:
             try:
@@ -160,38 +266,7 @@ class Nutrient:
                 detected_items = self.analyze_food(image)
 
                 if detected_items:
-                    st.write("**📋 탐지된 음식:**")
-                    for food, confidence in detected_items:
-                        st.write(f"- {food}: {confidence:.2f} 확률")
-
-                    # [수정된 부분 시작] - 영양소 정보 출력 방식 변경
-                    st.write("📊 **영양 성분 정보**")
-                    st.write("기준량: 100ml/100g")
-                    
-                    nutrient_info = self.get_nutritional_info(detected_items)
-                    
-                    # 데이터프레임으로 변환하여 테이블 형식으로 표시
-                    nutrient_df = pd.DataFrame([
-                        {"영양성분": name, "함량": f"{info['value']:.1f} {info['unit']}"} 
-                        for name, info in nutrient_info.items()
-                    ])
-                    
-                    st.table(nutrient_df)
-                    
-                    # 영양소 분석 코멘트 추가
-                    st.write("💡 **영양소 분석**")
-                    comments = []
-                    if nutrient_info["단백질"]["value"] > 15:
-                        comments.append("단백질이 풍부한 식사입니다.")
-                    if nutrient_info["칼슘"]["value"] > 200:
-                        comments.append("칼슘이 풍부하게 포함되어 있습니다.")
-                    if nutrient_info["철분"]["value"] > 2:
-                        comments.append("철분이 풍부한 식사입니다.")
-                    
-                    if comments:
-                        for comment in comments:
-                            st.info(comment)
-                    # [수정된 부분 끝]
+                    self.show_meal_summary(detected_items)
                 else:
                     st.error("❌ 음식이 감지되지 않았습니다. 다시 시도해 주세요.")
             except Exception as e:
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from langchain.docstore.document import Document
+
+
+def file_sha256(file_path, block_size=1 << 20):
+    """파일 내용의 SHA-256 (1MB씩 읽음)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfTextCache:
+    def __init__(self, db_path="pdf_text_cache.db"):
+        """
+        PDF 페이지별 추출 텍스트 캐시 (파일 내용 해시 기준)
+        같은 내용의 PDF는 다시 파싱하지 않으므로 chunk_size/chunk_overlap이나 임베딩 모델을 바꿔
+        인덱스를 다시 만들어도 텍스트 추출은 처음 한 번만 한다.
+        파일 크기와 수정 시각이 그대로면 해시도 다시 계산하지 않는다.
+        """
+        self.db_path = db_path
+        self.stats = {"hits": 0, "misses": 0, "pruned_pages": 0}
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pdf_pages (
+                    file_hash TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    PRIMARY KEY (file_hash, page)
+                )
+            """)
+            # 경로별 마지막으로 확인한 크기/수정 시각과 해시
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pdf_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    pages INTEGER NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def _file_hash(self, conn, file_path):
+        """크기와 수정 시각이 기록과 같으면 저장된 해시를 사용"""
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        row = conn.execute(
+            "SELECT file_hash FROM pdf_files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0], stat
+        return file_sha256(file_path), stat
+
+    def load(self, file_path, parse):
+        """
+        PDF 페이지별 Document 목록 (PyPDFLoader(file_path).load()와 같은 형식)
+        :param parse: 캐시에 없을 때 호출할 파서 - parse(file_path) -> Document 목록
+        """
+        with self._connect() as conn:
+            file_hash, stat = self._file_hash(conn, file_path)
+            rows = conn.execute(
+                "SELECT text, metadata FROM pdf_pages WHERE file_hash = ? ORDER BY page", (file_hash,)
+            ).fetchall()
+            # 텍스트가 없는 PDF(0페이지)도 pdf_files에 기록되므로 다시 파싱하지 않는다
+            known = conn.execute("SELECT pages FROM pdf_files WHERE file_hash = ? LIMIT 1", (file_hash,)).fetchone()
+
+            if rows or (known is not None and known[0] == 0):
+                self.stats["hits"] += 1
+                documents = []
+                for text, metadata in rows:
+                    metadata = json.loads(metadata)
+                    metadata["source"] = file_path
+                    documents.append(Document(page_content=text, metadata=metadata))
+            else:
+                self.stats["misses"] += 1
+                documents = parse(file_path)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pdf_pages (file_hash, page, text, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (file_hash, i, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str))
+                        for i, doc in enumerate(documents)
+                    ]
+                )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO pdf_files (path, size, mtime_ns, file_hash, pages) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, file_hash, len(documents))
+            )
+            conn.commit()
+        return documents
+
+    def prune(self):
+        """어떤 경로에서도 참조하지 않는 해시의 페이지 삭제 (파일이 바뀌거나 지워진 경우)"""
+        with self._connect() as conn:
+            for (path,) in conn.execute("SELECT path FROM pdf_files").fetchall():
+                if not os.path.exists(path):
+                    conn.execute("DELETE FROM pdf_files WHERE path = ?", (path,))
+            deleted = conn.execute(
+                "DELETE FROM pdf_pages WHERE file_hash NOT IN (SELECT file_hash FROM pdf_files)"
+            ).rowcount
+            conn.commit()
+        self.stats["pruned_pages"] += deleted
+        return deleted
@@ -5,15 +5,21 @@ import pandas as pd
 from ultralytics import YOLO
 from PIL import Image
 import io
+from cascade import CascadeDetector
 
 class Nutrient:
-    def __init__(self, model_path="yolov8x.pt", nutrition_data_path="nutrition_data.csv"):
+    def __init__(self, model_path="yolov8x.pt", nutrition_data_path="nutrition_data.csv", small_model_path="yolov8n.pt"):
         """
         Nutrient 클래스 생성자
-        :param model_path: YOLO 모델 경로
+        :param model_path: YOLO 모델 경로 (큰 모델)
         :param nutrition_data_path: 영양소 데이터 CSV 파일 경로
+        :param small_model_path: 먼저 실행할 작은 모델 경로 (None이면 model_path 모델만 사용)
         """
-        self.model = YOLO(model_path)
+        if small_model_path:
+            # 작은 모델로 먼저 탐지하고 불확실한 이미지만 큰 모델로 다시 탐지
+            self.model = CascadeDetector(small_model_path, model_path)
+        else:
+            self.model = YOLO(model_path)
         self.nutrition_df = pd.read_csv(nutrition_data_path).set_index("Food")
 
     def analyze_food(self, image):
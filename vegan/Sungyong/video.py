@@ -0,0 +1,291 @@
+import os
+import time
+import queue
+import threading
+import cv2
+import numpy as np
+
+
+class FrameGrabber:
+    def __init__(self, source=0, target_fps=5, queue_size=2):
+        """
+        백그라운드 스레드에서 프레임을 디코딩하는 클래스
+        :param source: 카메라 번호, 동영상 파일 경로 또는 스트림 URL (rtsp://...)
+        :param target_fps: 탐지에 넘길 초당 프레임 수
+        :param queue_size: 대기 큐 크기 (실시간 소스는 가득 차면 오래된 프레임을 버림)
+        """
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        self.source = source
+        # 파일은 모든 구간을 처리해야 하므로 버리지 않고, 카메라/스트림은 최신 프레임만 유지
+        self.is_live = not (isinstance(source, str) and os.path.isfile(source))
+        self.target_fps = target_fps
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.decoded = 0
+        self._stop = threading.Event()
+        self.finished = False  # 디코딩 스레드가 끝났는지
+        self._ended = False  # read()가 종료를 알렸는지
+        self._thread = None
+        self.cap = None
+
+    def start(self):
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            raise IOError(f"영상 소스를 열 수 없습니다: {self.source}")
+        # 카메라 내부 버퍼를 최소화하여 지연 누적 방지
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        source_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        # 파일은 target_fps에 맞춰 n번째 프레임마다 하나씩 사용
+        stride = max(1, round(source_fps / self.target_fps)) if not self.is_live else 1
+        index = 0
+
+        while not self._stop.is_set():
+            if stride > 1 and index % stride:
+                # 건너뛸 프레임은 디코딩 없이 grab만 수행
+                if not self.cap.grab():
+                    break
+                index += 1
+                continue
+
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            index += 1
+            self.decoded += 1
+            timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 if not self.is_live else time.time()
+
+            if self.is_live:
+                # 처리가 밀리면 가장 오래된 프레임을 버리고 최신 프레임을 넣음
+                while True:
+                    try:
+                        self.frames.put_nowait((timestamp, frame))
+                        break
+                    except queue.Full:
+                        try:
+                            self.frames.get_nowait()
+                            self.dropped += 1
+                        except queue.Empty:
+                            pass
+            else:
+                while not self._stop.is_set():
+                    try:
+                        self.frames.put((timestamp, frame), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+        self.finished = True
+        if self._stop.is_set():
+            return  # stop()으로 끝낸 경우 읽는 쪽이 없으므로 종료 신호를 넣지 않음
+        # 종료 신호 - 큐가 가득 차 있어도 막히지 않도록 가장 오래된 프레임을 버리고 넣음
+        while True:
+            try:
+                self.frames.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def read(self, timeout=1.0):
+        """
+        다음 프레임을 가져온다
+        :return: (timestamp, BGR 프레임)
+                 timeout 안에 새 프레임이 없으면 (None, None) - 스트림은 계속되므로 다시 읽으면 된다
+                 스트림이 끝났거나 stop()을 호출했으면 None (이후 호출도 계속 None)
+        """
+        if self._ended:
+            return None
+        try:
+            item = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            if self.finished and self.frames.empty():
+                self._ended = True
+                return None
+            return (None, None)
+        if item is None:
+            self._ended = True
+        return item
+
+    def stop(self):
+        self._stop.set()
+        self._ended = True
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self.cap is not None:
+            self.cap.release()
+
+
+def box_iou(box, boxes):
+    """
+    하나의 박스와 여러 박스 간 IoU 계산 (xyxy)
+    """
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+class FoodTracker:
+    def __init__(self, iou_threshold=0.3, max_missing=10, min_hits=3):
+        """
+        프레임 간 같은 음식을 한 번만 세기 위한 IoU 기반 추적기
+        :param iou_threshold: 같은 객체로 판단할 최소 IoU
+        :param max_missing: 이 프레임 수 이상 보이지 않으면 추적 종료
+        :param min_hits: 이 횟수 이상 탐지되어야 음식으로 확정 (순간 오탐 제거)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missing = max_missing
+        self.min_hits = min_hits
+        self.tracks = []
+        self.finished = []
+        self.next_id = 0
+
+    def update(self, boxes, classes, confidences, class_names):
+        """
+        한 프레임의 탐지 결과로 추적 상태를 갱신
+        :param boxes: (N, 4) xyxy 배열
+        :param classes: (N,) 클래스 번호 배열
+        :param confidences: (N,) 신뢰도 배열
+        """
+        matched = set()
+        for track in self.tracks:
+            candidates = np.where((classes == track["class"]) & ~np.isin(np.arange(len(classes)), list(matched)))[0]
+            if len(candidates):
+                ious = box_iou(track["bbox"], boxes[candidates])
+                best = int(np.argmax(ious))
+                if ious[best] >= self.iou_threshold:
+                    idx = candidates[best]
+                    matched.add(idx)
+                    track["bbox"] = boxes[idx]
+                    track["hits"] += 1
+                    track["missing"] = 0
+                    track["confidence"] = max(track["confidence"], float(confidences[idx]))
+                    continue
+            track["missing"] += 1
+
+        for idx in range(len(classes)):
+            if idx in matched:
+                continue
+            class_id = int(classes[idx])
+            self.tracks.append({
+                "id": self.next_id,
+                "class": class_id,
+                "class_name": class_names[class_id],
+                "bbox": boxes[idx],
+                "confidence": float(confidences[idx]),
+                "hits": 1,
+                "missing": 0
+            })
+            self.next_id += 1
+
+        alive = []
+        for track in self.tracks:
+            if track["missing"] > self.max_missing:
+                self.finished.append(track)
+            else:
+                alive.append(track)
+        self.tracks = alive
+
+    def confirmed(self):
+        """
+        확정된 음식 목록 [(음식명, 최고 신뢰도)] - 같은 음식이 여러 번 나와도 추적 id 단위로 한 번만 포함
+        """
+        return [
+            (track["class_name"], track["confidence"])
+            for track in self.finished + self.tracks
+            if track["hits"] >= self.min_hits
+        ]
+
+
+class VideoFoodDetector:
+    def __init__(self, model, target_fps=5, conf=0.25, imgsz=640):
+        """
+        동영상/실시간 카메라 음식 탐지기
+        :param model: ultralytics YOLO 모델
+        :param target_fps: 초당 탐지 횟수
+        """
+        self.model = model
+        self.target_fps = target_fps
+        self.conf = conf
+        self.imgsz = imgsz
+        self.tracker = FoodTracker()
+        self.stats = {"processed": 0, "dropped": 0, "decoded": 0, "inference_ms": 0.0}
+
+    def detect(self, frame):
+        """
+        한 프레임 탐지 - 박스/클래스/신뢰도를 한 번에 배열로 가져온다
+        """
+        start = time.perf_counter()
+        result = self.model.predict(frame, conf=self.conf, imgsz=self.imgsz, verbose=False)[0]
+        self.stats["inference_ms"] += (time.perf_counter() - start) * 1000
+        boxes = result.boxes
+        return (boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy().astype(int), boxes.conf.cpu().numpy())
+
+    def run(self, source=0, max_seconds=None, stop_event=None):
+        """
+        프레임을 target_fps 간격으로 탐지하며 (프레임, 탐지 결과)를 순서대로 반환하는 제너레이터
+        :param source: 카메라 번호, 파일 경로 또는 스트림 URL
+        :param max_seconds: 최대 실행 시간 (None이면 스트림 끝까지)
+        :param stop_event: 외부에서 중지할 때 사용하는 threading.Event
+        """
+        grabber = FrameGrabber(source, target_fps=self.target_fps).start()
+        interval = 1.0 / self.target_fps
+        started = time.time()
+        next_time = started
+
+        try:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if max_seconds is not None and time.time() - started > max_seconds:
+                    break
+
+                item = grabber.read()
+                if item is None:
+                    break  # 스트림 종료
+                timestamp, frame = item
+                if frame is None:
+                    continue  # 아직 새 프레임 없음 (시간 초과)
+
+                if grabber.is_live:
+                    # 실시간 소스는 목표 FPS보다 빠르게 탐지하지 않음
+                    now = time.time()
+                    if now < next_time:
+                        time.sleep(next_time - now)
+                    next_time = max(next_time + interval, time.time())
+
+                boxes, classes, confidences = self.detect(frame)
+                self.tracker.update(boxes, classes, confidences, self.model.names)
+                self.stats["processed"] += 1
+                yield frame, (boxes, classes, confidences)
+        finally:
+            grabber.stop()
+            self.stats["dropped"] = grabber.dropped
+            self.stats["decoded"] = grabber.decoded
+
+    def summary(self):
+        """
+        전체 영상에서 집계된 식사 결과
+        :return: {"foods": [(음식명, 신뢰도)], "counts": {음식명: 개수}, "stats": {...}}
+        """
+        foods = self.tracker.confirmed()
+        counts = {}
+        for name, _ in foods:
+            counts[name] = counts.get(name, 0) + 1
+        stats = dict(self.stats)
+        if stats["processed"]:
+            stats["avg_inference_ms"] = stats["inference_ms"] / stats["processed"]
+        return {"foods": foods, "counts": counts, "stats": stats}
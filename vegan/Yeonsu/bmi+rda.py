@@ -1,4 +1,5 @@
 import streamlit as st
+from rda_rules import RULES
 
 # BMI 계산 함수
 def calculate_bmi(weight, height):
@@ -11,44 +12,15 @@ def calculate_ideal_weight(height):
     upper_weight = 24.9 * (height ** 2)
     return lower_weight, upper_weight
 
-# 칼슘 권장 섭취량 계산 함수
+# 권장 섭취량 계산 함수 (나이/성별/임신 여부 구간 규칙은 rda_rules에서 조회)
 def calculate_calcium_rda(age, gender, weight):
-    if age <= 18:  # 성장기 아동/청소년
-        base = 1300
-        factor = 5
-    elif gender == "여성" and age > 50:  # 폐경 이후 여성
-        base = 1200
-        factor = 2
-    else:  # 일반 성인 및 노인
-        base = 1000
-        factor = 3 if age < 65 else 2
-    return base + (weight * factor)
+    return RULES.targets(gender, age, weight)["calcium_rda"]
 
-# 철분 권장 섭취량 계산 함수
 def calculate_iron_rda(age, gender, weight, is_pregnant):
-    if is_pregnant:  # 임신
-        base = 27
-        factor = 0.3
-    elif gender == "여성" and 19 <= age <= 50:  # 가임기 여성
-        base = 18
-        factor = 0.1
-    elif age <= 18:  # 성장기
-        base = 11 if gender == "남성" else 15
-        factor = 0.2
-    else:  # 일반 성인 및 노인
-        base = 8
-        factor = 0.1
-    return base + (weight * factor)
+    return RULES.targets(gender, age, weight, is_pregnant)["iron_rda"]
 
-# 단백질 권장 섭취량 계산 함수
 def calculate_protein_rda(age, weight):
-    if age <= 18:  # 성장기 아동/청소년
-        factor = 1.0
-    elif age > 65:  # 노인
-        factor = 1.2
-    else:  # 일반 성인
-        factor = 0.8
-    return weight * factor
+    return RULES.targets(None, age, weight)["protein_rda"]
 
 # 스트림릿 UI 설정
 st.title("🧮 BMI 및 RDA 계산기")
@@ -97,14 +69,7 @@ if st.button("결과 계산"):
         """, unsafe_allow_html=True)
 
         # BMI 상태 출력
-        if bmi < 18.5:
-            status = "저체중입니다."
-        elif 18.5 <= bmi < 24.9:
-            status = "정상 체중입니다."
-        elif 25 <= bmi < 29.9:
-            status = "과체중입니다."
-        else:
-            status = "비만입니다."
+        status = RULES.bmi_status(bmi)
         st.markdown(f"""
         <div class='result-card'>
             <div class='result-title'>➡️ BMI 상태</div>
@@ -1,4 +1,5 @@
 import streamlit as st
+from rda_rules import RULES
 
 # BMI 계산 함수
 def calculate_bmi(weight, height):
@@ -32,14 +33,7 @@ if st.button("BMI 계산"):
         st.write(f"당신의 BMI는 {bmi:.2f}입니다.")
         
         # BMI 상태 출력
-        if bmi < 18.5:
-            st.write("저체중입니다.")
-        elif 18.5 <= bmi < 24.9:
-            st.write("정상 체중입니다.")
-        elif 25 <= bmi < 29.9:
-            st.write("과체중입니다.")
-        else:
-            st.write("비만입니다.")
+        st.write(RULES.bmi_status(bmi))
         
         # 적정 체중 계산
         lower_weight, upper_weight = calculate_ideal_weight(height_m)
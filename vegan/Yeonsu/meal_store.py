@@ -0,0 +1,138 @@
+import os
+import pandas as pd
+from daily_totals import DailyTotals, connect, to_date_text
+
+MEAL_COLUMNS = ["Date", "Meal", "Food", "Quantity", "Unit", "Calories", "Protein", "Carbs", "Fat", "Iron"]
+NUMERIC_COLUMNS = ["Quantity", "Calories", "Protein", "Carbs", "Fat", "Iron"]
+
+# 날짜별 합계 (사용자 구분 없음)
+DAILY_TOTALS = DailyTotals(NUMERIC_COLUMNS, user_key=False)
+
+
+class MealLogStore:
+    """
+    식단 기록 저장소 (SQLite WAL 모드)
+    - 저장은 한 줄 INSERT만 수행하므로 기록이 늘어나도 저장 비용이 일정하다
+    - Date 인덱스로 기간 조회 시 해당 날짜 범위만 읽는다
+    - WAL 모드와 busy_timeout으로 여러 Streamlit 세션이 동시에 저장해도 안전하다
+    - 저장과 같은 트랜잭션에서 일별 합계(daily_totals)를 갱신하므로 통계 화면은 합계 행만 읽는다
+    """
+
+    def __init__(self, db_path="meal_data.db", compact_every=1000):
+        """
+        :param db_path: SQLite 파일 경로
+        :param compact_every: 이 건수만큼 저장될 때마다 WAL 파일을 정리
+        """
+        self.db_path = db_path
+        self.compact_every = compact_every
+        self._init_db()
+
+    def _connect(self):
+        return connect(self.db_path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            # auto_vacuum은 테이블 생성 전에 설정해야 적용된다
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Date TEXT NOT NULL,
+                    Meal TEXT,
+                    Food TEXT,
+                    Quantity REAL,
+                    Unit TEXT,
+                    Calories REAL,
+                    Protein REAL,
+                    Carbs REAL,
+                    Fat REAL,
+                    Iron REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_meals_date ON meals (Date)")
+            DAILY_TOTALS.create(conn)
+            conn.commit()
+
+    @staticmethod
+    def _add_daily_totals(conn, values):
+        """저장할 행들을 날짜별로 합산하여 일별 합계에 더한다 (호출한 쪽의 트랜잭션 안에서 실행)"""
+        rows = [dict(zip(MEAL_COLUMNS, value)) for value in values]
+        DAILY_TOTALS.add(conn, [((row["Date"],), row) for row in rows])
+
+    def append(self, row):
+        """
+        식단 한 건 저장
+        :param row: MEAL_COLUMNS 키를 가진 딕셔너리
+        :return: 저장된 행 id
+        """
+        values = [to_date_text(row["Date"])] + [row.get(col) for col in MEAL_COLUMNS[1:]]
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO meals ({', '.join(MEAL_COLUMNS)}) VALUES ({', '.join('?' * len(MEAL_COLUMNS))})",
+                values
+            )
+            self._add_daily_totals(conn, [values])
+            conn.commit()
+            row_id = cursor.lastrowid
+
+        # 프로세스와 무관하게 id 기준으로 주기적 정리
+        if self.compact_every and row_id % self.compact_every == 0:
+            self.compact()
+        return row_id
+
+    def append_many(self, rows):
+        """여러 건을 하나의 트랜잭션으로 저장"""
+        values = [
+            [to_date_text(row["Date"])] + [row.get(col) for col in MEAL_COLUMNS[1:]]
+            for row in rows
+        ]
+        if not values:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO meals ({', '.join(MEAL_COLUMNS)}) VALUES ({', '.join('?' * len(MEAL_COLUMNS))})",
+                values
+            )
+            self._add_daily_totals(conn, values)
+            conn.commit()
+
+    def daily(self, start=None, end=None, period="day"):
+        """
+        일별 합계 테이블에서 기간 합계 조회 (식단 기록 전체를 다시 집계하지 않음)
+        :param period: "day", "week"(월요일 시작), "month"
+        :return: Date를 인덱스로 하는 DataFrame (Meals, Quantity, Calories, ...)
+        """
+        with self._connect() as conn:
+            return DAILY_TOTALS.read(conn, start=start, end=end, period=period)
+
+    def is_empty(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM meals LIMIT 1").fetchone() is None
+
+    def compact(self):
+        """
+        WAL 내용을 본 파일에 반영하고 WAL 파일을 비운 뒤, 빈 페이지를 반환한다
+        """
+        with self._connect() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.commit()
+
+    def import_csv(self, csv_path):
+        """
+        기존 meal_data.csv를 한 번만 가져온다 (저장소가 비어 있을 때만)
+        :return: 가져온 행 수
+        """
+        if not os.path.exists(csv_path) or not self.is_empty():
+            return 0
+        df = pd.read_csv(csv_path)
+        df = df.dropna(subset=["Date"])
+        for col in MEAL_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        # NaN은 NULL로 저장
+        rows = df[MEAL_COLUMNS].astype(object).where(df[MEAL_COLUMNS].notna(), None).to_dict("records")
+        self.append_many(rows)
+        return len(rows)
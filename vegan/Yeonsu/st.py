@@ -1,30 +1,14 @@
 import streamlit as st
+from rda_rules import RULES
 
 # BMI 계산 함수
 def calculate_bmi(weight, height):
     bmi = weight / (height ** 2)
     return bmi
 
-# BMI 해석 함수 (성별 고려)
+# BMI 해석 함수 (남녀 같은 구간, rda_rules의 BMI 구간 표 사용)
 def bmi_interpretation(bmi, gender):
-    if gender == "여성":
-        if bmi < 18.5:
-            return "저체중입니다."
-        elif 18.5 <= bmi < 24.9:
-            return "정상 체중입니다."
-        elif 25 <= bmi < 29.9:
-            return "과체중입니다."
-        else:
-            return "비만입니다."
-    else:  # 남성의 경우
-        if bmi < 18.5:
-            return "저체중입니다."
-        elif 18.5 <= bmi < 24.9:
-            return "정상 체중입니다."
-        elif 25 <= bmi < 29.9:
-            return "과체중입니다."
-        else:
-            return "비만입니다."
+    return RULES.bmi_status(bmi)
 
 # 스트림릿 앱
 def main():
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import datetime
 from PIL import Image
+from meal_store import MealLogStore
 
 # 페이지 설정
 st.set_page_config(page_title="영양소 분석 & 식단 관리", layout="wide")
@@ -10,21 +11,13 @@ st.set_page_config(page_title="영양소 분석 & 식단 관리", layout="wide")
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="streamlit")
 
-# 데이터 로드 함수
-@st.cache_data
-def load_meal_data(file_path):
-    """CSV 데이터 로드 및 캐싱"""
-    try:
-        df = pd.read_csv(file_path)
-        df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["Date", "Meal", "Food", "Quantity", "Unit", "Calories", "Protein", "Carbs", "Fat", "Iron"])
-    return df
-
-# 데이터 저장 함수
-def save_meal_data(df, file_path):
-    """CSV 데이터 저장"""
-    df.to_csv(file_path, index=False)
+# 식단 저장소 (세션 간 공유)
+@st.cache_resource
+def get_meal_store(db_path="meal_data.db", legacy_csv_path="meal_data.csv"):
+    """SQLite 식단 저장소 생성, 기존 CSV가 있으면 최초 1회 가져오기"""
+    store = MealLogStore(db_path)
+    store.import_csv(legacy_csv_path)
+    return store
 
 class NutrientAnalyzer:
     def analyze_food(self, image):
@@ -134,8 +127,7 @@ class CalendarApp:
     }
 
     def __init__(self):
-        self.data_file = "meal_data.csv"
-        self.df = load_meal_data(self.data_file)
+        self.store = get_meal_store()
         self.nutrition_df = pd.DataFrame(self.default_nutrition_data)
         self.available_foods = sorted(self.nutrition_df['Food'].unique())
 
@@ -158,19 +150,19 @@ class CalendarApp:
                 nutrition = self.calculate_nutrition(food_name, quantity)
                 if nutrition:
                     new_data = {
-                        "Date": [date],
-                        "Meal": [meal_type],
-                        "Food": [food_name],
-                        "Quantity": [quantity],
-                        "Unit": [unit],
-                        "Calories": [nutrition['Calories']],
-                        "Protein": [nutrition['Protein']],
-                        "Carbs": [nutrition['Carbs']],
-                        "Fat": [nutrition['Fat']],
-                        "Iron": [nutrition['Iron']]
+                        "Date": date,
+                        "Meal": meal_type,
+                        "Food": food_name,
+                        "Quantity": quantity,
+                        "Unit": unit,
+                        "Calories": nutrition['Calories'],
+                        "Protein": nutrition['Protein'],
+                        "Carbs": nutrition['Carbs'],
+                        "Fat": nutrition['Fat'],
+                        "Iron": nutrition['Iron']
                     }
-                    self.df = pd.concat([self.df, pd.DataFrame(new_data)], ignore_index=True)
-                    save_meal_data(self.df, self.data_file)
+                    # 전체 파일을 다시 쓰지 않고 한 건만 추가
+                    self.store.append(new_data)
                     st.success("식단이 저장되었습니다!")
                 else:
                     st.error("영양소 정보를 찾을 수 없습니다.")
@@ -194,14 +186,12 @@ class CalendarApp:
         """주간 영양소 통계 시각화"""
         st.subheader("📊 주간 영양소 분석")
 
-        if not self.df.empty:
-            # 최근 7일간 데이터 필터링
-            start_date = datetime.datetime.today() - datetime.timedelta(days=7)
-            filtered_df = self.df[self.df['Date'] >= start_date]
+        if not self.store.is_empty():
+            # 최근 7일간 일별 합계 조회 (저장 시 미리 합산된 행만 읽음)
+            start_date = datetime.date.today() - datetime.timedelta(days=7)
+            daily_summary = self.store.daily(start=start_date)
 
-            if not filtered_df.empty:
-                # 일별 합계 계산
-                daily_summary = filtered_df.groupby(filtered_df['Date'].dt.date).sum(numeric_only=True)
+            if not daily_summary.empty:
 
                 # 영양소 그래프
                 st.line_chart(daily_summary[['Calories', 'Protein', 'Carbs', 'Fat', 'Iron']])
@@ -0,0 +1,131 @@
+import time
+import numpy as np
+
+
+def load_model(model):
+    """모델 경로면 YOLO로 불러오고, 이미 불러온 모델이면 그대로 사용"""
+    if isinstance(model, str):
+        from ultralytics import YOLO
+        return YOLO(model)
+    return model
+
+
+def box_coverage(xyxy, width, height, grid=64):
+    """
+    박스들이 덮는 이미지 면적 비율 (겹치는 부분은 한 번만 셈, grid x grid 격자로 근사)
+    :param xyxy: (N, 4) 픽셀 좌표
+    """
+    if len(xyxy) == 0 or width <= 0 or height <= 0:
+        return 0.0
+    boxes = np.asarray(xyxy, dtype=np.float32) / np.array([width, height, width, height], dtype=np.float32)
+    cells = (np.arange(grid, dtype=np.float32) + 0.5) / grid
+    inside_x = (cells[None, :] >= boxes[:, 0:1]) & (cells[None, :] <= boxes[:, 2:3])  # (N, grid)
+    inside_y = (cells[None, :] >= boxes[:, 1:2]) & (cells[None, :] <= boxes[:, 3:4])
+    covered = (inside_y[:, :, None] & inside_x[:, None, :]).any(axis=0)
+    return float(covered.mean())
+
+
+class CascadeDetector:
+    def __init__(self, small_model="yolov8n.pt", large_model="yolov8x.pt", escalate_conf=0.5,
+                 min_coverage=0.05, conf=0.25):
+        """
+        단계별 탐지: 작은 모델로 먼저 탐지하고, 결과가 불확실한 이미지만 큰 모델로 다시 탐지
+        두 모델은 같은 클래스 목록으로 학습되어 있어야 한다.
+        큰 모델은 처음 필요할 때 한 번만 불러오고, 클래스 목록도 그때 확인한다 (이미 불러온 모델을 넘기면 생성할 때 확인).
+        :param escalate_conf: 이 확률 미만인 탐지가 하나라도 있으면 큰 모델 사용
+        :param min_coverage: 탐지 박스가 덮는 면적이 이 비율 미만이면 (놓친 음식이 있을 수 있음) 큰 모델 사용
+        :param conf: 두 모델 공통 최소 확률 (model.predict의 conf)
+        """
+        self.small = load_model(small_model)
+        self._large = large_model
+        if not isinstance(large_model, str):
+            self._check_names(large_model)
+        self.escalate_conf = escalate_conf
+        self.min_coverage = min_coverage
+        self.conf = conf
+        self.last_tiers = []
+        self.reset_stats()
+
+    def _check_names(self, model):
+        if dict(model.names) != dict(self.small.names):
+            raise ValueError("작은 모델과 큰 모델의 클래스 목록이 다릅니다. 같은 데이터셋으로 학습한 모델을 사용하세요.")
+
+    @property
+    def large(self):
+        if isinstance(self._large, str):
+            # 처음 큰 모델로 넘길 때 불러와 클래스 목록 확인 (다르면 이후에도 다시 확인하도록 경로를 그대로 둠)
+            model = load_model(self._large)
+            self._check_names(model)
+            self._large = model
+        return self._large
+
+    @property
+    def names(self):
+        return self.small.names
+
+    def reset_stats(self):
+        self.stats = {"images": 0, "escalated": 0, "small_ms": 0.0, "large_ms": 0.0, "reasons": {}}
+
+    def escalation_reason(self, result):
+        """
+        큰 모델로 넘길지 판단
+        :return: 이유 문자열 (no_detections, low_confidence, low_coverage) 또는 None
+        """
+        boxes = result.boxes.data
+        if hasattr(boxes, "cpu"):
+            boxes = boxes.cpu().numpy()
+        if len(boxes) == 0:
+            return "no_detections"
+        if boxes[:, 4].min() < self.escalate_conf:
+            return "low_confidence"
+        height, width = result.orig_shape
+        if box_coverage(boxes[:, :4], width, height) < self.min_coverage:
+            return "low_coverage"
+        return None
+
+    def predict(self, source, **kwargs):
+        """
+        model.predict와 같은 방식으로 호출 (결과 목록 반환)
+        이미지별로 사용한 단계('small'/'large')는 self.last_tiers에 남는다.
+        """
+        kwargs.setdefault("conf", self.conf)
+        kwargs.setdefault("verbose", False)
+        images = source if isinstance(source, list) else [source]
+
+        start = time.perf_counter()
+        results = list(self.small.predict(images, **kwargs))
+        self.stats["small_ms"] += (time.perf_counter() - start) * 1000
+
+        escalate = []
+        for i, result in enumerate(results):
+            reason = self.escalation_reason(result)
+            if reason:
+                escalate.append(i)
+                self.stats["reasons"][reason] = self.stats["reasons"].get(reason, 0) + 1
+
+        self.last_tiers = ["small"] * len(results)
+        if escalate:
+            # 불확실한 이미지만 모아 큰 모델을 한 번 실행
+            start = time.perf_counter()
+            large_results = self.large.predict([images[i] for i in escalate], **kwargs)
+            self.stats["large_ms"] += (time.perf_counter() - start) * 1000
+            for i, result in zip(escalate, large_results):
+                results[i] = result
+                self.last_tiers[i] = "large"
+
+        self.stats["images"] += len(results)
+        self.stats["escalated"] += len(escalate)
+        return results
+
+    def report(self):
+        """단계 전환 비율과 단계별 이미지당 평균 지연 시간"""
+        images, escalated = self.stats["images"], self.stats["escalated"]
+        return {
+            "images": images,
+            "escalated": escalated,
+            "escalation_rate": escalated / images if images else 0.0,
+            "small_ms_per_image": self.stats["small_ms"] / images if images else None,
+            "large_ms_per_escalated_image": self.stats["large_ms"] / escalated if escalated else None,
+            "cascade_ms_per_image": (self.stats["small_ms"] + self.stats["large_ms"]) / images if images else None,
+            "reasons": dict(self.stats["reasons"])
+        }
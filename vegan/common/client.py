@@ -0,0 +1,235 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import mimetypes
+import argparse
+import time
+import numpy as np
+from detections import from_arrow_ipc, from_msgpack
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+class FoodDetectionClient:
+    def __init__(self, base_url="http://127.0.0.1:8000", pool_size=8, timeout=(3, 30),
+                 max_retries=3, backoff_factor=0.5, batch_size=8):
+        """
+        음식 탐지 API용 클라이언트 (keep-alive 연결 풀 + 재시도)
+
+        Args:
+            base_url (str): API 서버 주소
+            pool_size (int): 연결 풀 크기 (동시에 보낼 수 있는 최대 요청 수)
+            timeout (tuple): (연결, 응답) 타임아웃 (초)
+            max_retries (int): 연결 오류, 429/5xx 응답 시 재시도 횟수
+            backoff_factor (float): 재시도 간격 (0.5 -> 0.5s, 1s, 2s ...)
+            batch_size (int): 배치 엔드포인트 사용 시 한 번에 보낼 이미지 수
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self._batch_supported = None
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,  # POST도 재시도 (본문은 메모리에 있으므로 다시 보낼 수 있음)
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _file_part(image_path):
+        # 재시도 시 다시 보낼 수 있도록 파일 내용을 미리 읽어 둔다
+        path = Path(image_path)
+        mime = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return (path.name, path.read_bytes(), mime)
+
+    def supports_batch(self):
+        """
+        서버의 OpenAPI 문서에 /predict/batch 가 있는지 확인 (결과는 캐시)
+        """
+        if self._batch_supported is None:
+            try:
+                response = self.session.get(f"{self.base_url}/openapi.json", timeout=self.timeout)
+                self._batch_supported = response.ok and "/predict/batch" in response.json().get("paths", {})
+            except (requests.RequestException, ValueError):
+                self._batch_supported = False
+        return self._batch_supported
+
+    @staticmethod
+    def _parse(response, format):
+        """응답 형식에 맞게 파싱 (arrow/msgpack은 detections가 Detections 객체)"""
+        if format == "arrow":
+            # 이미지별 상태와 전처리 시간은 서버가 스키마 메타데이터에 넣어 보낸다
+            results, metadata = from_arrow_ipc(response.content)
+            statuses = metadata.get("status", [None] * len(results))
+            timings = metadata.get("preprocess_ms", [None] * len(results))
+            return [
+                {"status": status, "detections": detections, "preprocess_ms": timing}
+                for detections, status, timing in zip(results, statuses, timings)
+            ]
+        if format == "msgpack":
+            return from_msgpack(response.content)
+        return response.json()
+
+    def detect(self, image_path, format="json"):
+        """
+        이미지 한 장 탐지
+
+        Args:
+            format (str): 응답 형식 - json, columns, arrow, msgpack
+
+        Returns:
+            dict: 서버 응답 (status, detections ...)
+        """
+        response = self.session.post(
+            f"{self.base_url}/predict",
+            files={"file": self._file_part(image_path)},
+            params={"format": format},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        result = self._parse(response, format)
+        return result[0] if format == "arrow" else result
+
+    def detect_batch(self, image_paths, format="json"):
+        """
+        배치 엔드포인트로 여러 장을 한 번에 탐지
+
+        Returns:
+            list: 이미지별 결과 (입력 순서와 동일)
+        """
+        files = [("files", self._file_part(path)) for path in image_paths]
+        response = self.session.post(f"{self.base_url}/predict/batch", files=files, params={"format": format},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        result = self._parse(response, format)
+        return result if format == "arrow" else result["results"]
+
+    def detect_many(self, image_paths, max_in_flight=None, use_batch=None):
+        """
+        여러 이미지를 동시에 탐지. 동시에 처리 중인 요청 수는 max_in_flight로 제한된다.
+        배치 엔드포인트가 있으면 batch_size 단위로 묶어서 보낸다.
+
+        Returns:
+            list: [(image_path, 결과 또는 None, 오류 또는 None)] - 입력 순서와 동일
+        """
+        image_paths = [str(p) for p in image_paths]
+        max_in_flight = min(max_in_flight or self.pool_size, self.pool_size)
+        if use_batch is None:
+            use_batch = self.supports_batch()
+
+        if use_batch:
+            chunks = [image_paths[i:i + self.batch_size] for i in range(0, len(image_paths), self.batch_size)]
+            call = self.detect_batch
+        else:
+            chunks = [[path] for path in image_paths]
+            call = lambda chunk: [self.detect(chunk[0])]
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            futures = {executor.submit(call, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    for path, result in zip(chunk, future.result()):
+                        results[path] = (path, result, None)
+                except Exception as e:
+                    for path in chunk:
+                        results[path] = (path, None, e)
+
+        return [results[path] for path in image_paths]
+
+    def load_test(self, image_paths, total_requests=100, concurrency=8):
+        """
+        부하 생성 모드: 동시 요청을 보내고 클라이언트 측 지연 시간 백분위수를 보고
+
+        Returns:
+            dict: 요청 수, 오류 수, 처리량(req/s), p50/p90/p99 지연 시간(ms)
+        """
+        parts = [self._file_part(path) for path in image_paths]
+
+        def send(i):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(f"{self.base_url}/predict", files={"file": parts[i % len(parts)]},
+                                             timeout=self.timeout)
+                ok = response.ok
+            except requests.RequestException:
+                ok = False
+            return (time.perf_counter() - start) * 1000, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(concurrency, self.pool_size)) as executor:
+            samples = list(executor.map(send, range(total_requests)))
+        elapsed = time.perf_counter() - started
+
+        latencies = np.array([ms for ms, ok in samples if ok])
+        report = {
+            "requests": total_requests,
+            "errors": sum(1 for _, ok in samples if not ok),
+            "concurrency": concurrency,
+            "throughput_rps": total_requests / elapsed if elapsed else 0
+        }
+        if len(latencies):
+            for p in (50, 90, 99):
+                report[f"p{p}_ms"] = float(np.percentile(latencies, p))
+            report["max_ms"] = float(latencies.max())
+        return report
+
+
+def collect_images(path):
+    path = Path(path)
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    return [path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="음식 탐지 API 클라이언트 / 부하 테스트")
+    parser.add_argument("images", help="이미지 파일 또는 디렉토리")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--load-test", action="store_true", help="부하 생성 모드")
+    parser.add_argument("--requests", type=int, default=200, help="부하 생성 모드의 총 요청 수")
+    args = parser.parse_args()
+
+    images = collect_images(args.images)
+    with FoodDetectionClient(args.url, pool_size=args.concurrency) as client:
+        if args.load_test:
+            report = client.load_test(images, total_requests=args.requests, concurrency=args.concurrency)
+            print("\n=== Load Test ===")
+            for key, value in report.items():
+                print(f"{key}: {value:.1f}" if isinstance(value, float) else f"{key}: {value}")
+            return
+
+        for path, result, error in client.detect_many(images):
+            print(f"\n=== {path} ===")
+            if error:
+                print(f"Error: {error}")
+                continue
+            for detection in result["detections"]:
+                print(f"음식: {detection['class_name']}")
+                print(f"확률: {detection['confidence']:.2f}")
+                print("---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import sqlite3
+import datetime
+from contextlib import contextmanager
+import pandas as pd
+
+# 주/월 단위 집계 기준 날짜 (주는 월요일 시작)
+PERIOD_EXPRESSIONS = {
+    "day": "Date",
+    "week": "date(Date, 'weekday 0', '-6 days')",
+    "month": "strftime('%Y-%m-01', Date)"
+}
+
+
+def to_date_text(value):
+    """날짜 값을 'YYYY-MM-DD' 문자열로 변환"""
+    if isinstance(value, (datetime.date, datetime.datetime, pd.Timestamp)):
+        return value.strftime("%Y-%m-%d")
+    return str(pd.to_datetime(value).date())
+
+
+@contextmanager
+def connect(db_path):
+    """SQLite 연결 (호출마다 새로 열어 세션/스레드 간에 공유하지 않는다)"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        yield conn
+    finally:
+        conn.close()
+
+
+class DailyTotals:
+    """
+    meals 테이블의 일별 합계(daily_totals) 관리
+    - 저장과 같은 트랜잭션에서 합계를 더하므로 통계 화면은 합계 행만 읽는다
+    - user_key=True이면 (user, Date), 아니면 Date가 기본키
+    모든 메서드는 호출한 쪽의 연결(트랜잭션) 안에서 실행되며 commit하지 않는다.
+    """
+
+    def __init__(self, numeric_columns, user_key=True):
+        """
+        :param numeric_columns: 합산할 meals 컬럼 목록
+        :param user_key: 사용자별로 합계를 나눌지 여부
+        """
+        self.numeric_columns = list(numeric_columns)
+        self.key_columns = ["user", "Date"] if user_key else ["Date"]
+        self.sum_columns = ["Meals"] + self.numeric_columns
+
+    def create(self, conn):
+        """합계 테이블을 만들고, 새로 생긴 경우 기존 식단 기록으로 채운다"""
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS daily_totals (
+                {', '.join(f'{col} TEXT NOT NULL' for col in self.key_columns)},
+                Meals INTEGER NOT NULL DEFAULT 0,
+                {', '.join(f'{col} REAL NOT NULL DEFAULT 0' for col in self.numeric_columns)},
+                PRIMARY KEY ({', '.join(self.key_columns)})
+            )
+        """)
+        has_totals = conn.execute("SELECT 1 FROM daily_totals LIMIT 1").fetchone()
+        has_meals = conn.execute("SELECT 1 FROM meals LIMIT 1").fetchone()
+        if has_meals and not has_totals:
+            self._insert_from_meals(conn)
+
+    def _insert_from_meals(self, conn, where="", params=()):
+        keys = ", ".join(self.key_columns)
+        sums = ", ".join(f"COALESCE(SUM({col}), 0)" for col in self.numeric_columns)
+        conn.execute(f"""
+            INSERT INTO daily_totals ({keys}, {', '.join(self.sum_columns)})
+            SELECT {keys}, COUNT(*), {sums} FROM meals {where} GROUP BY {keys}
+        """, params)
+
+    def add(self, conn, items):
+        """
+        저장할 행들을 키별로 먼저 합산하여 일별 합계에 더한다
+        :param items: [(키 튜플, 행 딕셔너리)] - 키는 key_columns 순서, Date는 'YYYY-MM-DD'
+        :return: 바뀐 키 목록
+        """
+        totals = {}
+        for key, row in items:
+            sums = totals.setdefault(tuple(key), [0] * len(self.sum_columns))
+            sums[0] += 1
+            for i, col in enumerate(self.numeric_columns, start=1):
+                sums[i] += float(row.get(col) or 0)
+
+        increments = ", ".join(f"{col} = {col} + excluded.{col}" for col in self.sum_columns)
+        columns = self.key_columns + self.sum_columns
+        conn.executemany(
+            f"INSERT INTO daily_totals ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({', '.join(self.key_columns)}) DO UPDATE SET {increments}",
+            [list(key) + sums for key, sums in totals.items()]
+        )
+        return list(totals)
+
+    def rebuild(self, conn, user=None):
+        """
+        식단 기록으로 합계를 다시 만든다 (영양 정보를 다시 계산한 뒤 등)
+        :param user: 해당 사용자만 (user_key일 때, None이면 전체)
+        """
+        if user is None:
+            conn.execute("DELETE FROM daily_totals")
+            self._insert_from_meals(conn)
+        else:
+            conn.execute("DELETE FROM daily_totals WHERE user = ?", (user,))
+            self._insert_from_meals(conn, "WHERE user = ?", (user,))
+
+    def rows(self, conn, keys):
+        """키 목록에 해당하는 합계 행을 딕셔너리 목록으로 반환"""
+        where = " AND ".join(f"{col} = ?" for col in self.key_columns)
+        result = []
+        for key in keys:
+            cursor = conn.execute(f"SELECT * FROM daily_totals WHERE {where}", tuple(key))
+            names = [description[0] for description in cursor.description]
+            row = cursor.fetchone()
+            if row is not None:
+                result.append(dict(zip(names, row)))
+        return result
+
+    def read(self, conn, user=None, start=None, end=None, period="day"):
+        """
+        기간 합계 조회 (식단 기록 전체를 다시 집계하지 않음)
+        :param period: "day", "week"(월요일 시작), "month"
+        :return: Date를 인덱스로 하는 DataFrame (Meals, Quantity, Calories, ...)
+        """
+        conditions, params = [], []
+        if user is not None:
+            conditions.append("user = ?")
+            params.append(user)
+        if start is not None:
+            conditions.append("Date >= ?")
+            params.append(to_date_text(start))
+        if end is not None:
+            conditions.append("Date <= ?")
+            params.append(to_date_text(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        sums = ", ".join(f"SUM({col}) AS {col}" for col in self.sum_columns)
+        df = pd.read_sql_query(
+            f"SELECT {PERIOD_EXPRESSIONS[period]} AS Date, {sums} FROM daily_totals {where} GROUP BY 1 ORDER BY 1",
+            conn, params=params
+        )
+        df["Date"] = pd.to_datetime(df["Date"], format="%Y-%m-%d").dt.date
+        return df.set_index("Date")
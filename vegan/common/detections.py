@@ -0,0 +1,168 @@
+import json
+import numpy as np
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
+class Detections:
+    def __init__(self, xyxy, cls, conf, names):
+        """
+        이미지 한 장의 탐지 결과 (열 단위 배열)
+        :param xyxy: (N, 4) float32 박스 좌표
+        :param cls: (N,) int32 클래스 번호
+        :param conf: (N,) float32 확률
+        :param names: {클래스 번호: 이름} 클래스 이름표
+        """
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.cls = np.asarray(cls, dtype=np.int32).ravel()
+        self.conf = np.asarray(conf, dtype=np.float32).ravel()
+        self.names = {int(k): v for k, v in dict(names).items()}
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(np.zeros((0, 4)), np.zeros(0), np.zeros(0), names or {})
+
+    @classmethod
+    def from_result(cls, result, scale=1.0, names=None):
+        """
+        ultralytics 결과 하나를 변환
+        boxes.data ([x1, y1, x2, y2, conf, cls])를 한 번에 CPU로 옮기고 열로 나눈다 (박스마다 .item() 호출 없음)
+        :param scale: 원본 좌표로 되돌리기 위한 배율
+        """
+        names = names if names is not None else result.names
+        data = result.boxes.data
+        if hasattr(data, "cpu"):
+            data = data.cpu().numpy()
+        data = np.asarray(data, dtype=np.float32)
+        if len(data) == 0:
+            return cls.empty(names)
+        return cls(data[:, :4] * scale, data[:, 5], data[:, 4], names)
+
+    @classmethod
+    def from_results(cls, results, scales=None, names=None):
+        scales = scales or [1.0] * len(results)
+        return [cls.from_result(r, scale, names) for r, scale in zip(results, scales)]
+
+    def __len__(self):
+        return len(self.cls)
+
+    @property
+    def class_names(self):
+        """탐지별 클래스 이름 배열"""
+        if len(self) == 0:
+            return np.array([], dtype=object)
+        table = np.array([self.names.get(i, str(i)) for i in range(int(self.cls.max()) + 1)], dtype=object)
+        return table[self.cls]
+
+    def filter(self, min_conf):
+        """확률이 min_conf 이상인 탐지만 남김"""
+        keep = self.conf >= min_conf
+        return Detections(self.xyxy[keep], self.cls[keep], self.conf[keep], self.names)
+
+    def items(self):
+        """[(음식명, 확률)] 목록"""
+        return list(zip(self.class_names.tolist(), self.conf.tolist()))
+
+    def _used_names(self):
+        return {int(i): self.names.get(int(i), str(i)) for i in np.unique(self.cls)}
+
+    def to_dicts(self):
+        """기존 JSON 응답 형식 (탐지마다 dict)"""
+        return [
+            {"bbox": box, "class": c, "class_name": name, "confidence": p}
+            for box, c, name, p in zip(self.xyxy.tolist(), self.cls.tolist(), self.class_names.tolist(),
+                                       self.conf.tolist())
+        ]
+
+    def to_columns(self):
+        """열 단위 JSON 형식 (탐지 수와 관계없이 키는 4개)"""
+        return {
+            "xyxy": self.xyxy.tolist(),
+            "cls": self.cls.tolist(),
+            "conf": self.conf.tolist(),
+            "names": {str(k): v for k, v in self._used_names().items()}
+        }
+
+    @classmethod
+    def from_columns(cls, columns):
+        return cls(columns["xyxy"], columns["cls"], columns["conf"], {int(k): v for k, v in columns["names"].items()})
+
+    def to_msgpack_dict(self):
+        """msgpack용 dict (배열은 원시 바이트로 넣어 파싱 없이 np.frombuffer로 복원)"""
+        return {
+            "n": len(self),
+            "xyxy": self.xyxy.tobytes(),
+            "cls": self.cls.tobytes(),
+            "conf": self.conf.tobytes(),
+            "names": self._used_names()
+        }
+
+    @classmethod
+    def from_msgpack_dict(cls, data):
+        return cls(
+            np.frombuffer(data["xyxy"], dtype=np.float32),
+            np.frombuffer(data["cls"], dtype=np.int32),
+            np.frombuffer(data["conf"], dtype=np.float32),
+            data["names"]
+        )
+
+
+def to_arrow_ipc(detections_list, metadata=None):
+    """
+    이미지별 Detections 목록을 Arrow IPC 스트림 바이트로 (열 x1, y1, x2, y2, cls, conf, image)
+    클래스 이름표와 이미지 수, metadata는 스키마 메타데이터(JSON)로 넣는다.
+    """
+    import pyarrow as pa
+    names = {}
+    for detections in detections_list:
+        names.update(detections._used_names())
+    xyxy = np.concatenate([d.xyxy for d in detections_list]) if detections_list else np.zeros((0, 4), np.float32)
+    columns = {name: np.ascontiguousarray(xyxy[:, i]) for i, name in enumerate(("x1", "y1", "x2", "y2"))}
+    columns["cls"] = np.concatenate([d.cls for d in detections_list] or [np.zeros(0, np.int32)])
+    columns["conf"] = np.concatenate([d.conf for d in detections_list] or [np.zeros(0, np.float32)])
+    columns["image"] = np.repeat(np.arange(len(detections_list), dtype=np.int32),
+                                 [len(d) for d in detections_list])
+
+    schema_metadata = {"names": json.dumps(names, ensure_ascii=False), "images": str(len(detections_list))}
+    for key, value in (metadata or {}).items():
+        schema_metadata[key] = json.dumps(value, ensure_ascii=False)
+    table = pa.table(columns).replace_schema_metadata(schema_metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_arrow_ipc(payload):
+    """
+    Arrow IPC 바이트 -> (이미지 순서대로 Detections 목록, 메타데이터 dict)
+    """
+    import pyarrow as pa
+    table = pa.ipc.open_stream(payload).read_all()
+    metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+    names = json.loads(metadata.pop("names", "{}"))
+    images = int(metadata.pop("images", "1"))
+    metadata = {key: json.loads(value) for key, value in metadata.items()}
+
+    xyxy = np.stack([table.column(name).to_numpy() for name in ("x1", "y1", "x2", "y2")], axis=1)
+    cls, conf = table.column("cls").to_numpy(), table.column("conf").to_numpy()
+    image = table.column("image").to_numpy()
+    results = [Detections(xyxy[image == i], cls[image == i], conf[image == i], names) for i in range(images)]
+    return results, metadata
+
+
+def to_msgpack(payload):
+    import msgpack
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def from_msgpack(payload):
+    """msgpack 응답 -> dict (detections 는 Detections 로 복원, 탐지 결과가 없는 응답은 그대로)"""
+    import msgpack
+    data = msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    for result in data.get("results", [data]):
+        if isinstance(result, dict) and result.get("detections") is not None:
+            result["detections"] = Detections.from_msgpack_dict(result["detections"])
+    return data
@@ -0,0 +1,59 @@
+import importlib
+import threading
+
+# 불러오는 모듈이 import 중에 다른 대리 객체를 사용해도 같은 스레드에서 다시 잠글 수 있도록 RLock
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    처음 사용할 때 import 하는 모듈 대리 객체
+    예) torch = lazy_import("torch")  ->  torch.cuda... 를 처음 호출할 때 torch를 불러온다
+    """
+
+    def __init__(self, module_name, attribute=None):
+        self.__dict__["_lazy_module_name"] = module_name
+        self.__dict__["_lazy_attribute"] = attribute
+        self.__dict__["_lazy_target"] = None
+
+    def _lazy_load(self):
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            with _lock:
+                target = self.__dict__["_lazy_target"]
+                if target is None:
+                    target = importlib.import_module(self.__dict__["_lazy_module_name"])
+                    attribute = self.__dict__["_lazy_attribute"]
+                    if attribute:
+                        target = getattr(target, attribute)
+                    self.__dict__["_lazy_target"] = target
+        return target
+
+    def __getattr__(self, item):
+        return getattr(self._lazy_load(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._lazy_load(), item, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._lazy_load()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        name = self.__dict__["_lazy_module_name"]
+        attribute = self.__dict__["_lazy_attribute"]
+        return f"<lazy {name}{'.' + attribute if attribute else ''} ({state})>"
+
+
+def lazy_import(module_name, attribute=None):
+    """
+    모듈(또는 모듈 안의 클래스/함수)을 처음 사용할 때 import
+    :param module_name: 모듈 이름 (예: "cv2", "matplotlib.pyplot")
+    :param attribute: 모듈에서 꺼낼 이름 (예: lazy_import("ultralytics", "YOLO"))
+    """
+    return LazyModule(module_name, attribute)
+
+
+def is_loaded(proxy):
+    """대리 객체가 이미 import 되었는지 확인 (startup_bench.py가 시작 시점에 불러온 대리 객체를 찾을 때 사용)"""
+    return isinstance(proxy, LazyModule) and proxy.__dict__["_lazy_target"] is not None
@@ -0,0 +1,111 @@
+import time
+import numpy as np
+from PIL import Image, ImageOps
+
+EXIF_ORIENTATION = 0x0112
+
+
+class ImagePreprocessor:
+    def __init__(self, imgsz=640):
+        """
+        추론용 이미지 전처리기
+        :param imgsz: 모델 입력 크기 (긴 변 기준)
+        """
+        self.imgsz = imgsz
+
+    def decode(self, source):
+        """
+        이미지를 연다. JPEG는 draft 모드로 모델 입력 크기에 가까운 축소 배율로 디코딩한다.
+        :param source: 파일 경로, 파일 객체(업로드 파일, BytesIO) 또는 PIL 이미지
+        :return: (PIL 이미지, 원본 크기)
+        """
+        image = source if isinstance(source, Image.Image) else Image.open(source)
+        original_size = image.size
+
+        # draft는 load() 전에만 적용되며, 요청 크기 이상이 되는 가장 작은 1/2, 1/4, 1/8 배율을 고른다
+        if image.format == "JPEG":
+            image.draft("RGB", (self.imgsz, self.imgsz))
+        image.load()
+        return image, original_size
+
+    def normalize(self, image):
+        """
+        EXIF 회전 정보를 반영하고 RGB 모드로 통일한다 (RGBA, P, L 등)
+        """
+        if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+            image = ImageOps.exif_transpose(image)
+
+        if image.mode == "RGB":
+            return image
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            # 투명 배경은 흰색으로 합성
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB")
+
+    def resize(self, image):
+        """
+        긴 변이 imgsz가 되도록 한 번만 축소한다 (확대는 하지 않음)
+        """
+        width, height = image.size
+        scale = self.imgsz / max(width, height)
+        if scale >= 1:
+            return image
+        new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        # reducing_gap으로 큰 이미지는 정수 배율 축소 후 리샘플링
+        return image.resize(new_size, Image.BILINEAR, reducing_gap=2.0)
+
+    def prepare(self, source):
+        """
+        디코딩, 정규화, 리사이즈를 수행한다. 화면 표시용으로도 사용할 수 있다.
+        :return: (PIL 이미지, 정보 딕셔너리)
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        image, original_size = self.decode(source)
+        timings["decode"] = (time.perf_counter() - start) * 1000
+
+        # 90도 회전(orientation 5~8)이면 원본 크기도 회전된 기준으로 맞춘다
+        if image.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+            original_size = original_size[::-1]
+
+        start = time.perf_counter()
+        image = self.normalize(image)
+        timings["normalize"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        image = self.resize(image)
+        timings["resize"] = (time.perf_counter() - start) * 1000
+
+        info = {
+            "original_size": original_size,
+            "size": image.size,
+            "scale": original_size[0] / image.width,
+            "timings": timings
+        }
+        return image, info
+
+    def to_array(self, image):
+        """
+        PIL 이미지를 YOLO가 기대하는 BGR uint8 배열로 변환한다.
+        PIL이 채널 순서를 바꿔 한 번에 내보내므로 추가 복사나 [..., ::-1] 뷰가 생기지 않는다.
+        반환 배열은 읽기 전용이며 C-contiguous이다.
+        """
+        buffer = image.tobytes("raw", "BGR")
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(image.height, image.width, 3)
+
+    def __call__(self, source):
+        """
+        전체 전처리 파이프라인
+        :param source: 파일 경로, 파일 객체 또는 PIL 이미지
+        :return: (BGR numpy 배열, 정보 딕셔너리 - original_size, size, scale, timings(ms))
+        """
+        image, info = self.prepare(source)
+
+        start = time.perf_counter()
+        array = self.to_array(image)
+        info["timings"]["convert"] = (time.perf_counter() - start) * 1000
+        return array, info
@@ -0,0 +1,233 @@
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+
+# 권장 섭취량 규칙: 위에서부터 처음으로 조건이 맞는 (기본값, 체중 1kg당 계수)를 사용한다.
+# 조건 키: "age" (이상, 이하) - None은 제한 없음 / "gender" / "pregnant"
+# 각 목록의 마지막 규칙은 조건이 없어야 한다.
+RDA_RULES = {
+    "calories_rda": [
+        ({"age": (None, 18)}, 2200, 20),                     # 성장기
+        ({"gender": "여성", "age": (51, None)}, 1800, 15),   # 폐경 이후
+        ({"gender": "여성"}, 2000, 18),
+        ({"age": (None, 29)}, 2500, 22),                     # 활동량이 많은 연령대
+        ({"age": (None, 49)}, 2400, 20),
+        ({}, 2200, 18)
+    ],
+    "calcium_rda": [
+        ({"age": (None, 18)}, 1300, 5),                      # 성장기 아동/청소년
+        ({"gender": "여성", "age": (51, None)}, 1200, 2),    # 폐경 이후 여성
+        ({"age": (None, 64)}, 1000, 3),                      # 일반 성인
+        ({}, 1000, 2)                                        # 노인
+    ],
+    "iron_rda": [
+        ({"pregnant": True}, 27, 0.3),                       # 임신
+        ({"gender": "여성", "age": (19, 50)}, 18, 0.1),      # 가임기 여성
+        ({"gender": "남성", "age": (None, 18)}, 11, 0.2),    # 성장기
+        ({"age": (None, 18)}, 15, 0.2),
+        ({}, 8, 0.1)                                         # 일반 성인 및 노인
+    ],
+    "protein_rda": [
+        ({"age": (None, 18)}, 0, 1.0),                       # 성장기 아동/청소년
+        ({"age": (66, None)}, 0, 1.2),                       # 노인
+        ({}, 0, 0.8)                                         # 일반 성인
+    ]
+}
+
+# 활동 수준 기반 권장량 (신체 분석 페이지): 기본 열량 * 활동 계수, 단백질은 체중 * 계수
+ACTIVITY_RULES = {
+    "calories": [
+        ({"gender": "남성"}, 2000, 0),
+        ({}, 1800, 0)
+    ],
+    "protein": [
+        ({"gender": "남성"}, 0, 1.0),
+        ({}, 0, 0.8)
+    ]
+}
+
+ACTIVITY_MULTIPLIER = {
+    "low": 1.2,
+    "moderate": 1.5,
+    "high": 1.8
+}
+
+# BMI 구간: (상한 미만, 해석) - 마지막은 상한 없음
+# 기존 화면의 경계(18.5, 24.9, 29.9)를 그대로 쓴다. 기존 코드는 24.9 이상 25 미만, 29.9 이상 30 미만이
+# 모든 조건을 벗어나 "비만"으로 떨어졌는데, 구간을 이어 붙이면서 24.9 ~ 29.9는 "과체중", 29.9 이상은 "비만"이 된다.
+BMI_BRACKETS = [
+    (18.5, "저체중입니다."),
+    (24.9, "정상 체중입니다."),
+    (29.9, "과체중입니다."),
+    (None, "비만입니다.")
+]
+
+# 적정 체중 범위 = 정상 체중 BMI 구간
+NORMAL_BMI_RANGE = (BMI_BRACKETS[0][0], BMI_BRACKETS[1][0])
+
+# 사용자 정보가 없을 때 쓰는 하루 권장량
+DEFAULT_TARGETS = {
+    "calories_rda": 2000,
+    "protein_rda": 60,      # g
+    "calcium_rda": 1000,    # mg
+    "iron_rda": 15          # mg
+}
+
+GENDER_CODES = {"남성": 0, "여성": 1}  # 그 외 값은 2
+
+
+class RdaRules:
+    def __init__(self, rules=None, activity_rules=None, bmi_brackets=None):
+        """
+        BMI/권장 섭취량 규칙 엔진
+        규칙 목록을 (나이 구간, 성별, 임신 여부) -> (기본값, 계수) 표로 미리 컴파일해 두고,
+        한 사람은 나이 구간 이진 탐색 + 표 인덱싱으로, 여러 사람은 NumPy 배열 인덱싱으로 계산한다.
+        """
+        self.rules = rules or RDA_RULES
+        self.activity_rules = activity_rules or ACTIVITY_RULES
+        brackets = bmi_brackets or BMI_BRACKETS
+        self.bmi_bounds = [upper for upper, _ in brackets[:-1]]
+        self.bmi_labels = np.array([label for _, label in brackets], dtype=object)
+
+        all_rules = list(self.rules.values()) + list(self.activity_rules.values())
+        self.age_bounds = self._age_bounds(all_rules)
+        self.tables = {name: self._compile(rule_list) for name, rule_list in self.rules.items()}
+        self.activity_tables = {name: self._compile(rule_list) for name, rule_list in self.activity_rules.items()}
+
+    @staticmethod
+    def _age_bounds(rule_lists):
+        """규칙에 나오는 모든 나이 경계로 구간 시작점 목록을 만든다 (정수 나이 기준)"""
+        bounds = {0}
+        for rule_list in rule_lists:
+            for condition, _, _ in rule_list:
+                low, high = condition.get("age", (None, None))
+                if low is not None:
+                    bounds.add(low)
+                if high is not None:
+                    bounds.add(high + 1)
+        return sorted(bounds)
+
+    @staticmethod
+    def _matches(condition, age, gender, pregnant):
+        low, high = condition.get("age", (None, None))
+        return (
+            (low is None or age >= low)
+            and (high is None or age <= high)
+            and condition.get("gender", gender) == gender
+            and condition.get("pregnant", pregnant) == pregnant
+        )
+
+    def _compile(self, rule_list):
+        """
+        표[나이 구간, 성별 코드, 임신 여부] = (기본값, 계수)
+        같은 구간 안에서는 규칙 결과가 같으므로 구간 시작 나이로 규칙을 평가한다
+        """
+        genders = list(GENDER_CODES) + [None]
+        table = np.zeros((len(self.age_bounds), len(genders), 2, 2))
+        for a, age in enumerate(self.age_bounds):
+            for g, gender in enumerate(genders):
+                for pregnant in (False, True):
+                    for condition, base, factor in rule_list:
+                        if self._matches(condition, age, gender, pregnant):
+                            table[a, g, int(pregnant)] = (base, factor)
+                            break
+        return table
+
+    def _index(self, gender, age, is_pregnant):
+        age_index = max(bisect_right(self.age_bounds, int(age)) - 1, 0)
+        return age_index, GENDER_CODES.get(gender, 2), int(bool(is_pregnant))
+
+    def _index_batch(self, gender, age, is_pregnant):
+        age = np.asarray(age, dtype=float).astype(int)
+        age_index = np.clip(np.searchsorted(self.age_bounds, age, side="right") - 1, 0, None)
+        gender_index = pd.Series(gender).map(GENDER_CODES).fillna(2).astype(int).to_numpy()
+        if is_pregnant is None:
+            pregnant_index = np.zeros(len(age_index), dtype=int)
+        else:
+            pregnant_index = pd.Series(is_pregnant).fillna(False).astype(bool).to_numpy().astype(int)
+        return age_index, gender_index, pregnant_index
+
+    # --- BMI ---
+
+    @staticmethod
+    def bmi(weight_kg, height_cm):
+        """BMI (배열도 가능)"""
+        height_m = np.asarray(height_cm, dtype=float) / 100
+        return np.asarray(weight_kg, dtype=float) / height_m ** 2
+
+    @staticmethod
+    def ideal_weight(height_cm):
+        """정상 체중 BMI 구간(18.5 ~ 24.9)에 해당하는 체중 범위 (하한, 상한)"""
+        height_sq = (np.asarray(height_cm, dtype=float) / 100) ** 2
+        lower, upper = NORMAL_BMI_RANGE
+        return lower * height_sq, upper * height_sq
+
+    def bmi_status(self, bmi):
+        """BMI 해석 (숫자 하나면 문자열, 배열이면 배열)"""
+        if np.ndim(bmi) == 0:
+            return self.bmi_labels[bisect_right(self.bmi_bounds, float(bmi))]
+        return self.bmi_labels[np.searchsorted(self.bmi_bounds, np.asarray(bmi, dtype=float), side="right")]
+
+    # --- 권장 섭취량 ---
+
+    def targets(self, gender, age, weight_kg, is_pregnant=False):
+        """
+        한 사람의 권장 섭취량
+        :return: {"calories_rda": ..., "calcium_rda": ..., "iron_rda": ..., "protein_rda": ...}
+        """
+        index = self._index(gender, age, is_pregnant)
+        return {name: float(table[index][0] + weight_kg * table[index][1]) for name, table in self.tables.items()}
+
+    def targets_batch(self, gender, age, weight_kg, is_pregnant=None):
+        """여러 사람의 권장 섭취량 (이름 -> 배열)"""
+        index = self._index_batch(gender, age, is_pregnant)
+        weight = np.asarray(weight_kg, dtype=float)
+        return {name: table[index][:, 0] + weight * table[index][:, 1] for name, table in self.tables.items()}
+
+    def activity_targets(self, gender, weight_kg, activity_level):
+        """
+        활동 수준 기반 하루 권장량 (열량의 50%를 탄수화물, 30%를 지방으로)
+        :return: {"calories": kcal, "protein": g, "carbs": g, "fat": g}
+        """
+        index = self._index(gender, 0, False)
+        base = {name: table[index] for name, table in self.activity_tables.items()}
+        calories = float(base["calories"][0] * ACTIVITY_MULTIPLIER[activity_level])
+        return {
+            "calories": calories,
+            "protein": float(weight_kg * base["protein"][1]),
+            "carbs": calories * 0.5 / 4,   # 4kcal/g
+            "fat": calories * 0.3 / 9      # 9kcal/g
+        }
+
+    def evaluate(self, df):
+        """
+        DataFrame 일괄 계산
+        :param df: gender, age, height_cm, weight_kg 컬럼 필수, is_pregnant, activity_level 컬럼 선택
+        :return: 입력과 같은 인덱스의 DataFrame
+        """
+        bmi = self.bmi(df["weight_kg"], df["height_cm"])
+        lower, upper = self.ideal_weight(df["height_cm"])
+        result = {
+            "bmi": bmi,
+            "bmi_status": self.bmi_status(bmi),
+            "ideal_weight_lower": lower,
+            "ideal_weight_upper": upper
+        }
+        result.update(self.targets_batch(
+            df["gender"], df["age"], df["weight_kg"], df["is_pregnant"] if "is_pregnant" in df else None
+        ))
+
+        if "activity_level" in df:
+            index = self._index_batch(df["gender"], np.zeros(len(df)), None)
+            multiplier = df["activity_level"].map(ACTIVITY_MULTIPLIER).to_numpy(dtype=float)
+            calories = self.activity_tables["calories"][index][:, 0] * multiplier
+            result["activity_calories"] = calories
+            result["activity_protein"] = df["weight_kg"].to_numpy(dtype=float) * self.activity_tables["protein"][index][:, 1]
+            result["carbs_needs"] = calories * 0.5 / 4
+            result["fat_needs"] = calories * 0.3 / 9
+
+        return pd.DataFrame(result, index=df.index)
+
+
+# 모든 페이지가 함께 쓰는 기본 규칙
+RULES = RdaRules()
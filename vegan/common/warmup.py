@@ -0,0 +1,109 @@
+import os
+import statistics
+import sys
+import time
+
+# OMP/MKL/OpenBLAS 스레드 수 환경 변수는 이 라이브러리들을 불러오기 전에만 적용된다
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+THREAD_POOL_MODULES = ("numpy", "torch", "cv2")
+
+# 워밍업 입력 모양 (가로 비율, 세로 비율) - 전처리기가 긴 변을 imgsz로 맞추므로
+# 정사각형, 가로 사진(4:3), 세로 사진(3:4)이 실제 요청에서 나오는 대표적인 입력 모양이다
+WARMUP_ASPECTS = ((1.0, 1.0), (1.0, 0.75), (0.75, 1.0))
+
+
+def physical_cores():
+    """
+    사용 가능한 물리 코어 수 (psutil이 없으면 논리 코어의 절반으로 추정)
+    컨테이너/taskset으로 제한된 경우 허용된 CPU 수를 넘지 않는다.
+    """
+    available = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    if not cores:
+        cores = max(1, (os.cpu_count() or 2) // 2)
+    return max(1, min(cores, available))
+
+
+def configure_threads(intra_threads=None, inter_threads=1):
+    """
+    CPU 추론 스레드 수를 CPU 구성에 맞게 설정 (기본: 물리 코어 수, INFER_THREADS 환경 변수로 지정 가능)
+    - 논리 코어(하이퍼스레드)까지 쓰면 행렬 연산끼리 코어를 다퉈 오히려 느려진다
+    - OMP/MKL/OpenBLAS 환경 변수는 numpy/torch/cv2를 불러오기 전에 호출해야 적용된다.
+      이미 불러온 뒤라면 (예: streamlit이 numpy를 먼저 불러온 경우) torch/cv2의 스레드 설정 함수만 효과가 있다.
+    ONNX 모델은 ultralytics가 세션을 직접 만들며, onnxruntime 기본값도 물리 코어 수라 같은 기준이 된다.
+    :return: {"intra": 연산 스레드 수, "inter": 연산 간 병렬 스레드 수,
+              "env_applied": 환경 변수가 적용되었는지 (호출 시점에 numpy/torch/cv2가 아직 없었는지)}
+    """
+    intra = intra_threads or int(os.getenv("INFER_THREADS", "0")) or physical_cores()
+    env_applied = not any(name in sys.modules for name in THREAD_POOL_MODULES)
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(intra))
+
+    try:
+        import torch
+        torch.set_num_threads(intra)
+        try:
+            torch.set_num_interop_threads(inter_threads)
+        except RuntimeError:
+            pass  # 이미 병렬 연산이 실행된 뒤에는 바꿀 수 없음
+    except ImportError:
+        pass
+
+    try:
+        import cv2
+        cv2.setNumThreads(intra)
+    except ImportError:
+        pass
+    return {"intra": intra, "inter": inter_threads, "env_applied": env_applied}
+
+
+def warmup_model(predict, imgsz_list, batch_sizes=(1,), runs=3, seed=0):
+    """
+    입력 크기와 배치 크기별로 더미 이미지를 추론하여 지연 초기화(커널 선택, 메모리 할당)를 미리 끝낸다
+    :param predict: predict(BGR 배열 목록, imgsz) - 모델 추론 함수
+    :param imgsz_list: 서비스에서 사용하는 입력 크기 목록
+    :param batch_sizes: 워밍업할 배치 크기 목록
+    :param runs: 모양마다 반복 횟수 (첫 번째는 cold, 나머지 중앙값은 warm)
+    :return: [{"imgsz", "batch", "shape", "cold_ms", "warm_ms"}]
+    """
+    import numpy as np  # configure_threads보다 먼저 numpy를 불러오지 않도록 여기서 import
+    rng = np.random.default_rng(seed)
+    report = []
+    for imgsz in imgsz_list:
+        for batch in batch_sizes:
+            for width_ratio, height_ratio in WARMUP_ASPECTS:
+                width, height = int(imgsz * width_ratio), int(imgsz * height_ratio)
+                # 잡음 이미지는 후보 박스가 생겨 NMS까지 실행된다 (빈 이미지보다 실제 요청에 가까움)
+                images = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(batch)]
+                timings = []
+                for _ in range(max(2, runs)):
+                    start = time.perf_counter()
+                    predict(images, imgsz)
+                    timings.append((time.perf_counter() - start) * 1000)
+                report.append({
+                    "imgsz": imgsz,
+                    "batch": batch,
+                    "shape": f"{width}x{height}",
+                    "cold_ms": timings[0],
+                    "warm_ms": statistics.median(timings[1:])
+                })
+    return report
+
+
+def summarize_warmup(report):
+    """워밍업 결과 요약 - 전체 소요 시간과 첫 실행(cold) 대비 이후(warm) 평균 지연 시간"""
+    if not report:
+        return {}
+    cold = [row["cold_ms"] for row in report]
+    warm = [row["warm_ms"] for row in report]
+    return {
+        "shapes": len(report),
+        "first_cold_ms": cold[0],
+        "mean_cold_ms": statistics.mean(cold),
+        "mean_warm_ms": statistics.mean(warm),
+        "cold_over_warm": statistics.mean(cold) / statistics.mean(warm) if statistics.mean(warm) else None
+    }
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+BUDGET_FILE = BASE_DIR / "startup_budget.json"
+COMMON_DIR = BASE_DIR / "common"
+
+# import time:     self [us] |   cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+# 모듈을 불러온 뒤 이미 불러와진 lazy_import 대리 객체 이름을 출력 (지연시킨 import가 시작 시점에 실행되었는지 확인)
+EAGER_CHECK = """
+import json, sys
+module, lazy = sys.modules[{module!r}], sys.modules.get("lazy_import")
+names = [] if lazy is None else sorted(
+    name for name, value in vars(module).items() if isinstance(value, lazy.LazyModule) and lazy.is_loaded(value))
+print(json.dumps(names))
+"""
+
+
+def measure_import(module, cwd):
+    """
+    새 인터프리터에서 python -X importtime -c "import <module>" 실행
+    :return: (전체 import 시간 ms, {최상위 패키지: 누적 ms}, 시작 시점에 불러와진 지연 import 이름 목록)
+    """
+    # 공유 모듈 경로는 common/README.md와 같이 PYTHONPATH로 지정
+    pythonpath = os.pathsep.join(filter(None, [str(COMMON_DIR), os.environ.get("PYTHONPATH")]))
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", PYTHONPATH=pythonpath)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}\n" + EAGER_CHECK.format(module=module)],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or [""]
+        raise RuntimeError(f"{module} import 실패: {tail[0]}")
+
+    total_us = None
+    packages = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, name = int(match.group(2)), match.group(4)
+        if name == module:
+            total_us = cumulative_us
+            break  # 이후 줄은 확인용 코드의 import
+        root = name.split(".")[0]
+        packages[root] = max(packages.get(root, 0), cumulative_us)
+
+    eager = json.loads(proc.stdout.strip().splitlines()[-1]) if proc.stdout.strip() else []
+    return (total_us or 0) / 1000, {name: us / 1000 for name, us in packages.items()}, eager
+
+
+def run_entry(name, entry, repeat=3, top=8):
+    """진입점 하나를 repeat번 측정하여 중앙값과 무거운 패키지 목록을 반환"""
+    cwd = BASE_DIR / entry["cwd"]
+    samples, packages, eager = [], {}, []
+    for _ in range(repeat):
+        total_ms, package_ms, eager = measure_import(entry["module"], cwd)
+        samples.append(total_ms)
+        for package, ms in package_ms.items():
+            packages.setdefault(package, []).append(ms)
+
+    heaviest = sorted(((statistics.median(v), k) for k, v in packages.items()), reverse=True)[:top]
+    return {
+        "entry": name,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "budget_ms": entry.get("budget_ms"),
+        "heaviest": [(package, ms) for ms, package in heaviest],
+        "eager": eager
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="진입점별 시작(import) 시간 측정 및 예산 확인")
+    parser.add_argument("entries", nargs="*", help="측정할 진입점 이름 (기본: 전체)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="예산 초과 허용 비율")
+    parser.add_argument("--update", action="store_true",
+                        help="측정값 * 1.25로 예산 갱신 (budget_ms가 null인 진입점은 이렇게 설정하기 전까지 실패)")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE, encoding="utf-8") as f:
+        budgets = json.load(f)
+    names = args.entries or list(budgets)
+
+    failed = []
+    for name in names:
+        report = run_entry(name, budgets[name], repeat=args.repeat)
+        budget = report["budget_ms"]
+        # 예산이 없는 진입점은 --update로 측정값을 기록하기 전까지 실패로 본다
+        over = budget is None or report["median_ms"] > budget * (1 + args.tolerance)
+        status = "OVER BUDGET" if over else "ok"
+        if report["eager"]:
+            status += " (deferred imports loaded at startup)"
+        print(f"\n=== {name} ({budgets[name]['cwd']}/{budgets[name]['module']}.py) ===")
+        if budget is None:
+            print(f"import: {report['median_ms']:.0f}ms (min {report['min_ms']:.0f}ms) / NO BUDGET (record one with --update)")
+        else:
+            print(f"import: {report['median_ms']:.0f}ms (min {report['min_ms']:.0f}ms) / budget {budget}ms -> {status}")
+        for package, ms in report["heaviest"]:
+            print(f"  {package:<28} {ms:8.1f}ms")
+        if report["eager"]:
+            print(f"  lazy_import proxies loaded during import: {', '.join(report['eager'])}")
+
+        if args.update:
+            budgets[name]["budget_ms"] = int(report["median_ms"] * 1.25)
+        elif over or report["eager"]:
+            failed.append(name)
+
+    if args.update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\nBudgets updated -> {BUDGET_FILE.name}")
+
+    if failed:
+        print(f"\nStartup budget exceeded or missing: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
-from ultralytics import YOLO
 import os
-import cv2
-import numpy as np
-import pandas as pd
-import tensorflow as tf
 from pathlib import Path
-import yaml
 import shutil
 from datetime import datetime
-import matplotlib.pyplot as plt
-import torch
-torch.cuda.empty_cache()
+from lazy_import import lazy_import
+
+# 무거운 라이브러리는 실제로 사용하는 시점에 import (사용하지 않던 TensorFlow는 제거)
+YOLO = lazy_import("ultralytics", "YOLO")
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+yaml = lazy_import("yaml")
+plt = lazy_import("matplotlib.pyplot")
+torch = lazy_import("torch")
+CascadeDetector = lazy_import("cascade", "CascadeDetector")
 
 
 import warnings
@@ -122,14 +124,26 @@ class DatasetPreparator:
         return str(yaml_path)  # yaml 파일의 경로 반환
 
 class FoodDetector:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, small_model_path=None, **cascade_options):
         if model_path:
             self.model = YOLO(model_path)
         else:
             self.model = YOLO('yolov8x.pt')
+
+        # 작은 모델(같은 클래스로 학습된 n/s 모델)을 주면 캐스케이드 모드:
+        # 작은 모델로 먼저 탐지하고 불확실한 이미지만 self.model(큰 모델)로 다시 탐지
+        self.cascade = None
+        if small_model_path:
+            self.enable_cascade(small_model_path, **cascade_options)
+
+    def enable_cascade(self, small_model_path, **cascade_options):
+        self.cascade = CascadeDetector(small_model_path, self.model, **cascade_options)
+        return self.cascade
     
     def train(self, data_yaml, epochs=100, batch_size=16, imgsz=320):
         print("Starting model training...")
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
         try:
             results = self.model.train(
                 data=str(Path(data_yaml).absolute()),  # 절대 경로 사용
@@ -146,7 +160,8 @@ class FoodDetector:
             return None
         
     def detect_foods(self, image_path):
-        results = self.model.predict(image_path)
+        detector = self.cascade or self.model
+        results = detector.predict(image_path)
         
         detections = []
         for r in results:
@@ -203,16 +218,20 @@ class NutritionAnalyzer:
         
         return meal_analysis
 
-import cv2
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-
-# 한글 폰트 설정
+# 한글 폰트 설정 (matplotlib은 시각화할 때 처음 불러옴)
 font_path = "C:/Windows/Fonts/malgun.ttf"  # Windows용
-fontprop = fm.FontProperties(fname=font_path, size=12)
-plt.rc('font', family=fontprop.get_name())
+fontprop = None
+
+def get_fontprop():
+    global fontprop
+    if fontprop is None:
+        fm = lazy_import("matplotlib.font_manager")
+        fontprop = fm.FontProperties(fname=font_path, size=12)
+        plt.rc('font', family=fontprop.get_name())
+    return fontprop
 
 def plot_detections(image_path, detections, class_names):
+    fontprop = get_fontprop()
     img = cv2.imread(image_path)
     img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
     